@@ -0,0 +1,51 @@
+"""
+Compare figure construction with plotly graph_objs against the plain-dict builder used by plot_mixture_many.
+
+    python benchmarks/bench_figures.py [--components 10] [--points 200] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from components import HugoniotEOS, build_mixture_figures, figure_to_json, generate_mixed_hugoniot_many
+from reference_figures import graph_objs_figures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--components", type=int, default=10)
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    configs = [
+        (HugoniotEOS(f"Mat{i}", rng.uniform(1, 20), rng.uniform(1, 8), rng.uniform(0.9, 1.7)), 1.0 / args.components)
+        for i in range(args.components)
+    ]
+    mixed = generate_mixed_hugoniot_many("Mix", configs, np.linspace(0, 6, 100))
+    up = np.linspace(0, 6, args.points)
+
+    # Warm up plotly's lazy imports and the cached default template before timing
+    graph_objs_figures(configs, mixed, up)
+    build_mixture_figures(configs, mixed, up)
+
+    paths = {
+        "graph_objs build": lambda: graph_objs_figures(configs, mixed, up),
+        "dict build": lambda: build_mixture_figures(configs, mixed, up),
+        "graph_objs build + to_json": lambda: [f.to_json() for f in graph_objs_figures(configs, mixed, up)],
+        "dict build + figure_to_json": lambda: [figure_to_json(f) for f in build_mixture_figures(configs, mixed, up)],
+    }
+    print(f"{args.components} components x {args.points} points, best of {args.repeat}")
+    for label, fn in paths.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"  {label:<30} {best * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measure cold import time of the physics core and the web app, each in a fresh interpreter.
+
+    python benchmarks/bench_import.py [--repeat 5] [--max-ms components=300 main=1500]
+
+Exits non-zero if a module's median import time exceeds its --max-ms budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+MODULES = ["components", "main"]
+
+PROBE = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in ("plotly", "scipy", "fasthtml") if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def time_import(module: str) -> tuple[float, str]:
+    # Run in an empty directory so nothing (e.g. the app database) is picked up from the working tree
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, "-c", PROBE.format(src=SRC_DIR, module=module)],
+                             cwd=cwd, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1]
+    elapsed, heavy = out.split(" ", 1) if " " in out else (out, "")
+    return float(elapsed), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", nargs="*", default=[], metavar="MODULE=MS",
+                        help="fail if the median import time of MODULE exceeds MS milliseconds")
+    args = parser.parse_args()
+    budgets = {name: float(ms) for name, ms in (item.split("=") for item in args.max_ms)}
+
+    failed = False
+    for module in MODULES:
+        runs = [time_import(module) for _ in range(args.repeat)]
+        median_ms = statistics.median(elapsed for elapsed, _ in runs) * 1e3
+        heavy = runs[-1][1] or "-"
+        status = ""
+        if module in budgets and median_ms > budgets[module]:
+            status = f"  OVER BUDGET ({budgets[module]:.0f} ms)"
+            failed = True
+        print(f"{module:<12} median {median_ms:8.1f} ms over {args.repeat} runs; heavy modules loaded: {heavy}{status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
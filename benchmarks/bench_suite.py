@@ -0,0 +1,244 @@
+"""
+Benchmark suite for the physics core and the HTTP routes, with a stored baseline to catch regressions.
+
+    python benchmarks/bench_suite.py [--quick] [--only core|routes] [--output results.json]
+                                     [--baseline benchmarks/baseline.json] [--threshold 0.25] [--save-baseline]
+
+Core: generate_mixed_hugoniot_many, solve_up and plot_mixture_many over 1-10 components x 20-100k fit points.
+Uncertainty: generate_mixed_hugoniot_uncertainty with 1e5 samples over the supported range (components x fit points
+<= 1000); a case whose median exceeds UNCERTAINTY_BUDGET_S is reported and the exit status is 1, baseline or not.
+Routes: latency and throughput of /, /get_material, /calculate and /plot through an in-process ASGI client
+(httpx.ASGITransport), against a fresh database in a temporary directory with the disk cache and lookup tables off.
+/calculate and /plot are measured cold (a new composition per request) and cached (the same form repeated).
+
+Every case records the median, minimum and p95 time per call. With --baseline, a case whose median exceeds the
+baseline median by more than --threshold (relative) is reported as a regression and the exit status is 1.
+--save-baseline writes the results to the --baseline path instead of comparing.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, SRC_DIR)
+
+from components import (HugoniotEOS, generate_mixed_hugoniot_many, generate_mixed_hugoniot_uncertainty,
+                        plot_mixture_many)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+COMPONENTS = (1, 2, 3, 5, 10)
+FIT_POINTS = (20, 100, 1000, 10_000, 100_000)
+QUICK_COMPONENTS = (1, 5, 10)
+QUICK_FIT_POINTS = (20, 1000, 100_000)
+UNCERTAINTY_CASES = ((2, 100), (5, 100), (10, 100), (3, 200), (5, 200))  # (components, fit points)
+QUICK_UNCERTAINTY_CASES = ((10, 100), (5, 200))
+UNCERTAINTY_SAMPLES = 100_000
+UNCERTAINTY_BUDGET_S = 1.0
+ROUTE_REQUESTS = 50
+ROUTE_CONCURRENCY = 8
+
+
+def measure(fn, min_time: float = 0.2, min_repeat: int = 3, max_repeat: int = 200) -> dict:
+    """Call fn until min_time has passed (within the repeat limits) and summarise the per-call times."""
+    fn()  # warm-up: lazy imports, caches of the default plot template
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_repeat and (len(times) < min_repeat or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return _summary(times)
+
+
+def _summary(times: list) -> dict:
+    ordered = sorted(times)
+    return dict(median_s=statistics.median(ordered), min_s=ordered[0],
+                p95_s=ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], repeat=len(ordered))
+
+
+def _materials(n_components: int):
+    rng = np.random.default_rng(n_components)
+    return [(HugoniotEOS(f"Mat{i}", rng.uniform(1, 20), rng.uniform(1, 8), rng.uniform(0.9, 1.7)), 1.0 / n_components)
+            for i in range(n_components)]
+
+
+def core_benchmarks(components=COMPONENTS, fit_points=FIT_POINTS) -> dict:
+    results = {}
+    for n_components in components:
+        configs = _materials(n_components)
+        for n_points in fit_points:
+            up = np.linspace(0.0, 6.0, n_points)
+            mixed = generate_mixed_hugoniot_many("Mix", configs, up)
+            pressures = mixed.hugoniot_P(up)
+            suffix = f"c={n_components}/n={n_points}"
+            results[f"core/generate_mixed_hugoniot_many/{suffix}"] = measure(
+                lambda: generate_mixed_hugoniot_many("Mix", configs, up))
+            results[f"core/solve_up/{suffix}"] = measure(lambda: [eos.solve_up(pressures) for eos, _ in configs])
+            results[f"core/plot_mixture_many/{suffix}"] = measure(
+                lambda: plot_mixture_many(configs, mixed, 0.0, 6.0, num_points=n_points, plot_mode="json"))
+            print(f"  core {suffix}: fit {results[f'core/generate_mixed_hugoniot_many/{suffix}']['median_s'] * 1e3:.2f} ms",
+                  file=sys.stderr)
+    return results
+
+
+def uncertainty_benchmarks(cases=UNCERTAINTY_CASES, n_samples: int = UNCERTAINTY_SAMPLES) -> dict:
+    results = {}
+    for n_components, n_points in cases:
+        configs = _materials(n_components)
+        up = np.linspace(0.0, 6.0, n_points)
+        sigmas = np.array([[0.01 * eos.rho0, 0.02 * eos.C0, 0.02 * eos.S] for eos, _ in configs])
+        name = f"core/generate_mixed_hugoniot_uncertainty/c={n_components}/n={n_points}"
+        results[name] = measure(lambda: generate_mixed_hugoniot_uncertainty(configs, up, sigmas, n_samples=n_samples,
+                                                                             seed=0), min_time=0.0)
+        print(f"  uncertainty c={n_components}/n={n_points}: {results[name]['median_s'] * 1e3:.0f} ms", file=sys.stderr)
+    return results
+
+
+def over_budget(results: dict, budget: float = UNCERTAINTY_BUDGET_S) -> list:
+    """Uncertainty cases whose median exceeds the absolute budget, as (name, median)."""
+    return [(name, case["median_s"]) for name, case in results.items()
+            if "/generate_mixed_hugoniot_uncertainty/" in name and case["median_s"] > budget]
+
+
+def _form(vfrac: float) -> dict:
+    return {
+        'num_materials': '2', 'mixture_name': 'Bench',
+        'material_type_1': 'custom', 'name1': 'A', 'rho0_1': '8.93', 'C0_1': '4.27', 'S_1': '1.413',
+        'vfrac1': repr(vfrac),
+        'material_type_2': 'custom', 'name2': 'B', 'rho0_2': '2.785', 'C0_2': '5.328', 'S_2': '1.338',
+        'vfrac2': repr(1.0 - vfrac),
+        'upmin_fit': '0', 'upmax_fit': '6', 'num_points_fit': '100',
+    }
+
+
+async def _route_case(client, make_request, requests: int, concurrency: int) -> dict:
+    await make_request(0)  # warm-up
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f"{response.request.url} returned {response.status_code}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i + 1) for i in range(requests)])
+    elapsed = time.perf_counter() - start
+    return dict(_summary(latencies), throughput_rps=requests / elapsed, concurrency=concurrency)
+
+
+async def _route_benchmarks(requests: int, concurrency: int) -> dict:
+    import httpx
+    import main
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+    material = main.material_catalog.names()[0]
+    hx = {'HX-Request': 'true'}
+    cases = {
+        "route/index": lambda c, i: c.get("/"),
+        "route/get_material": lambda c, i: c.get("/get_material", params={"material1_select": material}),
+        # A new composition per request, so every one is fitted and rendered
+        "route/calculate/cold": lambda c, i: c.post("/calculate", data=_form(0.5 + i * 1e-6), headers=hx),
+        "route/calculate/cached": lambda c, i: c.post("/calculate", data=_form(0.5), headers=hx),
+        "route/plot/cold": lambda c, i: c.post("/plot", data=_form(0.25 + i * 1e-6), headers=hx),
+        "route/plot/cached": lambda c, i: c.post("/plot", data=_form(0.25), headers=hx),
+    }
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, request in cases.items():
+            results[name] = await _route_case(client, lambda i: request(client, i), requests, concurrency)
+            print(f"  {name}: median {results[name]['median_s'] * 1e3:.2f} ms, "
+                  f"{results[name]['throughput_rps']:.0f} req/s", file=sys.stderr)
+    main.compute_pool.shutdown()
+    return results
+
+
+def route_benchmarks(requests: int = ROUTE_REQUESTS, concurrency: int = ROUTE_CONCURRENCY) -> dict:
+    # The app opens its database relative to the working directory, so it gets a fresh one here
+    os.environ.setdefault("DISK_CACHE", "0")
+    os.environ.setdefault("LOOKUP_TABLES", "0")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            return asyncio.run(_route_benchmarks(requests, concurrency))
+        finally:
+            os.chdir(cwd)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Cases whose median is more than threshold (relative) slower than the baseline, as (name, baseline, now)."""
+    regressions = []
+    for name, case in results.items():
+        reference = baseline.get(name)
+        if reference and case["median_s"] > reference["median_s"] * (1.0 + threshold):
+            regressions.append((name, reference["median_s"], case["median_s"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="a smaller grid of core cases and fewer route requests")
+    parser.add_argument("--only", choices=("core", "routes"))
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown of a median over the baseline that counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    if args.only in (None, "core"):
+        grid = (QUICK_COMPONENTS, QUICK_FIT_POINTS) if args.quick else (COMPONENTS, FIT_POINTS)
+        results.update(core_benchmarks(*grid))
+        results.update(uncertainty_benchmarks(QUICK_UNCERTAINTY_CASES if args.quick else UNCERTAINTY_CASES))
+    if args.only in (None, "routes"):
+        results.update(route_benchmarks(requests=ROUTE_REQUESTS // 5 if args.quick else ROUTE_REQUESTS))
+
+    report = dict(
+        environment=dict(python=platform.python_version(), numpy=np.__version__, platform=platform.platform(),
+                         timestamp=time.strftime("%Y-%m-%dT%H:%M:%S")),
+        results=results,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    slow = over_budget(results)
+    for name, now in slow:
+        print(f"OVER BUDGET {name:<54} {now * 1e3:9.3f} ms > {UNCERTAINTY_BUDGET_S * 1e3:.0f} ms")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} cases to {args.baseline}")
+        sys.exit(1 if slow else 0)
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        sys.exit(1 if slow else 0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    compared = sum(1 for name in results if name in baseline)
+    for name, before, now in regressions:
+        print(f"REGRESSION {name:<55} {before * 1e3:9.3f} ms -> {now * 1e3:9.3f} ms ({now / before - 1:+.0%})")
+    print(f"{compared} cases compared with {args.baseline}, {len(regressions)} slower by more than {args.threshold:.0%}")
+    sys.exit(1 if regressions or slow else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Load test that replays the HTMX form flow of real users against a running app.
+
+    python benchmarks/loadtest.py [--users 16] [--duration 30] [--workers 1] [--env COMPUTE_POOL_KIND=process ...]
+    python benchmarks/loadtest.py --url http://localhost:8000 [--users 16] [--sessions 200]
+
+Without --url the app is started with uvicorn (--workers processes) in a temporary directory, so it gets a fresh
+database, and stopped afterwards; --env sets environment variables for it (e.g. compute pool or cache settings).
+
+Each virtual user loops over sessions: load the page (and revalidate the plotly bundle, as a browser would),
+change the number of materials, fetch /get_material for every premade dropdown, then /calculate and /plot.
+A --standard-fraction of sessions submit one of a few standard slurries, as a class would, and the rest a random
+composition; the schedule is drawn from --seed, so runs are reproducible. Reported per endpoint: requests,
+errors (transport errors, HTTP errors and error messages in HTMX fragments), p50/p95/p99 latency and throughput.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+HX = {"HX-Request": "true"}
+STANDARD_SLURRIES = [  # (material index in the catalog dropdown, volume fraction) pairs
+    [(0, 0.6), (1, 0.4)],
+    [(2, 0.5), (3, 0.3), (4, 0.2)],
+    [(1, 0.75), (5, 0.25)],
+]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, expect: str = None,
+                      **kwargs):
+        """Send a request and record its latency under endpoint; returns the response, or None on a transport error."""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[endpoint].append(time.perf_counter() - start)
+            self.errors[endpoint] += 1
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        if response.status_code >= 400 or (expect is not None and expect not in response.text):
+            self.errors[endpoint] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        report = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            ms = np.asarray(latencies) * 1e3
+            report[endpoint] = dict(
+                requests=len(ms), errors=self.errors[endpoint], error_rate=self.errors[endpoint] / len(ms),
+                p50_ms=float(np.percentile(ms, 50)), p95_ms=float(np.percentile(ms, 95)),
+                p99_ms=float(np.percentile(ms, 99)), throughput_rps=len(ms) / elapsed,
+            )
+        return report
+
+
+def _form(materials: list, composition: list) -> dict:
+    form = {"num_materials": str(len(composition)), "mixture_name": "LoadTest",
+            "upmin_fit": "0", "upmax_fit": "6", "num_points_fit": "100"}
+    for i, (material, vfrac) in enumerate(composition, start=1):
+        form.update({f"material_type_{i}": "premade", f"material{i}_select": material, f"vfrac{i}": repr(vfrac)})
+    return form
+
+
+def _composition(rng: random.Random, materials: list, standard_fraction: float) -> list:
+    if rng.random() < standard_fraction:
+        slurry = rng.choice(STANDARD_SLURRIES)
+        return [(materials[index % len(materials)], vfrac) for index, vfrac in slurry]
+    weights = [rng.random() + 0.05 for _ in range(rng.randint(2, 4))]
+    vfracs = [round(w / sum(weights), 4) for w in weights[:-1]]
+    vfracs.append(round(1.0 - sum(vfracs), 4))
+    return [(rng.choice(materials), vfrac) for vfrac in vfracs]
+
+
+async def session(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, standard_fraction: float,
+                  think: float, state: dict):
+    page = await recorder.request(client, "GET /", "GET", "/", expect="Calculation Parameters")
+    if page is None:
+        return
+    if state.get("materials") is None:
+        state["materials"] = re.findall(r'<option value="([^"]+)"', page.text) or ["Copper"]
+        state["bundle"] = (re.findall(r'<script src="(/static/[^"]+)"', page.text) or [None])[0]
+    if state["bundle"]:
+        headers = {"If-None-Match": state["etag"]} if state.get("etag") else {}
+        bundle = await recorder.request(client, "GET plotly bundle", "GET", state["bundle"], headers=headers)
+        if bundle is not None and bundle.headers.get("etag"):
+            state["etag"] = bundle.headers["etag"]
+
+    composition = _composition(rng, state["materials"], standard_fraction)
+    form = _form(state["materials"], composition)
+    await asyncio.sleep(think * rng.random())
+    await recorder.request(client, "GET /?num_materials", "GET", "/", params=form, headers=HX,
+                           expect="material-inputs-container")
+    for i, (material, _) in enumerate(composition, start=1):
+        await asyncio.sleep(think * rng.random())
+        await recorder.request(client, "GET /get_material", "GET", "/get_material",
+                               params={f"material{i}_select": material}, headers=HX, expect="Density")
+    await asyncio.sleep(think * rng.random())
+    await recorder.request(client, "POST /calculate", "POST", "/calculate", data=form, headers=HX,
+                           expect="Mixture Parameters")
+    await asyncio.sleep(think * rng.random())
+    await recorder.request(client, "POST /plot", "POST", "/plot", data=form, headers=HX, expect="Mixture Parameters")
+
+
+async def run(url: str, users: int, duration: float, sessions: int, standard_fraction: float, think: float,
+              seed: int) -> tuple:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    remaining = [sessions]
+
+    async def user(index: int):
+        rng = random.Random(seed * 100_003 + index)
+        state = {}
+        limits = httpx.Limits(max_connections=1)  # one connection per user, like a browser tab
+        async with httpx.AsyncClient(base_url=url, timeout=60.0, limits=limits) as client:
+            while time.perf_counter() < deadline and (sessions <= 0 or remaining[0] > 0):
+                remaining[0] -= 1
+                await session(client, recorder, rng, standard_fraction, think, state)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[user(i) for i in range(users)])
+    elapsed = time.perf_counter() - start
+    return recorder.report(elapsed), elapsed
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(workers: int, env: dict, cwd: str) -> tuple:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", SRC_DIR, "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=cwd, env=dict(os.environ, **env),
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError(f"app exited with status {process.returncode}")
+        try:
+            if httpx.get(url + "/status", timeout=1.0).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("app did not start within 30 s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="test a running app instead of starting one")
+    parser.add_argument("--users", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--sessions", type=int, default=0, help="stop after this many sessions in total (0: no limit)")
+    parser.add_argument("--standard-fraction", type=float, default=0.5,
+                        help="fraction of sessions that submit one of the standard slurries")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="maximum pause between a user's requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the started app")
+    parser.add_argument("--env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="environment variables for the started app")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    process = None
+    scratch = tempfile.TemporaryDirectory()
+    try:
+        url = args.url
+        if url is None:
+            process, url = start_app(args.workers, dict(item.split("=", 1) for item in args.env), scratch.name)
+        report, elapsed = asyncio.run(run(url, args.users, args.duration, args.sessions, args.standard_fraction,
+                                          args.think_ms / 1e3, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        scratch.cleanup()
+
+    print(f"{args.users} users for {elapsed:.1f} s against {args.url or f'a local app ({args.workers} workers)'}")
+    print(f"{'endpoint':<22}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>8}")
+    for endpoint, row in report.items():
+        print(f"{endpoint:<22}{row['requests']:>9}{row['errors']:>8}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+              f"{row['p99_ms']:>9.1f}{row['throughput_rps']:>8.1f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(dict(users=args.users, elapsed_s=elapsed, workers=args.workers, env=args.env, endpoints=report),
+                      f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
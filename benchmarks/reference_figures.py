@@ -0,0 +1,26 @@
+"""
+Reference figure builder with plotly graph_objs, shared by benchmarks/bench_figures.py and tests/test_plotting.py.
+"""
+
+
+def graph_objs_figures(original_material_configs, mixed_eos, up_plot_range):
+    """Reference: the figures built with go.Figure/go.Scatter, as plot_mixture_many did before the dict builder."""
+    import plotly.graph_objs as go
+    P_plot_common = mixed_eos.hugoniot_P(up_plot_range)
+    fig_p_up = go.Figure()
+    for mat_orig, vfrac in original_material_configs:
+        fig_p_up.add_trace(go.Scatter(x=mat_orig.solve_up(P_plot_common), y=P_plot_common, mode='lines',
+                                      name=f"{mat_orig.name} ({vfrac*100:.1f}%)", line=dict(width=2)))
+    fig_p_up.add_trace(go.Scatter(x=up_plot_range, y=P_plot_common, mode='lines', name=f"{mixed_eos.name} (Mix)",
+                                  line=dict(dash='dash', width=3, color='black')))
+    fig_p_up.update_layout(title_text="Pressure vs. Particle Velocity", xaxis_title_text="Up (km/s)",
+                           yaxis_title_text="P (GPa)", legend_title_text='Materials')
+    fig_us_up = go.Figure()
+    for mat_orig, vfrac in original_material_configs:
+        fig_us_up.add_trace(go.Scatter(x=up_plot_range, y=mat_orig.hugoniot_eos(up_plot_range), mode='lines',
+                                       name=f"{mat_orig.name} ({vfrac*100:.1f}%)", line=dict(width=2)))
+    fig_us_up.add_trace(go.Scatter(x=up_plot_range, y=mixed_eos.hugoniot_eos(up_plot_range), mode='lines',
+                                   name=f"{mixed_eos.name} (Mix)", line=dict(dash='dash', width=3, color='black')))
+    fig_us_up.update_layout(title_text="Shock Velocity vs. Particle Velocity", xaxis_title_text="Up (km/s)",
+                            yaxis_title_text="Us (km/s)", legend_title_text='Materials')
+    return fig_p_up, fig_us_up
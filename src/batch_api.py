@@ -0,0 +1,239 @@
+"""Parsing and evaluation for the JSON mixture APIs (POST /api/mixtures:batch and /api/design)."""
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from components import HugoniotEOS, generate_mixed_hugoniot_batch
+
+MAX_SPECS_PER_REQUEST = 1000
+MAX_FIT_POINTS = 100_000
+# Fit points summed over all specs in one request; with the chunk size this bounds both work and peak memory
+MAX_POINTS_PER_REQUEST = 2_000_000
+EVALUATION_CHUNK_POINTS = 200_000
+DEFAULT_UP_MIN = 0.0
+DEFAULT_UP_MAX = 6.0
+DEFAULT_NUM_POINTS = 100
+
+
+class SpecError(ValueError):
+    """A mixture spec is malformed or physically invalid."""
+
+
+class RequestTooLarge(SpecError):
+    """A request is valid but asks for more work than one request may; the routes answer 413."""
+
+
+@dataclass
+class MixtureSpec:
+    """A validated mixture request. Components with zero volume fraction are dropped, as in the form."""
+    name: str
+    materials: List[HugoniotEOS]
+    vfracs: List[float]
+    up_min: float
+    up_max: float
+    num_points: int
+
+
+def _number(value, field: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise SpecError(f"{field} must be a number")
+    value = float(value)
+    if not np.isfinite(value):
+        raise SpecError(f"{field} must be finite")
+    return value
+
+
+def parse_component(comp, lookup: Callable[[str], HugoniotEOS], label: str, default_name: str) -> HugoniotEOS:
+    """
+    One material given as {"material": catalog name} or {"name": str, "rho0": x, "C0": x, "S": x}.
+    :param label: how errors refer to the material, e.g. "component 2"
+    """
+    if not isinstance(comp, dict):
+        raise SpecError(f"{label[:1].upper()}{label[1:]} must be a JSON object")
+    if "material" in comp:
+        try:
+            return lookup(str(comp["material"]))
+        except (KeyError, LookupError):
+            raise SpecError(f"Material '{comp['material']}' not found in catalog") from None
+    rho0 = _number(comp.get("rho0"), f"rho0 for {label}")
+    C0 = _number(comp.get("C0"), f"C0 for {label}")
+    S = _number(comp.get("S"), f"S for {label}")
+    if rho0 <= 0 or C0 <= 0:
+        raise SpecError(f"rho0 and C0 for {label} must be positive")
+    return HugoniotEOS(name=str(comp.get("name", default_name)), rho0=rho0, C0=C0, S=S)
+
+
+def _fit_range(spec: dict) -> tuple[float, float, int]:
+    up_min = _number(spec.get("up_min", DEFAULT_UP_MIN), "up_min")
+    up_max = _number(spec.get("up_max", DEFAULT_UP_MAX), "up_max")
+    if up_min >= up_max:
+        raise SpecError("up_min must be less than up_max")
+    num_points = spec.get("num_points", DEFAULT_NUM_POINTS)
+    if isinstance(num_points, bool) or not isinstance(num_points, int) or not 20 <= num_points <= MAX_FIT_POINTS:
+        raise SpecError(f"num_points must be an integer between 20 and {MAX_FIT_POINTS}")
+    return up_min, up_max, num_points
+
+
+def parse_mixture_spec(spec, lookup: Callable[[str], HugoniotEOS], index: int = 0) -> MixtureSpec:
+    """
+    Validate one JSON mixture spec.
+    :param spec: {"name": str, "components": [{"material": catalog name, "vfrac": x} or
+                 {"name": str, "rho0": x, "C0": x, "S": x, "vfrac": x}, ...], "up_min": x, "up_max": x, "num_points": n}
+    :param lookup: resolves a catalog name to a HugoniotEOS; raises KeyError (or a subclass) if unknown
+    :param index: position of the spec in the request, used for default names
+    :raises SpecError: with a message suitable for returning to the client
+    """
+    if not isinstance(spec, dict):
+        raise SpecError("Mixture spec must be a JSON object")
+    components = spec.get("components")
+    if not isinstance(components, list) or not components:
+        raise SpecError("components must be a non-empty list")
+
+    materials, vfracs = [], []
+    for i, comp in enumerate(components, start=1):
+        if not isinstance(comp, dict):
+            raise SpecError(f"Component {i} must be a JSON object")
+        vfrac = _number(comp.get("vfrac"), f"vfrac for component {i}")
+        if not 0 <= vfrac <= 1:
+            raise SpecError(f"vfrac for component {i} must be between 0 and 1")
+        eos = parse_component(comp, lookup, f"component {i}", f"CustomMat{i}")
+        if vfrac > 0:
+            materials.append(eos)
+            vfracs.append(vfrac)
+
+    if not materials:
+        raise SpecError("No components with volume fraction > 0")
+    if not np.isclose(sum(vfracs), 1.0):
+        raise SpecError(f"Volume fractions must sum to 1.0, but sum to {sum(vfracs):.4f}")
+
+    up_min, up_max, num_points = _fit_range(spec)
+    return MixtureSpec(str(spec.get("name", f"Mixture{index + 1}")), materials, vfracs, up_min, up_max, num_points)
+
+
+def evaluate_mixture_specs(specs: List[Optional[MixtureSpec]]) -> List[Optional[dict]]:
+    """
+    Evaluate validated specs with the vectorized engine.
+    Specs sharing the same component EOS (in order) and Up grid are evaluated together, in
+    generate_mixed_hugoniot_batch calls of at most EVALUATION_CHUNK_POINTS compositions x points each, so the
+    intermediate (compositions, points) arrays stay bounded however many specs share a grid.
+    None entries (specs that failed validation) come back as None.
+    """
+    groups = {}
+    for i, spec in enumerate(specs):
+        if spec is None:
+            continue
+        key = (tuple((eos.name, eos.rho0, eos.C0, eos.S) for eos in spec.materials),
+               spec.up_min, spec.up_max, spec.num_points)
+        groups.setdefault(key, []).append(i)
+
+    results: List[Optional[dict]] = [None] * len(specs)
+    for group in groups.values():
+        first = specs[group[0]]
+        up_ref = np.linspace(first.up_min, first.up_max, first.num_points)
+        rows_per_chunk = max(1, EVALUATION_CHUNK_POINTS // first.num_points)
+        for start in range(0, len(group), rows_per_chunk):
+            indices = group[start:start + rows_per_chunk]
+            batch = generate_mixed_hugoniot_batch(first.materials, np.array([specs[i].vfracs for i in indices]), up_ref)
+            for row, i in enumerate(indices):
+                results[i] = dict(
+                    name=specs[i].name,
+                    rho0=float(batch.rho0[row]),
+                    C0=float(batch.C0[row]),
+                    S=float(batch.S[row]),
+                    components=list(batch.components),
+                    vfracs=batch.vfracs[row].tolist(),
+                    mfracs=batch.mfracs[row].tolist(),
+                )
+    return results
+
+
+def parse_batch_request(body, lookup: Callable[[str], HugoniotEOS]) -> tuple[List[Optional[MixtureSpec]], List[Optional[str]]]:
+    """
+    Validate a batch request body (a JSON array of specs).
+    :returns: (specs, errors); for each position exactly one of them is not None
+    :raises SpecError: if the body itself is not an acceptable array
+    :raises RequestTooLarge: if the valid specs ask for more than MAX_POINTS_PER_REQUEST fit points in total
+    """
+    if not isinstance(body, list):
+        raise SpecError("Request body must be a JSON array of mixture specs")
+    if len(body) > MAX_SPECS_PER_REQUEST:
+        raise SpecError(f"At most {MAX_SPECS_PER_REQUEST} mixture specs per request")
+    specs: List[Optional[MixtureSpec]] = []
+    errors: List[Optional[str]] = []
+    for i, raw in enumerate(body):
+        try:
+            specs.append(parse_mixture_spec(raw, lookup, i))
+            errors.append(None)
+        except SpecError as e:
+            specs.append(None)
+            errors.append(str(e))
+    total_points = sum(spec.num_points for spec in specs if spec is not None)
+    if total_points > MAX_POINTS_PER_REQUEST:
+        raise RequestTooLarge(f"Request asks for {total_points} fit points in total; at most {MAX_POINTS_PER_REQUEST} "
+                              f"per request")
+    return specs, errors
+
+
+def merge_results(results: List[Optional[dict]], errors: List[Optional[str]]) -> List[dict]:
+    """Combine evaluated results and validation errors back into request order."""
+    return [result if error is None else {"error": error} for result, error in zip(results, errors)]
+
+
+MAX_DESIGN_TIME_BUDGET = 2.0
+DEFAULT_DESIGN_TIME_BUDGET = 0.25
+DESIGN_POPULATION = 256
+
+
+def parse_design_request(body, lookup: Callable[[str], HugoniotEOS]) -> dict:
+    """
+    Validate an inverse-design request and return keyword arguments for design.design_mixture.
+    :param body: {"components": [material, ...], "target": {"rho0"|"C0"|"S": x, ...}, "weights": {...},
+                 "window": material, "pressures": [P, ...], "time_budget_ms": n, "up_min", "up_max", "num_points"}
+                 where each material is as for parse_component; give a target, a window, or both
+    :raises SpecError: with a message suitable for returning to the client
+    :raises RequestTooLarge: if one population of DESIGN_POPULATION compositions would exceed MAX_POINTS_PER_REQUEST
+                             fit points
+    """
+    if not isinstance(body, dict):
+        raise SpecError("Request body must be a JSON object")
+    components = body.get("components")
+    if not isinstance(components, list) or not components:
+        raise SpecError("components must be a non-empty list")
+    materials = [parse_component(comp, lookup, f"component {i}", f"CustomMat{i}")
+                 for i, comp in enumerate(components, start=1)]
+
+    target = body.get("target") or {}
+    if not isinstance(target, dict) or set(target) - {"rho0", "C0", "S"}:
+        raise SpecError("target must be an object with any of rho0, C0, S")
+    target = {k: _number(v, f"target {k}") for k, v in target.items()}
+    if any(v == 0 for v in target.values()):
+        raise SpecError("target values must be non-zero")
+    weights = body.get("weights") or {}
+    if not isinstance(weights, dict):
+        raise SpecError("weights must be an object")
+    weights = {k: _number(v, f"weight {k}") for k, v in weights.items()}
+
+    window, pressures = None, None
+    if body.get("window") is not None:
+        window = parse_component(body["window"], lookup, "window", "Window")
+        pressures = body.get("pressures")
+        if not isinstance(pressures, list) or not pressures:
+            raise SpecError("pressures must be a non-empty list when matching a window")
+        pressures = np.array([_number(p, "pressure") for p in pressures])
+        if np.any(pressures <= 0):
+            raise SpecError("pressures must be positive")
+    if not target and window is None:
+        raise SpecError("Give a target (rho0, C0 and/or S) or a window to match")
+
+    time_budget = _number(body.get("time_budget_ms", DEFAULT_DESIGN_TIME_BUDGET * 1000), "time_budget_ms") / 1000
+    if not 0 < time_budget <= MAX_DESIGN_TIME_BUDGET:
+        raise SpecError(f"time_budget_ms must be between 0 and {MAX_DESIGN_TIME_BUDGET * 1000:.0f}")
+
+    up_min, up_max, num_points = _fit_range(body)
+    if DESIGN_POPULATION * num_points > MAX_POINTS_PER_REQUEST:
+        raise RequestTooLarge(f"num_points for a design request must be at most "
+                              f"{MAX_POINTS_PER_REQUEST // DESIGN_POPULATION}")
+    return dict(materials=materials, Up_ref=np.linspace(up_min, up_max, num_points), target=target or None,
+                weights=weights or None, window=window, pressures=pressures, time_budget=time_budget,
+                population=DESIGN_POPULATION)
@@ -0,0 +1,78 @@
+import threading
+from typing import Any, Dict, List
+
+from fastlite import NotFoundError
+
+
+class MaterialCatalog:
+    """
+    Process-local copy of the materials table.
+    The table is scanned once, on first use, and lookups by name and ordered listings are then served from memory.
+    Inserts made through the catalog are written to the table and applied to the in-memory copy (write-through);
+    anything that changes the table behind the catalog's back should call invalidate().
+    """
+
+    def __init__(self, table):
+        self._table = table
+        self._rows: List[Any] = []
+        self._by_name: Dict[str, Any] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Bumped on every change so callers can cache things derived from the listing
+        self.version = 0
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._rows = list(self._table())
+                self._by_name = {row.name: row for row in self._rows}
+                self._loaded = True
+                self.version += 1
+
+    def load(self):
+        """Scan the table now instead of on first use (e.g. at startup)."""
+        self._ensure_loaded()
+
+    def invalidate(self):
+        """Drop the in-memory copy; the next access rescans the table."""
+        with self._lock:
+            self._loaded = False
+            self._rows = []
+            self._by_name = {}
+            self.version += 1
+
+    def all(self) -> List[Any]:
+        """All materials in table order. The returned list must not be modified."""
+        self._ensure_loaded()
+        return self._rows
+
+    def names(self) -> List[str]:
+        return [row.name for row in self.all()]
+
+    def get(self, name: str):
+        """Look up a material by name; raises NotFoundError like the table's own lookup."""
+        self._ensure_loaded()
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise NotFoundError(name) from None
+
+    def __contains__(self, name: str) -> bool:
+        self._ensure_loaded()
+        return name in self._by_name
+
+    def __len__(self) -> int:
+        return len(self.all())
+
+    def insert(self, row: dict):
+        """Insert a material into the table and the in-memory copy."""
+        inserted = self._table.insert(row)
+        self._ensure_loaded()
+        with self._lock:
+            # Copy-on-write so readers holding the old listing never see it change under them
+            self._rows = [r for r in self._rows if r.name != inserted.name] + [inserted]
+            self._by_name = {**self._by_name, inserted.name: inserted}
+            self.version += 1
+        return inserted
@@ -1,10 +1,19 @@
 import numpy as np
-from typing import List, Tuple # Ensure Tuple is imported
+from typing import Dict, List, Tuple # Ensure Tuple is imported
 import numpy.typing as npt # Added for npt.ArrayLike
 from dataclasses import dataclass
-from fasthtml.common import * 
-import plotly.graph_objs as go
-from scipy.stats import linregress as LR # Added for generate_mixed_hugoniot_many
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import logging
+import threading
+import base64
+import json
+import uuid
+# FastHTML and plotly are imported inside the plotting functions so the physics core imports without them
+from typing import Optional
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -44,6 +53,78 @@ def convert_volfrac_to_massfrac(rho1, rho2, Vx1):
     return x1
 
 
+def up_from_pressure(rho0, C0, S, P):
+    """
+    Particle velocity on the Hugoniot at pressure P: the positive root of S up^2 + C0 up - P/rho0 = 0.
+    Written as 2q / (C0 + sqrt(C0^2 + 4 S q)), which does not cancel when S*q is small and stays finite for S = 0.
+    """
+    q = P / rho0
+    return 2.0 * q / (C0 + np.sqrt(C0 * C0 + 4.0 * S * q))
+
+
+@dataclass
+class LinearFit:
+    """Least-squares line y = intercept + slope * x. Arrays have the batch shape of the inputs (0-d for 1-D inputs)."""
+    slope: np.ndarray
+    intercept: np.ndarray
+    n: np.ndarray
+    rms: Optional[np.ndarray] = None
+    slope_stderr: Optional[np.ndarray] = None
+    intercept_stderr: Optional[np.ndarray] = None
+
+
+def linear_fit(x: npt.ArrayLike, y: npt.ArrayLike, mask: Optional[npt.ArrayLike] = None, return_stats: bool = False) -> LinearFit:
+    """
+    Closed-form least-squares line fit along the last axis, from the sums of x, y, xy and x**2 (and y**2 for stats).
+    Works on 1-D inputs or batched (..., n_points) inputs in one pass, without per-fit Python overhead.
+    Data are shifted by their middle point before summing to limit cancellation in the centered sums.
+    :param x: x values, shape (..., n_points)
+    :param y: y values, broadcastable with x
+    :param mask: optional boolean array; only points where it is True are used (values elsewhere may be nan/inf)
+    :param return_stats: also return the residual RMS and the standard errors of slope and intercept
+    :returns: LinearFit; slope and intercept are nan where fewer than 2 points are used, stats are nan below 3 points
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    mid = x.shape[-1] // 2
+    x0 = x[..., mid:mid + 1]
+    y0 = y[..., mid:mid + 1]
+    if mask is None:
+        n = np.full(x.shape[:-1], float(x.shape[-1]))
+        xs = x - x0
+        ys = y - y0
+    else:
+        mask = np.broadcast_to(mask, x.shape)
+        n = np.count_nonzero(mask, axis=-1).astype(float)
+        # The middle point may itself be masked out (nan/inf); shift by zero there
+        x0 = np.where(mask[..., mid:mid + 1], x0, 0.0)
+        y0 = np.where(mask[..., mid:mid + 1], y0, 0.0)
+        xs = np.where(mask, x - x0, 0.0)
+        ys = np.where(mask, y - y0, 0.0)
+    x0 = x0[..., 0]
+    y0 = y0[..., 0]
+
+    sum_x = xs.sum(axis=-1)
+    sum_y = ys.sum(axis=-1)
+    sum_xx = np.einsum('...i,...i->...', xs, xs)
+    sum_xy = np.einsum('...i,...i->...', xs, ys)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx = sum_xx - sum_x * sum_x / n
+        sxy = sum_xy - sum_x * sum_y / n
+        slope = np.where(n >= 2, sxy / sxx, np.nan)
+        # Undo the shift by (x0, y0)
+        intercept = (sum_y - slope * sum_x) / n + y0 - slope * x0
+        fit = LinearFit(slope=slope, intercept=intercept, n=n)
+        if return_stats:
+            syy = np.einsum('...i,...i->...', ys, ys) - sum_y * sum_y / n
+            sse = np.maximum(syy - slope * sxy, 0.0)
+            dof = np.where(n > 2, n - 2, np.nan)
+            fit.rms = np.sqrt(sse / n)
+            residual_var = sse / dof
+            fit.slope_stderr = np.sqrt(residual_var / sxx)
+            fit.intercept_stderr = np.sqrt(residual_var * (1.0 / n + (sum_x / n + x0) ** 2 / sxx))
+    return fit
+
+
 def generate_mixed_hugoniot(
     name, material1, material2, Vx_mat1, Up=np.linspace(0, 8, 1000)
 ):
@@ -75,7 +156,8 @@ def generate_mixed_hugoniot(
     else:
         # Normal case with multiple points
         mixed_Us = P[1:] / (rho_mix * mixed_Up[1:])
-        regression = np.polyfit(mixed_Up[1:], mixed_Us, 1)
+        fit = linear_fit(mixed_Up[1:], mixed_Us)
+        regression = [float(fit.slope), float(fit.intercept)]
     names = [material1.name, material2.name]
     vols = [Vx_mat1, 1 - Vx_mat1]
     mfracs = [x_mat1, 1 - x_mat1]
@@ -85,6 +167,7 @@ def generate_mixed_hugoniot(
 
 
 def generate_table(c0_values, s_values, rho_values, ):
+    from fasthtml.common import Table, Tr, Th, Td
     # Create the basic structure of the table
     table = Table(
         Tr(
@@ -102,7 +185,105 @@ def generate_table(c0_values, s_values, rho_values, ):
     
     return table
 
-def plot_mixture(material1, material2, volpercent, upmin=0, upmax=6):
+@lru_cache(maxsize=1)
+def _default_template() -> dict:
+    """The layout template go.Figure applies by default, so figures built as dicts look the same."""
+    import plotly.graph_objs as go
+    return go.Figure().to_plotly_json()["layout"].get("template", {})
+
+
+def _scatter(x, y, name: str, line: dict) -> dict:
+    """A line trace as a plain dict, equivalent to go.Scatter(x=x, y=y, mode="lines", name=name, line=line)."""
+    return {"type": "scatter", "x": x, "y": y, "mode": "lines", "name": name, "line": line}
+
+
+def _figure(traces: List[dict], title: str, xaxis_title: str, yaxis_title: str, **layout) -> dict:
+    """
+    A figure as a plain dict. Building go.Figure/go.Scatter objects runs plotly's property validation on every
+    trace, which dominates plotting time; plain dicts skip it and serialize to the same JSON.
+    """
+    return {
+        "data": traces,
+        "layout": {
+            "title": {"text": title},
+            "xaxis": {"title": {"text": xaxis_title}},
+            "yaxis": {"title": {"text": yaxis_title}},
+            **layout,
+            "template": _default_template(),
+        },
+    }
+
+
+PLOT_MODES = ("html", "json")
+ARRAY_ENCODINGS = ("b64", "list")
+
+
+def _encode_figure_arrays(obj, array_encoding):
+    """Recursively encode numeric arrays as Plotly typed arrays (b64) or as plain lists with non-finite values as null."""
+    if isinstance(obj, np.ndarray):
+        if array_encoding == "b64" and obj.dtype.kind in "fiu":
+            arr = np.ascontiguousarray(obj)
+            return {"dtype": arr.dtype.str.lstrip("<|="), "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+        if obj.dtype.kind == "f":
+            return [None if not np.isfinite(v) else v for v in obj.tolist()]
+        return obj.tolist()
+    if isinstance(obj, dict):
+        if "bdata" in obj and "dtype" in obj and array_encoding == "list":
+            # Typed array already encoded by plotly; decode it back to numbers
+            arr = np.frombuffer(base64.b64decode(obj["bdata"]), dtype=np.dtype(obj["dtype"]))
+            if "shape" in obj:
+                arr = arr.reshape([int(n) for n in str(obj["shape"]).split(",")])
+            return _encode_figure_arrays(arr, array_encoding)
+        return {key: _encode_figure_arrays(value, array_encoding) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_encode_figure_arrays(value, array_encoding) for value in obj]
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def figure_to_json(fig, array_encoding: str = "b64") -> str:
+    """
+    Serialize a figure to compact JSON for Plotly.newPlot.
+    :param fig: plotly Figure or a dict with "data" and "layout"
+    :param array_encoding: "b64" for base64 typed arrays (smallest, needs plotly.js >= 2.28) or "list" for plain JSON lists
+    :returns: JSON text that is safe to embed inside a <script> element
+    """
+    if array_encoding not in ARRAY_ENCODINGS:
+        raise ValueError(f"array_encoding must be one of {ARRAY_ENCODINGS}, got {array_encoding!r}")
+    fig_dict = fig.to_plotly_json() if hasattr(fig, "to_plotly_json") else fig
+    fig_dict = _encode_figure_arrays({key: fig_dict[key] for key in ("data", "layout", "config") if key in fig_dict},
+                                     array_encoding)
+    return json.dumps(fig_dict, separators=(",", ":"), allow_nan=False).replace("</", "<\\/")
+
+
+def figure_fragment(fig, plot_mode: str = "html", include_plotlyjs=False, array_encoding: str = "b64"):
+    """
+    Render one figure for embedding in a page.
+    In "html" mode this is plotly's own HTML/JS snippet, without plotly.js itself (include_plotlyjs defaults to False):
+    the page already loads the locally served bundle, so fragments never pull it from the CDN. In "json" mode it is an empty target div plus the figure
+    JSON in a <script type="application/json" data-plotly-figure=...> element, which the page's renderer script
+    draws with the locally served plotly.js bundle.
+    """
+    if plot_mode not in PLOT_MODES:
+        raise ValueError(f"plot_mode must be one of {PLOT_MODES}, got {plot_mode!r}")
+    from fasthtml.common import Div, NotStr, Script
+    if plot_mode == "json":
+        div_id = f"plot-{uuid.uuid4().hex}"
+        return Div(
+            Div(id=div_id, cls="plotly-json-figure"),
+            Script(figure_to_json(fig, array_encoding), type="application/json", data_plotly_figure=div_id),
+        )
+    if hasattr(fig, "to_html"):
+        return NotStr(fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs))
+    import plotly.io as pio
+    return NotStr(pio.to_html(fig, full_html=False, include_plotlyjs=include_plotlyjs, validate=False))
+
+
+def plot_mixture(material1, material2, volpercent, upmin=0, upmax=6, plot_mode="html", array_encoding="b64"):
+    from fasthtml.common import Div
     up1 = np.linspace(upmin, upmax, 1000)
     mix = generate_mixed_hugoniot(
         f"vol{str(volpercent) + material1.name + material2.name}",
@@ -112,90 +293,123 @@ def plot_mixture(material1, material2, volpercent, upmin=0, upmax=6):
         up1,
     )
     P = material1.hugoniot_P(up1)
-    upmix = mix.solve_up(P)
-    up2 = material2.solve_up(P)
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=up1,
-            y=P,
-            mode="lines",
-            name=material1.name,
-            line=dict(color="blue", width=3),
-        )
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=material2.solve_up(P),
-            y=P,
-            mode="lines",
-            name=material2.name,
-            line=dict(color="red", width=3),
-        )
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=mix.solve_up(P),
-            y=P,
-            mode="lines",
-            name=f"{mix.vfracs[0] * 100:.1f} %v {material1.name}",
-            line=dict(color="magenta", dash="dash", width=3),
-        )
-    )
-    fig.update_layout(
+    mix_label = f"{mix.vfracs[0] * 100:.1f} %v {material1.name}"
+    fig = _figure(
+        [
+            _scatter(up1, P, material1.name, dict(color="blue", width=3)),
+            _scatter(material2.solve_up(P), P, material2.name, dict(color="red", width=3)),
+            _scatter(mix.solve_up(P), P, mix_label, dict(color="magenta", dash="dash", width=3)),
+        ],
         title="Pressure vs Particle Velocity",
         xaxis_title="up (km/s)",
         yaxis_title="P (GPa)",
         legend=dict(font=dict(size=14)),
     )
-    fig2 = go.Figure()
-    fig2.add_trace(
-        go.Scatter(
-            x=up1,
-            y=mix.hugoniot_eos(up1),
-            mode="lines",
-            name=f"{mix.vfracs[0] * 100:.1f} %v {material1.name}",
-            line=dict(color="magenta", dash="dash", width=3),
-        )
-    )
-    fig2.add_trace(
-        go.Scatter(
-            x=up1,
-            y=material1.hugoniot_eos(up1),
-            mode="lines",
-            name=material1.name,
-            line=dict(color="blue", width=3),
-        )
-    )
-    fig2.add_trace(
-        go.Scatter(
-            x=up1,
-            y=material2.hugoniot_eos(up1),
-            mode="lines",
-            name=material2.name,
-            line=dict(color="red", width=3),
-        )
-    )
-    fig2.update_layout(
+    fig2 = _figure(
+        [
+            _scatter(up1, mix.hugoniot_eos(up1), mix_label, dict(color="magenta", dash="dash", width=3)),
+            _scatter(up1, material1.hugoniot_eos(up1), material1.name, dict(color="blue", width=3)),
+            _scatter(up1, material2.hugoniot_eos(up1), material2.name, dict(color="red", width=3)),
+        ],
         title="Shock Velocity vs Particle Velocity",
         xaxis_title="Up",
         yaxis_title="Us",
         legend=dict(font=dict(size=14)),
     )
     mixedtable = generate_table(mix.C0, mix.S, mix.rho0)
-    newdiv = Div(mixedtable,NotStr(fig.to_html(full_html=False)), NotStr(fig2.to_html(full_html=False)), )
+    newdiv = Div(
+        mixedtable,
+        figure_fragment(fig, plot_mode, array_encoding=array_encoding),
+        figure_fragment(fig2, plot_mode, array_encoding=array_encoding),
+    )
 
     return newdiv
 
 
+def _eos_key(eos: HugoniotEOS) -> Tuple[float, float, float]:
+    return (float(eos.rho0), float(eos.C0), float(eos.S))
+
+
+def _up_grid_key(Up_ref: np.ndarray) -> Tuple:
+    return (Up_ref.shape, hashlib.blake2b(Up_ref.tobytes(), digest_size=16).hexdigest())
+
+
+class ComponentUpCache:
+    """
+    Bounded LRU cache of the per-component arrays used when mixing Hugoniots.
+    The common pressures depend only on the reference (first) material and the Up grid, and each component's
+    solve_up(P_common) does not depend on the volume fractions, so both are kept between calls. Entries are
+    keyed on the EOS parameters (not names) and a digest of the Up grid. Cached arrays are read-only.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_or_compute(self, key, compute):
+        with self._lock:
+            arr = self._entries.get(key)
+            if arr is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return arr
+            self.misses += 1
+        arr = np.asarray(compute(), dtype=float)
+        arr.setflags(write=False)
+        with self._lock:
+            self._entries[key] = arr
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return arr
+
+    def component_up(self, reference: HugoniotEOS, components: List[HugoniotEOS], Up_ref: npt.ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param reference: material whose Hugoniot turns Up_ref into the common pressures
+        :param components: component EOS to solve for up at the common pressures
+        :param Up_ref: array of reference particle velocities
+        :returns: (P_common, up array of shape (n_components, n_points))
+        """
+        Up_ref = np.asarray(Up_ref, dtype=float)
+        grid_key = _up_grid_key(Up_ref)
+        ref_key = _eos_key(reference)
+        P_common = self._get_or_compute(("P", ref_key, grid_key), lambda: reference.hugoniot_P(Up_ref))
+        component_up = [
+            self._get_or_compute(("up", ref_key, _eos_key(eos), grid_key), lambda eos=eos: eos.solve_up(P_common))
+            for eos in components
+        ]
+        return P_common, np.stack(component_up) if component_up else np.empty((0, Up_ref.size))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, size=len(self._entries), maxsize=self.maxsize)
+
+
+component_up_cache = ComponentUpCache()
+
+
 # New function for generating mixed Hugoniot for multiple materials
-def generate_mixed_hugoniot_many(name: str, material_data_list: List[Tuple[HugoniotEOS, float]], Up_ref: npt.ArrayLike) -> MixedHugoniotEOS:
+def generate_mixed_hugoniot_many(name: str, material_data_list: List[Tuple[HugoniotEOS, float]], Up_ref: npt.ArrayLike,
+                                 sigmas: Optional[npt.ArrayLike] = None, vfrac_sigmas: Optional[npt.ArrayLike] = None,
+                                 n_samples: int = 10_000, seed: Optional[int] = None) -> MixedHugoniotEOS:
     """
     Generates a mixed Hugoniot for a given list of materials and their volume fractions.
     :param name: name of new mixture
     :param material_data_list: list of tuples containing the material EOS and its respective volume fraction [(mat1_eos, vx1), ...]
     :param Up_ref: array of particle velocities to solve for. This will be applied to the first material to get a P, 
                    after which Up will be solved for other materials at these pressures.
+    :param sigmas: optional (n_components, 3) standard deviations of each component's (rho0, C0, S). If given, the result
+                   also carries .uncertainty, a MixtureUncertainty from generate_mixed_hugoniot_uncertainty.
+    :param vfrac_sigmas, n_samples, seed: passed to generate_mixed_hugoniot_uncertainty when sigmas is given
     :returns: MixedHugoniotEOS
     :raises ValueError: if sum of volume fractions is not close to 1 or material list is empty.
     """
@@ -207,13 +421,13 @@ def generate_mixed_hugoniot_many(name: str, material_data_list: List[Tuple[Hugon
         raise ValueError(f"Volume fractions must sum to 1.0, but sum to {v_fracs_sum:.4f}")
 
     mat1_eos, _ = material_data_list[0]
-    P_common = mat1_eos.hugoniot_P(Up_ref)
 
     component_eos_list = [item[0] for item in material_data_list]
     component_vfrac_list = [item[1] for item in material_data_list]
     component_names = [eos.name for eos in component_eos_list]
 
-    component_up_list = [eos.solve_up(P_common) for eos in component_eos_list]
+    # P_common and the per-component up arrays do not depend on the volume fractions, so they are reused between calls
+    P_common, component_up_list = component_up_cache.component_up(mat1_eos, component_eos_list, Up_ref)
     
     masses = [eos.rho0 * vfrac for eos, vfrac in material_data_list]
     total_mass = sum(masses)
@@ -234,6 +448,7 @@ def generate_mixed_hugoniot_many(name: str, material_data_list: List[Tuple[Hugon
     mixed_Up = np.sqrt(sum_up_squared_times_mass_frac)
     
     C0_mix, S_mix = mat1_eos.C0, 0.0 # Default fallback
+    fit = None
 
     # With minimum 20 points enforced at validation, we can safely perform linear regression
     # Use indices from the second point onwards if Up_ref[0] is 0 (common case)
@@ -248,88 +463,424 @@ def generate_mixed_hugoniot_many(name: str, material_data_list: List[Tuple[Hugon
         
         mixed_Us_calc = p_for_fit / (rho_mix * up_for_fit)
         
-        regression = LR(up_for_fit, mixed_Us_calc)
-        C0_mix = regression.intercept
-        S_mix = regression.slope
+        fit = linear_fit(up_for_fit, mixed_Us_calc, return_stats=True)
+        C0_mix = float(fit.intercept)
+        S_mix = float(fit.slope)
     else:
         # This should rarely happen with 20+ points, but keep as fallback
-        print("Warning: Not enough valid data points for Us-Up linear regression. Using C0 of first component and S=0 for mixture.")
+        logger.warning("Not enough valid data points for Us-Up linear regression. "
+                       "Using C0 of first component and S=0 for mixture.")
 
     mixed_eos_obj = MixedHugoniotEOS(name, rho_mix, C0_mix, S_mix, component_names, component_vfrac_list)
     mixed_eos_obj.mfracs = component_mass_frac_list
+    # Fit quality: residual RMS of Us (km/s) and standard errors of C0 and S
+    mixed_eos_obj.fit = fit
+    if sigmas is not None:
+        mixed_eos_obj.uncertainty = generate_mixed_hugoniot_uncertainty(
+            material_data_list, Up_ref, sigmas, vfrac_sigmas=vfrac_sigmas, n_samples=n_samples, seed=seed
+        )
     return mixed_eos_obj
 
-# New plot function for multiple materials using Plotly
-def plot_mixture_many(original_material_configs: List[Tuple[HugoniotEOS, float]], 
-                      mixed_eos: MixedHugoniotEOS, 
-                      up_min: float, up_max: float, num_points: int = 200):
-    
-    up_plot_range = np.linspace(up_min, up_max, num_points)
-    # Ensure up_plot_range is never empty or single point if up_min=up_max
-    if up_min == up_max:
-        if up_min == 0: up_plot_range = np.array([0, 1e-6]) # Tiny range if both are 0
-        else: up_plot_range = np.array([up_min, up_min + 1e-6*(abs(up_min) if up_min !=0 else 1)])
+
+DEFAULT_PERCENTILES = (2.5, 16.0, 50.0, 84.0, 97.5)
+
+
+@dataclass
+class MixtureUncertainty:
+    """Monte Carlo statistics of a mixture's (rho0, C0, S); vectors and matrices are in that order."""
+    mean: np.ndarray
+    cov: np.ndarray
+    percentiles: Dict[float, np.ndarray]
+    n_samples: int
+    # Samples whose fit failed (e.g. a negative sampled density) are left out of the statistics
+    n_valid: int
+    samples: Optional[np.ndarray] = None
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(np.diag(self.cov))
+
+
+def _mixture_parameter_samples(rho0: np.ndarray, C0: np.ndarray, S: np.ndarray, vfracs: np.ndarray,
+                               Up_ref: np.ndarray) -> np.ndarray:
+    """
+    (rho0, C0, S) of the mixture for every row of sampled component parameters, each of shape (n_samples, n_components).
+    Same construction as generate_mixed_hugoniot_many, with the reference pressures and component up arrays
+    computed as (n_points, n_samples) arrays (per-sample constants then broadcast along the contiguous axis) and all
+    fits done at once.
+    """
+    rho0, C0, S, vfracs = rho0.T, C0.T, S.T, vfracs.T  # (n_components, n_samples)
+    Up = Up_ref[:, None]
+    P_common = rho0[0] * (C0[0] + S[0] * Up) * Up
+    masses = vfracs * rho0
+    rho_mix = masses.sum(axis=0)
+    mfracs = masses / rho_mix
+
+    # The reference component's up is Up_ref itself; the others use the stable root of up_from_pressure.
+    # With k = rho_i / (2 sqrt(m_i)), m_i up_i^2 = (P / w)^2 where w = k C0_i + sqrt((k C0_i)^2 + 4 k^2 S_i P / rho_i),
+    # so every per-sample constant is folded in before touching the (n_points, n_samples) arrays and each component
+    # costs seven passes over them. Accumulating in place keeps memory at a few (n_points, n_samples) buffers.
+    up_squared = mfracs[0] * np.square(Up)
+    work = np.empty_like(P_common)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for i in range(1, vfracs.shape[0]):
+            absent = mfracs[i] == 0
+            if absent.all():
+                continue
+            k = rho0[i] / (2.0 * np.sqrt(mfracs[i]))
+            kC0 = k * C0[i]
+            np.multiply(P_common, 4.0 * k * k * S[i] / rho0[i], out=work)
+            work += kC0 * kC0
+            np.sqrt(work, out=work)
+            work += kC0
+            np.divide(P_common, work, out=work)
+            np.square(work, out=work)
+            if absent.any():
+                work[:, absent] = 0.0  # k is infinite there; a component with no mass contributes nothing
+            up_squared += work
+        x_squared = up_squared[1:]
+        mixed_Up = np.sqrt(x_squared)
+        valid = mixed_Up > 1e-9
+        P_fit = P_common[1:]
+        if not valid.all():
+            mixed_Us = P_fit / (rho_mix * mixed_Up)
+            fit = linear_fit(mixed_Up.T, mixed_Us.T, mask=valid.T)
+            return np.column_stack((rho_mix, fit.intercept, fit.slope))
+
+        # Every point is usable, so the least-squares sums come straight from arrays already at hand:
+        # sum(x^2) is the accumulated up^2 and sum(x y) = sum(P) / rho_mix, since y = P / (rho_mix x)
+        n = P_fit.shape[0]
+        sum_x = mixed_Up.sum(axis=0)
+        sum_xx = x_squared.sum(axis=0)
+        np.divide(P_fit, mixed_Up, out=mixed_Up)
+        sum_y = mixed_Up.sum(axis=0) / rho_mix
+        sum_xy = P_fit.sum(axis=0) / rho_mix
+        slope = (sum_xy - sum_x * sum_y / n) / (sum_xx - sum_x * sum_x / n)
+        intercept = (sum_y - slope * sum_x) / n
+    return np.column_stack((rho_mix, intercept, slope))
+
+
+def generate_mixed_hugoniot_uncertainty(material_data_list: List[Tuple[HugoniotEOS, float]], Up_ref: npt.ArrayLike,
+                                        sigmas: npt.ArrayLike, vfrac_sigmas: Optional[npt.ArrayLike] = None,
+                                        n_samples: int = 10_000, seed: Optional[int] = None,
+                                        percentiles: Tuple[float, ...] = DEFAULT_PERCENTILES,
+                                        chunk_size: int = 512, keep_samples: bool = False) -> MixtureUncertainty:
+    """
+    Propagates component EOS uncertainty through the mixture fit by Monte Carlo.
+    Component parameters are drawn from independent normal distributions. Sampled volume fractions are clipped
+    at zero and renormalized to sum to 1. Cost grows with n_samples x components x points: 1e5 samples stay well
+    under a second while components x len(Up_ref) <= 1000 (e.g. 10 components on the default 100-point grid);
+    benchmarks/bench_suite.py checks this.
+    :param material_data_list: [(mat1_eos, vx1), ...] as for generate_mixed_hugoniot_many
+    :param Up_ref: particle velocities applied to the first material, as for generate_mixed_hugoniot_many
+    :param sigmas: (n_components, 3) standard deviations of (rho0, C0, S) for each component
+    :param vfrac_sigmas: optional (n_components,) standard deviations of the volume fractions
+    :param n_samples: number of Monte Carlo samples
+    :param seed: seed for numpy's default_rng, for reproducible draws
+    :param chunk_size: samples evaluated per batched pass; the default keeps the working arrays in cache
+    :param keep_samples: also return the (n_valid, 3) accepted samples
+    :returns: MixtureUncertainty
+    :raises ValueError: if sigmas or vfrac_sigmas have the wrong shape or are negative, or no sample gives a valid fit
+    """
+    if not material_data_list:
+        raise ValueError("Material list cannot be empty.")
+    n_components = len(material_data_list)
+    sigmas = np.asarray(sigmas, dtype=float)
+    if sigmas.shape != (n_components, 3) or np.any(sigmas < 0):
+        raise ValueError(f"sigmas must be a non-negative array of shape ({n_components}, 3)")
+    if vfrac_sigmas is not None:
+        vfrac_sigmas = np.asarray(vfrac_sigmas, dtype=float)
+        if vfrac_sigmas.shape != (n_components,) or np.any(vfrac_sigmas < 0):
+            raise ValueError(f"vfrac_sigmas must be a non-negative array of shape ({n_components},)")
+
+    means = np.array([[eos.rho0, eos.C0, eos.S] for eos, _ in material_data_list], dtype=float)
+    vfrac_means = np.array([vfrac for _, vfrac in material_data_list], dtype=float)
+    Up_ref = np.asarray(Up_ref, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    # All draws up front (small: n_samples x n_components), so results do not depend on chunk_size
+    params = rng.normal(means, sigmas, size=(n_samples, n_components, 3))
+    if vfrac_sigmas is None:
+        vfracs = np.broadcast_to(vfrac_means, (n_samples, n_components))
+    else:
+        vfracs = np.clip(rng.normal(vfrac_means, vfrac_sigmas, size=(n_samples, n_components)), 0.0, None)
+        vfracs = vfracs / vfracs.sum(axis=1, keepdims=True)
+
+    chunks = []
+    for start in range(0, n_samples, chunk_size):
+        rows = slice(start, start + chunk_size)
+        chunks.append(_mixture_parameter_samples(params[rows, :, 0], params[rows, :, 1], params[rows, :, 2],
+                                                 vfracs[rows], Up_ref))
+
+    samples = np.concatenate(chunks)
+    samples = samples[np.isfinite(samples).all(axis=1)]
+    if not len(samples):
+        raise ValueError(f"None of the {n_samples} Monte Carlo samples gave a valid fit; check the sigmas.")
+    return MixtureUncertainty(
+        mean=samples.mean(axis=0),
+        cov=np.atleast_2d(np.cov(samples, rowvar=False)),
+        percentiles=dict(zip(percentiles, np.percentile(samples, percentiles, axis=0))),
+        n_samples=n_samples,
+        n_valid=len(samples),
+        samples=samples if keep_samples else None,
+    )
+
+@dataclass
+class MixtureJacobian:
+    """
+    Partial derivatives of a mixture's (rho0, C0, S) with respect to each component's volume fraction and EOS parameters.
+    Every derivative array has shape (3, n_components): rows are d(rho0, C0, S)_mix, columns are components.
+    The vfrac derivatives treat each fraction as independent; for a change that keeps the sum at 1, combine columns,
+    e.g. moving volume from component j to component i changes the mixture by vfrac[:, i] - vfrac[:, j] per unit.
+    """
+    value: np.ndarray
+    vfrac: np.ndarray
+    rho0: np.ndarray
+    C0: np.ndarray
+    S: np.ndarray
 
 
-    # P-Up plot
-    fig_p_up = go.Figure()
+def mixture_jacobian(material_data_list: List[Tuple[HugoniotEOS, float]], Up_ref: npt.ArrayLike) -> MixtureJacobian:
+    """
+    Fits the mixture as generate_mixed_hugoniot_many does and propagates tangents of all 4 * n_components inputs
+    through the same arrays (forward mode), so the Jacobian costs one vectorized pass instead of 2N finite-difference fits.
+    :param material_data_list: [(mat1_eos, vx1), ...]; the first material is the pressure reference
+    :param Up_ref: particle velocities applied to the first material to get the common pressures
+    :returns: MixtureJacobian; value holds the mixture's (rho0, C0, S)
+    :raises ValueError: if the material list is empty or fewer than 2 points are usable for the fit
+    """
+    if not material_data_list:
+        raise ValueError("Material list cannot be empty.")
+    n = len(material_data_list)
+    vfracs = np.array([vfrac for _, vfrac in material_data_list], dtype=float)
+    rho0 = np.array([eos.rho0 for eos, _ in material_data_list], dtype=float)
+    C0 = np.array([eos.C0 for eos, _ in material_data_list], dtype=float)
+    S = np.array([eos.S for eos, _ in material_data_list], dtype=float)
+    Up_ref = np.asarray(Up_ref, dtype=float)
+    n_points = Up_ref.size
+
+    # Tangent arrays carry leading axes (group, j): group 0..3 = d/d(vfrac, rho0, C0, S) of component j
+    P = rho0[0] * (C0[0] + S[0] * Up_ref) * Up_ref
+    dP = np.zeros((4, n, n_points))
+    dP[1, 0] = (C0[0] + S[0] * Up_ref) * Up_ref
+    dP[2, 0] = rho0[0] * Up_ref
+    dP[3, 0] = rho0[0] * Up_ref * Up_ref
+
+    # Component particle velocities at the common pressures; the reference's is Up_ref itself
+    up = np.empty((n, n_points))
+    up[0] = Up_ref
+    up[1:] = up_from_pressure(rho0[1:, None], C0[1:, None], S[1:, None], P)
+    # Implicit derivative of rho_i (C_i + S_i up) up = P: dup = (dP - d(own params) terms) / (rho_i (C_i + 2 S_i up))
+    dF_dup = rho0[:, None] * (C0[:, None] + 2.0 * S[:, None] * up)
+    own = np.stack([np.zeros_like(up), up * (C0[:, None] + S[:, None] * up), rho0[:, None] * up,
+                    rho0[:, None] * up * up])
+    dup = np.broadcast_to(dP[:, :, None, :], (4, n, n, n_points)).copy()
+    index = np.arange(n)
+    dup[:, index, index] -= own
+    dup /= dF_dup
+    dup[:, :, 0] = 0.0
+
+    masses = vfracs * rho0
+    rho_mix = masses.sum()
+    w = masses / rho_mix
+    drho_mix = np.zeros((4, n))
+    drho_mix[0] = rho0
+    drho_mix[1] = vfracs
+    dmasses = np.zeros((4, n, n))
+    dmasses[0, index, index] = rho0
+    dmasses[1, index, index] = vfracs
+    dw = (dmasses - w[None, None, :] * drho_mix[:, :, None]) / rho_mix
+
+    U2 = w @ np.square(up)
+    dU2 = np.einsum('gji,ip->gjp', dw, np.square(up)) + 2.0 * np.einsum('i,ip,gjip->gjp', w, up, dup)
+
+    # Same point selection as generate_mixed_hugoniot_many: skip the first point and any tiny Up
+    U = np.sqrt(U2[1:])
+    valid = U > 1e-9
+    if np.count_nonzero(valid) < 2:
+        raise ValueError("Not enough valid data points for the Us-Up fit.")
+    x = U[valid]
+    dx = (dU2[:, :, 1:] / (2.0 * U))[..., valid]
+    y = P[1:][valid] / (rho_mix * x)
+    dy = y * (dP[:, :, 1:][..., valid] / P[1:][valid] - (drho_mix / rho_mix)[..., None] - dx / x)
+
+    # Least-squares line and its tangent: slope = sxy / sxx, intercept = mean(y) - slope * mean(x)
+    xc = x - x.mean()
+    yc = y - y.mean()
+    sxx = xc @ xc
+    slope = (xc @ yc) / sxx
+    intercept = y.mean() - slope * x.mean()
+    dsxy = dx @ yc + dy @ xc
+    dsxx = 2.0 * (dx @ xc)
+    dslope = (dsxy - slope * dsxx) / sxx
+    dintercept = dy.mean(axis=-1) - dslope * x.mean() - slope * dx.mean(axis=-1)
+
+    jac = np.stack([drho_mix, dintercept, dslope], axis=1)  # (4, 3, n)
+    return MixtureJacobian(value=np.array([rho_mix, intercept, slope]), vfrac=jac[0], rho0=jac[1], C0=jac[2], S=jac[3])
+
+
+@dataclass
+class MixtureBatchResult:
+    """Mixture parameters for many compositions of one material set (one row per composition)."""
+    components: List[str]
+    vfracs: np.ndarray
+    mfracs: np.ndarray
+    rho0: np.ndarray
+    C0: np.ndarray
+    S: np.ndarray
+    fit_rms: Optional[np.ndarray] = None
+    C0_stderr: Optional[np.ndarray] = None
+    S_stderr: Optional[np.ndarray] = None
+    fit_points: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self.rho0)
+
+    def to_eos(self, index: int, name: str) -> MixedHugoniotEOS:
+        """Returns composition `index` of the batch as a MixedHugoniotEOS."""
+        mixed = MixedHugoniotEOS(name, float(self.rho0[index]), float(self.C0[index]), float(self.S[index]),
+                                 list(self.components), self.vfracs[index].tolist())
+        mixed.mfracs = self.mfracs[index].tolist()
+        if self.fit_points is not None:
+            mixed.fit = LinearFit(slope=self.S[index], intercept=self.C0[index], n=self.fit_points[index],
+                                  rms=self.fit_rms[index], slope_stderr=self.S_stderr[index],
+                                  intercept_stderr=self.C0_stderr[index])
+        return mixed
+
+
+def generate_mixed_hugoniot_batch(materials: List[HugoniotEOS], vfracs: npt.ArrayLike, Up_ref: npt.ArrayLike) -> MixtureBatchResult:
+    """
+    Generates mixed Hugoniots for many compositions of the same materials in one vectorized pass.
+    Each row gives the same result as generate_mixed_hugoniot_many for that composition.
+    :param materials: list of component EOS. The first material is used to get the reference pressures, as in generate_mixed_hugoniot_many.
+    :param vfracs: (n_compositions, n_components) array of volume fractions. Each row must sum to 1; zero entries are allowed.
+    :param Up_ref: array of particle velocities applied to the first material to get the common pressures.
+    :returns: MixtureBatchResult with arrays of rho0, C0 and S of shape (n_compositions,) and mass fractions of shape (n_compositions, n_components)
+    :raises ValueError: if the material list is empty, vfracs has the wrong shape or is negative, or a row does not sum to 1.
+    """
+    if not materials:
+        raise ValueError("Material list cannot be empty.")
+
+    vfracs = np.atleast_2d(np.asarray(vfracs, dtype=float))
+    if vfracs.ndim != 2 or vfracs.shape[1] != len(materials):
+        raise ValueError(f"vfracs must have shape (n_compositions, {len(materials)}), got {vfracs.shape}")
+    if np.any(vfracs < 0):
+        raise ValueError("Volume fractions cannot be negative.")
+
+    row_sums = vfracs.sum(axis=1)
+    bad_rows = np.flatnonzero(~np.isclose(row_sums, 1.0))
+    if bad_rows.size:
+        i = bad_rows[0]
+        raise ValueError(f"Volume fractions must sum to 1.0, but composition {i} sums to {row_sums[i]:.4f}")
+
+    # (n_points,) and (n_components, n_points); reused between calls with the same materials and Up grid
+    P_common, component_up = component_up_cache.component_up(materials[0], materials, Up_ref)
+
+    masses = vfracs * np.array([eos.rho0 for eos in materials])
+    rho_mix = masses.sum(axis=1)
+    mfracs = masses / rho_mix[:, None]
+
+    # Mass-weighted sum of up**2 for every composition at once: (n_compositions, n_points)
+    mixed_Up = np.sqrt(mfracs @ np.square(component_up))
+
+    # Same point selection as generate_mixed_hugoniot_many: skip the first point and any tiny Up
+    up_for_fit = mixed_Up[:, 1:]
+    valid_fit = up_for_fit > 1e-9
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mixed_Us = P_common[1:] / (rho_mix[:, None] * up_for_fit)
+    fit = linear_fit(up_for_fit, mixed_Us, mask=valid_fit, return_stats=True)
+    S_mix, C0_mix = fit.slope, fit.intercept
+
+    too_few = fit.n < 2
+    if np.any(too_few):
+        logger.warning("Not enough valid data points for Us-Up linear regression in %d compositions. "
+                       "Using C0 of first component and S=0.", np.count_nonzero(too_few))
+        C0_mix = np.where(too_few, materials[0].C0, C0_mix)
+        S_mix = np.where(too_few, 0.0, S_mix)
+
+    return MixtureBatchResult(
+        components=[eos.name for eos in materials],
+        vfracs=vfracs,
+        mfracs=mfracs,
+        rho0=rho_mix,
+        C0=C0_mix,
+        S=S_mix,
+        fit_rms=fit.rms,
+        C0_stderr=fit.intercept_stderr,
+        S_stderr=fit.slope_stderr,
+        fit_points=fit.n,
+    )
+
+def build_mixture_figures(original_material_configs: List[Tuple[HugoniotEOS, float]],
+                          mixed_eos: MixedHugoniotEOS, up_plot_range: np.ndarray) -> Tuple[dict, dict]:
+    """
+    Build the P-Up and Us-Up figures for a mixture and its components as plain dicts.
+    :returns: (P-Up figure, Us-Up figure), each a dict with "data" and "layout" ready for figure_to_json or plotly.io
+    """
     # Use the mixed EOS's Up range to generate a common P range for plotting consistency
     # This P_common will be used to solve for Up for all components for plotting P-Up
     P_plot_common = mixed_eos.hugoniot_P(up_plot_range)
+    component_labels = [f"{mat_orig.name} ({vfrac*100:.1f}%)" for mat_orig, vfrac in original_material_configs]
+    mix_label = f"{mixed_eos.name} (Mix)"
+    mix_line = dict(dash='dash', width=3, color='black')
+
+    fig_p_up = _figure(
+        [
+            # Solve for original material's Up at the common pressure range
+            _scatter(mat_orig.solve_up(P_plot_common), P_plot_common, label, dict(width=2))
+            for (mat_orig, _), label in zip(original_material_configs, component_labels)
+        ] + [
+            # Plot the mixed material's P-Up curve directly using its own Up range
+            _scatter(up_plot_range, P_plot_common, mix_label, mix_line)
+        ],
+        title="Pressure vs. Particle Velocity",
+        xaxis_title="Up (km/s)",
+        yaxis_title="P (GPa)",
+        legend=dict(title=dict(text='Materials')),
+    )
+    fig_us_up = _figure(
+        [
+            _scatter(up_plot_range, mat_orig.hugoniot_eos(up_plot_range), label, dict(width=2))
+            for (mat_orig, _), label in zip(original_material_configs, component_labels)
+        ] + [
+            _scatter(up_plot_range, mixed_eos.hugoniot_eos(up_plot_range), mix_label, mix_line)
+        ],
+        title="Shock Velocity vs. Particle Velocity",
+        xaxis_title="Up (km/s)",
+        yaxis_title="Us (km/s)",
+        legend=dict(title=dict(text='Materials')),
+    )
+    return fig_p_up, fig_us_up
 
+def plot_up_range(up_min: float, up_max: float, num_points: int = 200) -> np.ndarray:
+    """Particle velocities for the plots; a tiny range instead of a single point when up_min == up_max."""
+    up_plot_range = np.linspace(up_min, up_max, num_points)
+    # Ensure up_plot_range is never empty or single point if up_min=up_max
+    if up_min == up_max:
+        if up_min == 0: up_plot_range = np.array([0, 1e-6]) # Tiny range if both are 0
+        else: up_plot_range = np.array([up_min, up_min + 1e-6*(abs(up_min) if up_min !=0 else 1)])
+    return up_plot_range
 
-    for i, (mat_orig, vfrac) in enumerate(original_material_configs):
-        # Solve for original material's Up at the common pressure range
-        up_orig_solved = mat_orig.solve_up(P_plot_common)
-        fig_p_up.add_trace(go.Scatter(
-            x=up_orig_solved, 
-            y=P_plot_common, 
-            mode='lines', 
-            name=f"{mat_orig.name} ({vfrac*100:.1f}%)",
-            line=dict(width=2)
-        ))
-
-    # Plot the mixed material's P-Up curve directly using its own Up range
-    fig_p_up.add_trace(go.Scatter(
-        x=up_plot_range, 
-        y=P_plot_common, # This is P_mix
-        mode='lines', 
-        name=f"{mixed_eos.name} (Mix)",
-        line=dict(dash='dash', width=3, color='black')
-    ))
-    
-    fig_p_up.update_layout(
-        title_text="Pressure vs. Particle Velocity",
-        xaxis_title_text="Up (km/s)",
-        yaxis_title_text="P (GPa)",
-        legend_title_text='Materials'
-    )
 
-    # Us-Up plot
-    fig_us_up = go.Figure()
-    for i, (mat_orig, vfrac) in enumerate(original_material_configs):
-        fig_us_up.add_trace(go.Scatter(
-            x=up_plot_range, 
-            y=mat_orig.hugoniot_eos(up_plot_range), 
-            mode='lines', 
-            name=f"{mat_orig.name} ({vfrac*100:.1f}%)",
-            line=dict(width=2)
-        ))
-    
-    fig_us_up.add_trace(go.Scatter(
-        x=up_plot_range, 
-        y=mixed_eos.hugoniot_eos(up_plot_range), 
-        mode='lines', 
-        name=f"{mixed_eos.name} (Mix)",
-        line=dict(dash='dash', width=3, color='black')
-    ))
-
-    fig_us_up.update_layout(
-        title_text="Shock Velocity vs. Particle Velocity",
-        xaxis_title_text="Up (km/s)",
-        yaxis_title_text="Us (km/s)",
-        legend_title_text='Materials'
-    )
+# New plot function for multiple materials using Plotly
+def plot_mixture_many(original_material_configs: List[Tuple[HugoniotEOS, float]], 
+                      mixed_eos: MixedHugoniotEOS, 
+                      up_min: float, up_max: float, num_points: int = 200,
+                      plot_mode: str = "html", array_encoding: str = "b64",
+                      figures: Optional[Tuple[dict, dict]] = None):
+    """
+    Plot the components and the mixture (P-Up and Us-Up) with tables of the mixture parameters and fractions.
+    :param plot_mode: "html" embeds plotly's HTML snippets, drawn with the locally served plotly.js bundle the page
+                      loads; "json" embeds compact figure JSON for that same bundle (see figure_fragment)
+    :param array_encoding: "b64" or "list", for plot_mode="json"
+    :param figures: (P-Up, Us-Up) figures already built with build_mixture_figures; built here over
+                    plot_up_range(up_min, up_max, num_points) when omitted
+    """
+    from fasthtml.common import Div, H3, Table, Tr, Th, Td
+
+    if figures is None:
+        figures = build_mixture_figures(original_material_configs, mixed_eos, plot_up_range(up_min, up_max, num_points))
+    fragments = [figure_fragment(fig, plot_mode, array_encoding=array_encoding) for fig in figures]
 
     mixed_table_html = generate_table(
         f"{mixed_eos.C0:.4f}", 
@@ -362,7 +913,6 @@ def plot_mixture_many(original_material_configs: List[Tuple[HugoniotEOS, float]]
         H3("Component Fractions:"),
         components_table_html,
         H3("Plots:"),
-        NotStr(fig_p_up.to_html(full_html=False, include_plotlyjs='cdn')),
-        NotStr(fig_us_up.to_html(full_html=False, include_plotlyjs=False))
+        *fragments
     )
 
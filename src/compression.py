@@ -0,0 +1,189 @@
+"""
+Response compression: gzip, or Brotli when the optional brotli package is installed.
+Plot fragments are mostly numeric JSON and repeated inline styles, so they typically shrink several-fold.
+"""
+import gzip
+import zlib
+from typing import Awaitable, Callable, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from metrics import Registry
+from timing import stage
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/html", "text/plain", "text/css", "text/csv", "application/json", "application/javascript",
+    "application/x-ndjson", "image/svg+xml",
+)
+DEFAULT_MINIMUM_SIZE = 1024
+DEFAULT_OFFLOAD_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Quality 11 compresses slightly better but is far too slow for per-request bodies
+RATIO_BUCKETS = (1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 20.0, 50.0)
+
+
+def available_encodings() -> tuple:
+    """Supported content codings in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Sequence[str] = None) -> Optional[str]:
+    """The preferred available coding the client accepts (highest q, then our order), or None for identity."""
+    available = available_encodings() if available is None else available
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        qualities[coding.strip().lower()] = q
+    wildcard = qualities.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = qualities.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress a whole body. Module-level so it can run in a process pool."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY if level is None else level)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor for streamed bodies (e.g. exports), which are compressed chunk by chunk inline."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.process, self.finish = self._compressor.process, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+            self.process, self.finish = self._compressor.compress, self._compressor.flush
+
+
+class CompressionMetrics:
+    """Bytes before and after compression and the compression ratio per response, by coding."""
+
+    def __init__(self, registry: Registry):
+        self.bytes_in = registry.counter("compression_input_bytes_total", "Response bytes before compression.",
+                                         ("encoding",))
+        self.bytes_out = registry.counter("compression_output_bytes_total", "Response bytes after compression.",
+                                          ("encoding",))
+        self.ratio = registry.histogram("compression_ratio", "Uncompressed over compressed size per response.",
+                                        ("encoding",), buckets=RATIO_BUCKETS)
+
+    def observe(self, encoding: str, size_in: int, size_out: int):
+        self.bytes_in.inc(size_in, encoding=encoding)
+        self.bytes_out.inc(size_out, encoding=encoding)
+        if size_out:
+            self.ratio.observe(size_in / size_out, encoding=encoding)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses whose content type is in content_types and whose body is at least
+    minimum_size bytes, for clients that accept gzip or br. Responses that already have a Content-Encoding (e.g.
+    precompressed static assets) pass through. Whole bodies of offload_size bytes or more are compressed with `run`
+    (an async callable such as ComputePool.run) so the event loop is not blocked; smaller ones and streamed bodies
+    are compressed inline.
+    """
+
+    def __init__(self, app, run: Optional[Callable[..., Awaitable]] = None, minimum_size: int = DEFAULT_MINIMUM_SIZE,
+                 offload_size: int = DEFAULT_OFFLOAD_SIZE, content_types: Sequence[str] = COMPRESSIBLE_TYPES,
+                 metrics: Optional[CompressionMetrics] = None):
+        self.app = app
+        self.run = run
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.content_types = tuple(content_types)
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        mode = None  # "identity", "whole" or "stream"; None until the first body message
+        stream = None
+        size_in = size_out = 0
+
+        async def send_compressed(message):
+            nonlocal start_message, mode, stream, size_in, size_out
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if mode is None:
+                headers = MutableHeaders(scope=start_message)
+                content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                compressible = content_type in self.content_types and start_message["status"] not in (204, 304)
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not compressible or "content-encoding" in headers or (not more_body and len(body) < self.minimum_size):
+                    mode = "identity"
+                    await send(start_message)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers and not headers["etag"].startswith("W/"):
+                    headers["ETag"] = "W/" + headers["etag"]  # The encoded body is a different representation
+                if not more_body:
+                    mode = "whole"
+                    compressed = await self._compress(body, encoding)
+                    headers["Content-Length"] = str(len(compressed))
+                    if self.metrics is not None:
+                        self.metrics.observe(encoding, len(body), len(compressed))
+                    await send(start_message)
+                    await send(dict(message, body=compressed))
+                    return
+                mode = "stream"
+                del headers["Content-Length"]
+                stream = _StreamCompressor(encoding)
+                await send(start_message)
+
+            if mode == "identity":
+                await send(message)
+                return
+            chunk = stream.process(body) if body else b""
+            if not more_body:
+                chunk += stream.finish()
+            size_in += len(body)
+            size_out += len(chunk)
+            if chunk or not more_body:
+                await send(dict(message, body=chunk))
+            if not more_body and self.metrics is not None:
+                self.metrics.observe(encoding, size_in, size_out)
+
+        await self.app(scope, receive, send_compressed)
+        if start_message is not None and mode is None:
+            await send(start_message)  # A response that never sent a body message
+
+    async def _compress(self, body: bytes, encoding: str) -> bytes:
+        with stage("compress"):
+            if self.run is not None and len(body) >= self.offload_size:
+                return await self.run(compress, body, encoding)
+            return compress(body, encoding)
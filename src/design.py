@@ -0,0 +1,122 @@
+"""Inverse design: search the composition simplex for volume fractions that hit a target Hugoniot."""
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from components import (
+    HugoniotEOS, MixedHugoniotEOS, MixtureBatchResult, generate_mixed_hugoniot_batch, generate_mixed_hugoniot_many,
+    up_from_pressure,
+)
+
+TARGET_PARAMETERS = ("rho0", "C0", "S")
+CHUNK_POINTS = 200_000  # compositions x fit points per generate_mixed_hugoniot_batch call
+
+
+@dataclass
+class DesignResult:
+    """Best composition found and how the search went. residual is the objective at vfracs (0 is a perfect match)."""
+    vfracs: np.ndarray
+    residual: float
+    mixture: MixedHugoniotEOS
+    evaluations: int
+    iterations: int
+    elapsed: float
+
+
+def design_objective(batch: MixtureBatchResult, target: Optional[Dict[str, float]] = None,
+                     weights: Optional[Dict[str, float]] = None, window: Optional[HugoniotEOS] = None,
+                     pressures: Optional[npt.ArrayLike] = None) -> np.ndarray:
+    """
+    Residual of every composition in a batch, shape (n_compositions,).
+    :param target: any of rho0, C0, S to match; each term is the relative error, weighted and combined in quadrature
+    :param weights: optional weight per target parameter (default 1)
+    :param window: optionally, an EOS to impedance match: adds the RMS relative difference of particle velocity
+                   between the mixture and window Hugoniots at the given pressures
+    :param pressures: pressures (GPa) for the window match
+    """
+    total = np.zeros(len(batch))
+    for param, value in (target or {}).items():
+        weight = (weights or {}).get(param, 1.0)
+        total += weight * np.square((getattr(batch, param) - value) / value)
+    if window is not None:
+        P = np.asarray(pressures, dtype=float)
+        up_mix = up_from_pressure(batch.rho0[:, None], batch.C0[:, None], batch.S[:, None], P)
+        up_window = window.solve_up(P)
+        total += np.mean(np.square((up_mix - up_window) / up_window), axis=1)
+    return np.sqrt(total)
+
+
+def design_mixture(materials: List[HugoniotEOS], Up_ref: npt.ArrayLike, target: Optional[Dict[str, float]] = None,
+                   weights: Optional[Dict[str, float]] = None, window: Optional[HugoniotEOS] = None,
+                   pressures: Optional[npt.ArrayLike] = None, population: int = 256, max_iterations: int = 40,
+                   time_budget: float = 0.25, tolerance: float = 1e-10, seed: Optional[int] = 0,
+                   name: str = "Design", chunk_points: int = CHUNK_POINTS) -> DesignResult:
+    """
+    Finds volume fractions of materials whose mixture best matches a target rho0/C0/S and/or impedance matches a window.
+    Each iteration evaluates a population of compositions with generate_mixed_hugoniot_batch, in chunks of at most
+    chunk_points compositions x fit points. The first population covers the simplex uniformly (plus its vertices);
+    later ones are Dirichlet samples concentrated around the best composition so far, tightening as the search
+    proceeds. The search stops after max_iterations, once the residual is below tolerance, or when time_budget
+    (seconds) is spent; the deadline is checked between chunks, and at least one chunk always runs.
+    :param materials: candidate components; the first is the pressure reference, as in generate_mixed_hugoniot_many
+    :param Up_ref: particle velocities for the mixture fits
+    :param target, weights, window, pressures: see design_objective
+    :param seed: seed for numpy's default_rng, so results are reproducible
+    :returns: DesignResult; its mixture comes from generate_mixed_hugoniot_many at the best fractions
+    :raises ValueError: if there are no materials, no objective, a window without pressures, or no composition
+                        gives a finite residual (the target is unreachable)
+    """
+    if not materials:
+        raise ValueError("Material list cannot be empty.")
+    if not target and window is None:
+        raise ValueError("Give a target (rho0, C0 and/or S) or a window to match.")
+    unknown = set(target or {}) - set(TARGET_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown target parameters: {sorted(unknown)}")
+    if window is not None and (pressures is None or np.size(pressures) == 0):
+        raise ValueError("Matching a window needs pressures.")
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    n = len(materials)
+    Up_ref = np.asarray(Up_ref, dtype=float)
+    rows_per_chunk = max(1, chunk_points // max(len(Up_ref), 1))
+
+    best_vfracs, best_residual = None, np.inf
+    evaluations = iterations = 0
+    concentration = 10.0
+    while iterations < max_iterations:
+        if best_vfracs is None:
+            candidates = np.vstack([np.eye(n), rng.dirichlet(np.ones(n), size=max(population - n, 1))])
+        else:
+            # Small floor keeps every component reachable even when the current best has none of it
+            candidates = np.vstack([best_vfracs, rng.dirichlet(concentration * best_vfracs + 0.05, size=population - 1)])
+            concentration = min(concentration * 2.0, 1e12)
+        residual = np.full(len(candidates), np.inf)
+        out_of_time = False
+        for first in range(0, len(candidates), rows_per_chunk):
+            chunk = candidates[first:first + rows_per_chunk]
+            batch = generate_mixed_hugoniot_batch(materials, chunk, Up_ref)
+            with np.errstate(over="ignore", invalid="ignore"):  # non-finite residuals are treated as inf below
+                residual[first:first + len(chunk)] = design_objective(batch, target, weights, window, pressures)
+            evaluations += len(chunk)
+            out_of_time = time.perf_counter() - start >= time_budget
+            if out_of_time:
+                break
+        residual = np.where(np.isfinite(residual), residual, np.inf)
+        i = int(np.argmin(residual))
+        if best_vfracs is None or residual[i] <= best_residual:
+            best_vfracs, best_residual = candidates[i], float(residual[i])
+        iterations += 1
+        if best_residual <= tolerance or out_of_time:
+            break
+    if not np.isfinite(best_residual):
+        raise ValueError(f"No composition of the {evaluations} evaluated gives a finite residual; "
+                         "the target cannot be reached with these components.")
+
+    mixture = generate_mixed_hugoniot_many(name, list(zip(materials, best_vfracs.tolist())), Up_ref)
+    return DesignResult(vfracs=best_vfracs, residual=best_residual, mixture=mixture, evaluations=evaluations,
+                        iterations=iterations, elapsed=time.perf_counter() - start)
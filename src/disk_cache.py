@@ -0,0 +1,133 @@
+"""Persistent mixture result cache in SQLite, so computed work survives restarts."""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+import components
+
+
+@lru_cache(maxsize=1)
+def physics_version() -> str:
+    """Hash of the physics module's source. Entries stored under another version are dropped when the cache opens."""
+    with open(components.__file__, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+class DiskCache:
+    """
+    SQLite-backed LRU cache of picklable values, bounded by number of entries and total size in bytes.
+    Keys are caller-supplied canonical hashes (e.g. result_cache.mixture_cache_key). Every entry carries a
+    version stamp; opening the cache deletes entries from other versions, so changing the physics code
+    invalidates old results automatically.
+    Entry count and size are kept as running totals, so a set only touches the least recently used rows when it
+    pushes a total over its bound. Other processes sharing the file are caught up with by recounting every
+    resync_interval sets. Calls block on SQLite; async callers run them in an executor.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10_000, max_bytes: int = 32 * 1024 * 1024,
+                 version: Optional[str] = None, clock: Callable[[], float] = time.time, resync_interval: int = 100):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = version if version is not None else physics_version()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resync_interval = resync_interval
+        self._entries = 0
+        self._bytes = 0
+        self._sets_since_sync = 0
+        self._clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use, so importing the app does not touch the disk
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version TEXT, value BLOB, "
+                         "size INTEGER, last_used REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            with conn:
+                conn.execute("DELETE FROM results WHERE version != ?", (self.version,))
+            self._conn = conn
+            self._sync_totals()
+        return self._conn
+
+    def _sync_totals(self):
+        self._entries, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        self._sets_since_sync = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM results WHERE key = ? AND version = ?", (key, self.version)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with conn:
+                conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (self._clock(), key))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                replaced = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                             (key, self.version, blob, len(blob), self._clock()))
+                if replaced is None:
+                    self._entries += 1
+                    self._bytes += len(blob)
+                else:
+                    self._bytes += len(blob) - replaced[0]
+                self._sets_since_sync += 1
+                if self._sets_since_sync >= self.resync_interval:
+                    self._sync_totals()
+                if self._entries > self.max_entries or self._bytes > self.max_bytes:
+                    self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        # Walk from least recently used until both bounds hold
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if self._entries <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            self._entries -= 1
+            self._bytes -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM results")
+            self._entries = self._bytes = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(entries=self._entries, bytes=self._bytes, hits=self.hits, misses=self.misses,
+                        evictions=self.evictions, version=self.version)
@@ -0,0 +1,79 @@
+"""Streaming export of tabulated Hugoniots (e.g. for hydrocode input decks)."""
+import io
+import json
+from typing import Iterator
+
+import numpy as np
+
+from components import HugoniotEOS
+
+# Units: up, Us in km/s; P in GPa; V in cm^3/g; E (E - E0 along the Hugoniot, from P0 = 0) in kJ/g
+TABLE_COLUMNS = ("up", "Us", "P", "V", "E")
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+DEFAULT_CHUNK_SIZE = 4096
+FLOAT_FORMAT = "%.10g"
+
+
+def iter_hugoniot_table(eos: HugoniotEOS, up_min: float, up_max: float, num_points: int,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """
+    Tabulate the Hugoniot of eos on np.linspace(up_min, up_max, num_points), one chunk at a time.
+    Only one chunk is held in memory, so arbitrarily long tables can be streamed.
+    :param eos: any HugoniotEOS, including a fitted MixedHugoniotEOS
+    :param chunk_size: rows per chunk
+    :returns: iterator of (rows, len(TABLE_COLUMNS)) arrays in TABLE_COLUMNS order
+    """
+    if num_points < 2:
+        raise ValueError("num_points must be at least 2")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    step = (up_max - up_min) / (num_points - 1)
+    for start in range(0, num_points, chunk_size):
+        index = np.arange(start, min(start + chunk_size, num_points))
+        up = up_min + index * step
+        if index[-1] == num_points - 1:
+            up[-1] = up_max  # as np.linspace, so the table ends exactly at up_max
+        Us = eos.hugoniot_eos(up)
+        P = eos.hugoniot_P(up)
+        # Rankine-Hugoniot jump conditions: V = V0 (1 - up/Us), E - E0 = up^2 / 2
+        V = (1.0 - up / Us) / eos.rho0
+        E = 0.5 * up**2
+        yield np.column_stack((up, Us, P, V, E))
+
+
+def _format_rows(rows: np.ndarray, fmt: str) -> str:
+    buffer = io.StringIO()
+    np.savetxt(buffer, rows, fmt=fmt)
+    return buffer.getvalue()
+
+
+def iter_hugoniot_csv(eos: HugoniotEOS, up_min: float, up_max: float, num_points: int,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """The table as CSV text chunks, header first."""
+    yield ",".join(TABLE_COLUMNS) + "\n"
+    fmt = ",".join([FLOAT_FORMAT] * len(TABLE_COLUMNS))
+    for rows in iter_hugoniot_table(eos, up_min, up_max, num_points, chunk_size):
+        yield _format_rows(rows, fmt)
+
+
+def iter_hugoniot_ndjson(eos: HugoniotEOS, up_min: float, up_max: float, num_points: int,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """The table as newline-delimited JSON text chunks: one object per row, keyed by TABLE_COLUMNS."""
+    fmt = "{" + ",".join(f"{json.dumps(col)}:{FLOAT_FORMAT}" for col in TABLE_COLUMNS) + "}"
+    for rows in iter_hugoniot_table(eos, up_min, up_max, num_points, chunk_size):
+        if not np.isfinite(rows).all():
+            # JSON has no NaN/Infinity; fall back to the slow path for chunks that need nulls
+            yield "".join(json.dumps(dict(zip(TABLE_COLUMNS, (v if np.isfinite(v) else None for v in row.tolist())))) + "\n"
+                          for row in rows)
+        else:
+            yield _format_rows(rows, fmt)
+
+
+def iter_hugoniot_export(eos: HugoniotEOS, export_format: str, up_min: float, up_max: float, num_points: int,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Dispatch to the CSV or NDJSON writer. :raises ValueError: for unknown formats"""
+    if export_format == "csv":
+        return iter_hugoniot_csv(eos, up_min, up_max, num_points, chunk_size)
+    if export_format == "ndjson":
+        return iter_hugoniot_ndjson(eos, up_min, up_max, num_points, chunk_size)
+    raise ValueError(f"export_format must be one of {tuple(EXPORT_FORMATS)}, got {export_format!r}")
@@ -0,0 +1,223 @@
+"""
+Precomputed two-component mixture tables.
+For every pair of catalog materials, and either as the pressure reference, C0 and S of the mixture are tabulated on
+a fine grid of the reference material's volume fraction and stored as SQLite BLOBs in a sibling file of the materials database. Two-component
+requests on the tabulated Up grid are then answered by linear interpolation, falling back to the exact fit when the
+interpolation error bound of that grid interval exceeds the tolerance. The fit statistics are tabulated too, so table
+mixtures carry a .fit like exact ones.
+"""
+import io
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from components import HugoniotEOS, LinearFit, MixedHugoniotEOS, _up_grid_key, generate_mixed_hugoniot_batch
+
+DEFAULT_UP_GRID = np.linspace(0.0, 6.0, 100)  # the calculation form's default fit grid
+DEFAULT_VFRAC_POINTS = 2001
+DEFAULT_TOLERANCE = 1e-5
+DEFAULT_MAX_PAIRS = 128  # about 256 KiB per pair at the default vfrac grid
+# Linear interpolation error on an interval is at most h^2 max|f''| / 8; second differences estimate h^2 f''
+# from neighbouring intervals, so the estimate is padded by this factor
+ERROR_BOUND_SAFETY = 2.0
+# Bumped whenever the stored table layout changes, so tables in an older layout are rebuilt rather than misread
+TABLE_FORMAT = 3
+
+
+def _params_key(eos) -> str:
+    """Tables depend only on the EOS parameters, so edited materials get new tables and names do not matter."""
+    return f"{float(eos.rho0)!r},{float(eos.C0)!r},{float(eos.S)!r}"
+
+
+def build_pair_table(ref, other, Up_ref: npt.ArrayLike, n_vfrac: int = DEFAULT_VFRAC_POINTS) -> np.ndarray:
+    """
+    Tabulate a two-component mixture over the first material's volume fraction.
+    :returns: (8, n_vfrac) array of C0, S, the per-interval interpolation error bounds of C0 and S (stored at the
+              left end of each interval; the last column's bound is unused), then the fit's number of points,
+              residual RMS and standard errors of C0 and S
+    """
+    vfrac = np.linspace(0.0, 1.0, n_vfrac)
+    batch = generate_mixed_hugoniot_batch([ref, other], np.column_stack((vfrac, 1.0 - vfrac)), Up_ref)
+    table = np.zeros((8, n_vfrac))
+    table[0], table[1] = batch.C0, batch.S
+    table[4], table[5], table[6], table[7] = batch.fit_points, batch.fit_rms, batch.C0_stderr, batch.S_stderr
+    for row in (0, 1):
+        second = np.abs(np.diff(table[row], 2))
+        # Interval k is bracketed by second differences centred on points k and k+1
+        per_point = np.concatenate(([second[0]], second, [second[-1]]))
+        table[row + 2, :-1] = ERROR_BOUND_SAFETY * np.maximum(per_point[:-1], per_point[1:]) / 8.0
+    return table
+
+
+class BinaryMixtureTables:
+    """
+    On-disk store and bounded in-memory cache of two-component mixture tables for one Up grid.
+    Each unordered pair of materials is one row holding a table per choice of pressure reference (the mixture fit
+    depends on which component comes first), so lookups order the pair canonically and pick the table for the
+    requested reference. At most max_pairs pairs are held in memory, least recently used first out; the rest are
+    read back one row at a time when requested, so lookups may touch the disk and async callers run them in an
+    executor. Built incrementally: build() only computes pairs that are not stored yet, so adding a material costs
+    n_materials new rows rather than a full rebuild.
+    """
+
+    def __init__(self, path: str, Up_ref: npt.ArrayLike = DEFAULT_UP_GRID, n_vfrac: int = DEFAULT_VFRAC_POINTS,
+                 tolerance: float = DEFAULT_TOLERANCE, max_pairs: int = DEFAULT_MAX_PAIRS):
+        self.path = path
+        self.Up_ref = np.asarray(Up_ref, dtype=float)
+        self.n_vfrac = n_vfrac
+        self.tolerance = tolerance
+        self.max_pairs = max_pairs
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self._grid_key = repr(_up_grid_key(self.Up_ref)) + f":{n_vfrac}:v{TABLE_FORMAT}"
+        self._stored: Set[Tuple[str, str]] = set()
+        self._tables: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE IF NOT EXISTS pair_tables (first TEXT, second TEXT, grid TEXT, data BLOB, "
+                     "PRIMARY KEY (first, second, grid))")
+        return conn
+
+    def _keep(self, pair: Tuple[str, str], tables: np.ndarray):
+        # Callers hold self._lock
+        self._tables[pair] = tables
+        self._tables.move_to_end(pair)
+        while len(self._tables) > self.max_pairs:
+            self._tables.popitem(last=False)
+
+    def load(self):
+        """
+        Index the stored pairs for this grid and read up to max_pairs of them into memory. lookup never does this
+        itself, so the app calls it (via build) from a background task at startup; until then lookups miss and
+        mixtures are fitted exactly.
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            conn = self._connect()
+            try:
+                pairs = conn.execute("SELECT first, second FROM pair_tables WHERE grid = ?", (self._grid_key,)).fetchall()
+                rows = conn.execute("SELECT first, second, data FROM pair_tables WHERE grid = ? LIMIT ?",
+                                    (self._grid_key, self.max_pairs)).fetchall()
+            finally:
+                conn.close()
+            self._stored.update(pairs)
+            for first, second, data in rows:
+                self._keep((first, second), np.load(io.BytesIO(data)))
+            self._loaded = True
+
+    def _tables_for(self, pair: Tuple[str, str]) -> Optional[np.ndarray]:
+        """The (2, 8, n_vfrac) tables of a canonical pair, from memory or else from disk; None if not stored."""
+        with self._lock:
+            tables = self._tables.get(pair)
+            if tables is not None:
+                self._tables.move_to_end(pair)
+                return tables
+            if pair not in self._stored:
+                return None
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT data FROM pair_tables WHERE first = ? AND second = ? AND grid = ?",
+                               pair + (self._grid_key,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        tables = np.load(io.BytesIO(row[0]))
+        with self._lock:
+            self._keep(pair, tables)
+        return tables
+
+    def missing_pairs(self, materials: Iterable) -> List[Tuple]:
+        """Unordered pairs of distinct materials (by parameters) that have no tables yet, as HugoniotEOS."""
+        self.load()
+        # Catalog rows only carry the parameters, so they are converted for the mixture engine
+        unique = sorted({_params_key(m): HugoniotEOS(m.name, float(m.rho0), float(m.C0), float(m.S))
+                         for m in materials}.items())
+        return [(a, b) for i, (key_a, a) in enumerate(unique) for key_b, b in unique[i + 1:]
+                if (key_a, key_b) not in self._stored]
+
+    def build(self, materials: Iterable) -> int:
+        """Compute and store tables for every missing pair of materials. Returns the number of pairs built."""
+        with self._build_lock:
+            pairs = self.missing_pairs(materials)
+            if not pairs:
+                return 0
+            built = []
+            for first, second in pairs:
+                tables = np.stack([build_pair_table(first, second, self.Up_ref, self.n_vfrac),
+                                   build_pair_table(second, first, self.Up_ref, self.n_vfrac)])
+                buffer = io.BytesIO()
+                np.save(buffer, tables)
+                built.append((_params_key(first), _params_key(second), tables, buffer.getvalue()))
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO pair_tables VALUES (?, ?, ?, ?)",
+                                     [(f, s, self._grid_key, blob) for f, s, _, blob in built])
+            finally:
+                conn.close()
+            with self._lock:
+                for f, s, tables, _ in built:
+                    self._stored.add((f, s))
+                    self._keep((f, s), tables)
+            return len(built)
+
+    def lookup(self, name: str, material_data_list: List[Tuple[HugoniotEOS, float]],
+               Up_ref: npt.ArrayLike) -> Optional[MixedHugoniotEOS]:
+        """
+        The mixture from the tables, or None if the request is not a tabulated two-component mixture on this grid
+        or the interpolation error bound exceeds the tolerance (the caller then computes it exactly).
+        """
+        if len(material_data_list) != 2 or _up_grid_key(np.asarray(Up_ref, dtype=float)) != _up_grid_key(self.Up_ref):
+            return None
+        (ref, v_ref), (other, v_other) = material_data_list
+        ref_key, other_key = _params_key(ref), _params_key(other)
+        tables = None
+        if ref_key != other_key and np.isclose(v_ref + v_other, 1.0):
+            # Rows hold (first as reference, second as reference), each over its reference's volume fraction
+            swapped = ref_key > other_key
+            tables = self._tables_for((other_key, ref_key) if swapped else (ref_key, other_key))
+        if tables is None:
+            self._count("misses")
+            return None
+        table = tables[1 if swapped else 0]
+
+        position = min(max(v_ref, 0.0), 1.0) * (self.n_vfrac - 1)
+        k = min(int(position), self.n_vfrac - 2)
+        t = position - k
+        if max(table[2, k], table[3, k]) > self.tolerance:
+            self._count("fallbacks")
+            return None
+        C0, S, _, _, _, rms, C0_stderr, S_stderr = table[:, k] + t * (table[:, k + 1] - table[:, k])
+        masses = [ref.rho0 * v_ref, other.rho0 * v_other]
+        rho_mix = sum(masses)
+        mixed = MixedHugoniotEOS(name, rho_mix, float(C0), float(S), [ref.name, other.name], [v_ref, v_other])
+        mixed.mfracs = [m / rho_mix for m in masses]
+        mixed.fit = LinearFit(slope=S, intercept=C0, n=min(table[4, k], table[4, k + 1]), rms=rms,
+                              slope_stderr=S_stderr, intercept_stderr=C0_stderr)
+        self._count("hits")
+        return mixed
+
+    def _count(self, counter: str):
+        # Lookups run on several threads at once, and += on an attribute is not atomic
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(pairs=len(self._stored), resident=len(self._tables), hits=self.hits, misses=self.misses,
+                        fallbacks=self.fallbacks)
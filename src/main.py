@@ -3,19 +3,41 @@
 from fasthtml.common import (
     FastHTML, Titled, Div, Form, Input, Button, RedirectResponse, database,
     NotFoundError, Grid, H1, A, Label, Group, Select, Option, Article, Hr, H2, H4, Table, Tr, Th, Td, NotStr, Style, Script, picolink,
-    P, H3,
+    P, H3, to_xml,
 )
 import os # Import os for directory creation
 import traceback # Import traceback for error handling
 import logging # Import logging for better error handling
+import threading
+import asyncio
+import time
 import numpy as np
 from components import (
     HugoniotEOS,
     MixedHugoniotEOS,
-    generate_mixed_hugoniot_many, 
-    plot_mixture_many,
+    generate_mixed_hugoniot_many,
 )
+from result_cache import ResultCache, SingleFlight, mixture_cache_key
+from catalog import MaterialCatalog
+from workers import ComputePool
+from tasks import render_mixture
+from export import EXPORT_FORMATS, iter_hugoniot_export
+from shock import impedance_match
+from batch_api import SpecError, RequestTooLarge, parse_batch_request, evaluate_mixture_specs, merge_results, parse_design_request
+from design import design_mixture
+from lookup_tables import BinaryMixtureTables
+from disk_cache import DiskCache
+import timing
+from timing import ServerTimingMiddleware, stage
+from metrics import HttpMetrics, MetricsMiddleware, Registry, mark_outcome
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from static_assets import (
+    PLOTLY_BUNDLE_URL, PLOTLY_JSON_RENDERER, LONG_CACHE_CONTROL, plotly_bundle, plotly_bundle_encoded, plotly_bundle_etag,
+)
+from compression import CompressionMetrics, CompressionMiddleware, available_encodings, choose_encoding
 from starlette.requests import Request
+from starlette.routing import Route
+from starlette.middleware import Middleware
 from starlette.datastructures import FormData
 from typing import Optional
 
@@ -32,17 +54,48 @@ subheading_style = "margin: 1.5em 0 0.5em 0; font-size: 1.1em;"
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Ensure data directory exists
-os.makedirs("data", exist_ok=True)
-
 # Database setup
-db = database("data/calcapp.db")
-materials = db.t.materials
+def _open_materials_table():
+    """Open the SQLite database and return the materials table, creating it if needed."""
+    # Ensure data directory exists
+    os.makedirs("data", exist_ok=True)
+    db = database("data/calcapp.db")
+    table = db.t.materials
+    if table not in db.t:
+        table.create(dict(name=str, rho0=float, C0=float, S=float), pk="name")
+    table.dataclass()  # Rows come back as dataclass instances
+    return table
+
+class _LazyMaterialsTable:
+    """
+    Stands in for the materials table until it is first used, so importing the app does not open or seed the database.
+    The first call, lookup or attribute access opens the table and seeds it with the default materials if empty.
+    """
+    def __init__(self):
+        self._table = None
+        self._lock = threading.RLock()
+
+    def _resolve(self):
+        if self._table is None:
+            with self._lock:
+                if self._table is None:
+                    self._table = _open_materials_table()
+                    seed_default_materials()
+        return self._table
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
 
-if materials not in db.t:
-    materials.create(dict(name=str, rho0=float, C0=float, S=float), pk="name")
+    def __getitem__(self, key):
+        return self._resolve()[key]
 
-Material = materials.dataclass()
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+materials = _LazyMaterialsTable()
+
+# In-memory view of the materials table used by page renders and lookups
+material_catalog = MaterialCatalog(materials)
 
 # Seed database with default materials if empty
 def seed_default_materials():
@@ -126,9 +179,197 @@ def update_materials_for_testing():
         
     except Exception as e:
         logger.error(f"Error updating materials for testing: {e}")
+    finally:
+        material_catalog.invalidate()
+
+# The database is opened, seeded and loaded into the catalog at server startup (or on first use), not at import
+
+# Mixed EOS and rendered plot fragment per canonical request, shared by /calculate and /plot and across users
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "256")),
+    max_bytes=int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.environ.get("RESULT_CACHE_TTL", "600")),
+)
 
-# Initialize default materials
-seed_default_materials()
+# Identical requests that arrive while one is being computed wait for it instead of computing again
+inflight = SingleFlight()
+
+# "json" sends compact figure JSON drawn by the locally served plotly.js; "html" embeds plotly's HTML snippets
+PLOT_MODE = os.environ.get("PLOT_MODE", "json")
+PLOT_ARRAY_ENCODING = os.environ.get("PLOT_ARRAY_ENCODING", "b64")
+EXPORT_MAX_POINTS = int(os.environ.get("EXPORT_MAX_POINTS", "1000000"))
+
+# Thread or process pool for the fit and plot rendering, so they do not block the event loop
+compute_pool = ComputePool.from_env()
+
+# Per-stage timings as a Server-Timing header and a JSON log line per request; off by default
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") == "1"
+
+# gzip (or Brotli, if installed) for text responses; bodies of COMPRESSION_OFFLOAD_SIZE bytes or more are compressed
+# in the compute pool. Static assets are served precompressed, kept in STATIC_CACHE_DIR across restarts
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_OFFLOAD_SIZE = int(os.environ.get("COMPRESSION_OFFLOAD_SIZE", str(64 * 1024)))
+STATIC_CACHE_DIR = os.environ.get("STATIC_CACHE_DIR", "data/static")
+
+# Prometheus metrics served at /metrics. Fit sizes are bucketed so label values stay bounded
+metrics_registry = Registry()
+http_metrics = HttpMetrics(metrics_registry)
+compression_metrics = CompressionMetrics(metrics_registry)
+FIT_POINT_BUCKETS = (100, 1000, 10000)
+mixture_compute_seconds = metrics_registry.histogram(
+    "mixture_compute_seconds", "Time spent in the compute pool per mixture job, by job, components and fit points.",
+    ("job", "components", "fit_points_le"),
+)
+
+def _fit_points_bucket(num_points_fit: int) -> str:
+    return next((str(bound) for bound in FIT_POINT_BUCKETS if num_points_fit <= bound), "+Inf")
+
+async def run_in_pool(fn, *args):
+    """compute_pool.run, bringing the job's stage timings back to the request when timing is on."""
+    if not timing.active():
+        return await compute_pool.run(fn, *args)
+    result, stages = await compute_pool.run(timing.collect, fn, *args)
+    timing.record(stages)
+    return result
+
+# Two-component mixtures of catalog materials on the default fit grid are served from precomputed tables
+LOOKUP_TABLES_ENABLED = os.environ.get("LOOKUP_TABLES", "1") == "1"
+lookup_tables = BinaryMixtureTables(
+    os.environ.get("LOOKUP_TABLES_PATH", "data/lookup_tables.db"),
+    n_vfrac=int(os.environ.get("LOOKUP_TABLES_VFRAC_POINTS", "2001")),
+    tolerance=float(os.environ.get("LOOKUP_TABLES_TOLERANCE", "1e-5")),
+    max_pairs=int(os.environ.get("LOOKUP_TABLES_MAX_PAIRS", "128")),
+)
+_background_builds = set()
+
+def _lookup_table_build_done(future):
+    _background_builds.discard(future)
+    if future.cancelled():
+        return
+    if future.exception() is not None:
+        logger.error(f"Lookup table build failed: {future.exception()}")
+    elif future.result():
+        logger.info(f"Built {future.result()} mixture lookup tables")
+
+async def schedule_lookup_table_build():
+    """
+    Load the stored tables and build those for catalog pairs that have none yet, in a background thread; requests
+    never wait for it.
+    """
+    if not LOOKUP_TABLES_ENABLED:
+        return
+    future = asyncio.get_running_loop().run_in_executor(None, lookup_tables.build, list(material_catalog.all()))
+    _background_builds.add(future)
+    future.add_done_callback(_lookup_table_build_done)
+
+def _precompression_done(future):
+    _background_builds.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Precompressing static assets failed: {future.exception()}")
+
+async def precompress_static_assets():
+    """Compress the plotly bundle for every supported coding in a background thread, so no request waits for it."""
+    if not COMPRESSION_ENABLED:
+        return
+    for encoding in available_encodings():
+        future = asyncio.get_running_loop().run_in_executor(None, plotly_bundle_encoded, encoding, STATIC_CACHE_DIR)
+        _background_builds.add(future)
+        future.add_done_callback(_precompression_done)
+
+# Fitted mixtures persist on disk across restarts; entries written by other versions of components.py are dropped
+DISK_CACHE_ENABLED = os.environ.get("DISK_CACHE", "1") == "1"
+disk_cache = DiskCache(
+    os.environ.get("DISK_CACHE_PATH", "data/result_cache.db"),
+    max_entries=int(os.environ.get("DISK_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.environ.get("DISK_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+
+def _table_mixture(mixture_name: str, material_data_list: list, upmin_fit: float, upmax_fit: float,
+                   num_points_fit: int) -> Optional[MixedHugoniotEOS]:
+    if not LOOKUP_TABLES_ENABLED:
+        return None
+    return lookup_tables.lookup(mixture_name, material_data_list, np.linspace(upmin_fit, upmax_fit, num_points_fit))
+
+def _stored_mixture(fit_key: str, mixture_name: str, material_data_list: list, upmin_fit: float, upmax_fit: float,
+                    num_points_fit: int) -> Optional[MixedHugoniotEOS]:
+    tabulated = _table_mixture(mixture_name, material_data_list, upmin_fit, upmax_fit, num_points_fit)
+    if tabulated is not None or not DISK_CACHE_ENABLED:
+        return tabulated
+    return disk_cache.get(fit_key)
+
+async def _known_mixture(fit_key: str, mixture_name: str, material_data_list: list, upmin_fit: float,
+                         upmax_fit: float, num_points_fit: int) -> Optional[MixedHugoniotEOS]:
+    """A mixture that needs no fit: from the lookup tables or the disk cache, else None."""
+    if not LOOKUP_TABLES_ENABLED and not DISK_CACHE_ENABLED:
+        return None
+    # Both may read SQLite, so they run on the default thread pool rather than the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, _stored_mixture, fit_key, mixture_name,
+                                                            material_data_list, upmin_fit, upmax_fit, num_points_fit)
+
+async def _store_fit(fit_key: str, mixed_eos_result: MixedHugoniotEOS):
+    if DISK_CACHE_ENABLED:
+        await asyncio.get_running_loop().run_in_executor(None, disk_cache.set, fit_key, mixed_eos_result)
+
+async def compute_mixture_and_plot(mixture_name: str, material_data_list: list, original_material_configs_for_plot: list,
+                                   upmin_fit: float, upmax_fit: float, num_points_fit: int) -> tuple[MixedHugoniotEOS, str]:
+    """
+    Return the mixed EOS and the rendered plot HTML for a parsed request, using the shared result cache.
+    Concurrent identical requests share a single computation.
+    """
+    key = mixture_cache_key(original_material_configs_for_plot, mixture_name, upmin_fit, upmax_fit, num_points_fit)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    return await inflight.run(key, _compute_mixture_and_plot, key, mixture_name, material_data_list,
+                              original_material_configs_for_plot, upmin_fit, upmax_fit, num_points_fit)
+
+async def _compute_mixture_and_plot(key: str, mixture_name: str, material_data_list: list,
+                                    original_material_configs_for_plot: list, upmin_fit: float, upmax_fit: float,
+                                    num_points_fit: int) -> tuple[MixedHugoniotEOS, str]:
+    # The fit alone is keyed on the components that enter it, so zero-fraction rows do not split disk entries
+    fit_key = mixture_cache_key(material_data_list, mixture_name, upmin_fit, upmax_fit, num_points_fit)
+    with stage("lookup"):
+        known = await _known_mixture(fit_key, mixture_name, material_data_list, upmin_fit, upmax_fit, num_points_fit)
+    start = time.perf_counter()
+    mixed_eos_result, plot_html = await run_in_pool(
+        render_mixture, mixture_name, material_data_list, original_material_configs_for_plot,
+        upmin_fit, upmax_fit, num_points_fit, PLOT_MODE, PLOT_ARRAY_ENCODING, known
+    )
+    mixture_compute_seconds.observe(time.perf_counter() - start, job="plot" if known is not None else "fit_and_plot",
+                                    components=len(material_data_list), fit_points_le=_fit_points_bucket(num_points_fit))
+    if known is None:
+        await _store_fit(fit_key, mixed_eos_result)
+    result_cache.set(key, (mixed_eos_result, plot_html), size=len(plot_html))
+    return mixed_eos_result, plot_html
+
+async def fit_mixture(mixture_name: str, material_data_list: list, original_material_configs_for_plot: list,
+                      upmin_fit: float, upmax_fit: float, num_points_fit: int) -> MixedHugoniotEOS:
+    """Return the mixed EOS alone, reusing a cached /calculate result if there is one but not rendering a plot."""
+    key = mixture_cache_key(original_material_configs_for_plot, mixture_name, upmin_fit, upmax_fit, num_points_fit)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached[0]
+    fit_key = mixture_cache_key(material_data_list, mixture_name, upmin_fit, upmax_fit, num_points_fit)
+    with stage("lookup"):
+        known = await _known_mixture(fit_key, mixture_name, material_data_list, upmin_fit, upmax_fit, num_points_fit)
+    if known is not None:
+        return known
+    return await inflight.run("fit:" + fit_key, _fit_and_store, fit_key, mixture_name, material_data_list,
+                              upmin_fit, upmax_fit, num_points_fit)
+
+async def _fit_and_store(fit_key: str, mixture_name: str, material_data_list: list, upmin_fit: float,
+                         upmax_fit: float, num_points_fit: int) -> MixedHugoniotEOS:
+    start = time.perf_counter()
+    with stage("fit"):
+        mixed_eos_result = await compute_pool.run(
+            generate_mixed_hugoniot_many, mixture_name, material_data_list, np.linspace(upmin_fit, upmax_fit, num_points_fit)
+        )
+    mixture_compute_seconds.observe(time.perf_counter() - start, job="fit", components=len(material_data_list),
+                                    fit_points_le=_fit_points_bucket(num_points_fit))
+    await _store_fit(fit_key, mixed_eos_result)
+    return mixed_eos_result
 
 def validate_positive_number(value: str, field_name: str) -> tuple[bool, float, str]:
     """Validate that a string represents a positive number.
@@ -190,6 +431,29 @@ def validate_integer_range(value: str, field_name: str, min_val: Optional[int] =
         return False, 0, f"{field_name} must be a valid integer"
 
 
+# Rendered <option> list for the premade dropdowns, rebuilt only when the catalog changes. The snapshot
+# (key, html, rendered) is replaced in one assignment and never mutated, so concurrent requests each see a whole one.
+_premade_options_cache = (None, "", {})
+
+def _premade_options_html(selected_material: str) -> str:
+    """Return the dropdown options for all catalog materials with `selected_material` marked as selected."""
+    global _premade_options_cache
+    cache_key = (id(material_catalog), material_catalog.version)
+    snapshot = _premade_options_cache
+    if snapshot[0] != cache_key:
+        rendered = {material.name: to_xml(Option(material.name, value=material.name))
+                    for material in material_catalog.all()}
+        snapshot = (cache_key, "".join(rendered.values()), rendered)
+        _premade_options_cache = snapshot
+    _, html, rendered = snapshot
+    if selected_material in rendered:
+        html = html.replace(
+            rendered[selected_material],
+            to_xml(Option(selected_material, value=selected_material, selected=True)),
+            1,
+        )
+    return html
+
 def _not_found(req, exc):
     return Titled("Oh no!", Div("We could not find that page :("))
 
@@ -224,10 +488,8 @@ def _create_material_form_section(section_idx: int, material_options: list, defa
 
     # Set selected for dropdown
     premade_options = [
-        Option("Select from dropdown", value="", disabled=True, selected=(selected_material == ""))
-    ] + [
-        Option(material.name, value=material.name, selected=(material.name == selected_material))
-        for material in materials() # Use materials() directly, not material_options
+        Option("Select from dropdown", value="", disabled=True, selected=(selected_material == "")),
+        NotStr(_premade_options_html(selected_material)),
     ]
 
     return (
@@ -337,7 +599,17 @@ document.addEventListener('DOMContentLoaded', function() {
 
 app = FastHTML(
     exception_handlers={404: _not_found},
-    hdrs=(picolink, Style(":root { --pico-font-size: 100%; }"), Script(script_dynamic_materials)),
+    hdrs=(
+        picolink, Style(":root { --pico-font-size: 100%; }"), Script(script_dynamic_materials),
+        Script(src=PLOTLY_BUNDLE_URL, defer=True), Script(PLOTLY_JSON_RENDERER),
+    ),
+    on_startup=[material_catalog.load, schedule_lookup_table_build, precompress_static_assets],
+    on_shutdown=[compute_pool.shutdown],
+    middleware=[Middleware(MetricsMiddleware, metrics=http_metrics)]
+               + ([Middleware(ServerTimingMiddleware)] if SERVER_TIMING else [])
+               + ([Middleware(CompressionMiddleware, run=compute_pool.run, minimum_size=COMPRESSION_MIN_SIZE,
+                              offload_size=COMPRESSION_OFFLOAD_SIZE, metrics=compression_metrics)]
+                  if COMPRESSION_ENABLED else []),
 )
 rt = app.route # rt is obtained here
 
@@ -357,22 +629,21 @@ def get_main_page(request: Request): # Kept descriptive name
         if key != 'num_materials':  # Skip the num_materials parameter
             existing_data[key] = value
     
-    print(f"Existing form data: {existing_data}")  # Debug logging
-    print(f"All query params: {dict(request.query_params)}")  # Debug logging
+    logger.debug(f"Existing form data: {existing_data}")
 
     title = "Slurry Maker - Material Mixing Calculator"
     top = Div(
         Grid(
             H1(title, style="margin-bottom:0.2em;"),
             Div(
+                A("Impedance Match", href="/impedance", cls="secondary", style="margin-right: 1em;"),
                 A("Add Material", href="/admin/add_material", cls="secondary"),
                 style="text-align: right; margin-bottom: 0.5em;"
             ),
         ),
         style=section_style
     )
-    material_options = [Option("Select from dropdown", value="", disabled=True, selected=True)] + \
-                       [Option(material.name, value=material.name) for material in materials()]
+    material_options = material_catalog.all()
 
     num_materials_form = Div(
         H2("Material Mixer", style=heading_style),
@@ -614,7 +885,7 @@ def process_material_form_data(form_data: FormData) -> tuple[list, list, str]:
                     else: 
                         continue
                 try:
-                    db_mat = materials[selected_name]
+                    db_mat = material_catalog.get(selected_name)
                     eos = HugoniotEOS(name=db_mat.name, rho0=db_mat.rho0, C0=db_mat.C0, S=db_mat.S)
                 except NotFoundError:
                     if vfrac > 0: 
@@ -693,8 +964,7 @@ def rebuild_form_with_error(form_data: FormData, error_message: str):
         num_materials = 2
     
     # Create material options
-    material_options = [Option("Select from dropdown", value="", disabled=True, selected=True)] + \
-                       [Option(material.name, value=material.name) for material in materials()]
+    material_options = material_catalog.all()
     
     # Function to get preserved data for each material
     def get_material_data(i):
@@ -789,10 +1059,12 @@ async def post_calculate(request: Request):
     form_data: FormData = await request.form()
     try:
         # Use the refactored function to process material data
-        material_data_list, original_material_configs_for_plot, error_msg = process_material_form_data(form_data)
+        with stage("parse"):
+            material_data_list, original_material_configs_for_plot, error_msg = process_material_form_data(form_data)
         
         if error_msg:
             # Return complete form with error message and preserved data
+            mark_outcome("validation_error")
             return rebuild_form_with_error(form_data, error_msg)
 
         # Validate calculation parameters
@@ -802,72 +1074,67 @@ async def post_calculate(request: Request):
         num_points_fit = get_numeric_form_value(form_data, "num_points_fit", 100, int)
 
         if upmin_fit >= upmax_fit: 
+            mark_outcome("validation_error")
             return rebuild_form_with_error(form_data, "Up_min for fit must be less than Up_max for fit.")
         if num_points_fit < 20: 
+            mark_outcome("validation_error")
             return rebuild_form_with_error(form_data, "Number of points for Up array (fit) must be at least 20.")
 
-        up_ref_array = np.linspace(upmin_fit, upmax_fit, num_points_fit)
-
-        # Perform calculation
-        mixed_eos_result = generate_mixed_hugoniot_many(
-            name=mixture_name, 
-            material_data_list=material_data_list, 
-            Up_ref=up_ref_array
-        )
-        plot_html = plot_mixture_many(
-            original_material_configs=original_material_configs_for_plot, 
-            mixed_eos=mixed_eos_result, 
-            up_min=upmin_fit, 
-            up_max=upmax_fit, 
-            num_points=200
+        # Perform calculation (or reuse an identical earlier one)
+        mixed_eos_result, plot_html = await compute_mixture_and_plot(
+            mixture_name, material_data_list, original_material_configs_for_plot,
+            upmin_fit, upmax_fit, num_points_fit
         )
         
-        # Rebuild the calculation form with POSTed values pre-filled
-        num_materials_in_form = len(original_material_configs_for_plot)
-        material_inputs_container_id = "material-inputs-container"
-        material_options = [Option("Select from dropdown", value="", disabled=True, selected=True)] + \
-                           [Option(material.name, value=material.name) for material in materials()]
+        # Rebuild the calculation form with POSTed values pre-filled. It is rendered here rather than by the
+        # framework so that its cost shows up as a timing stage
+        with stage("render"):
+            num_materials_in_form = len(original_material_configs_for_plot)
+            material_inputs_container_id = "material-inputs-container"
+            material_options = material_catalog.all()
         
-        material_form_sections = [
-            Div(
-                _create_material_form_section(
-                    i + 1,
-                    material_options,
-                    {
-                        "vfrac": form_data.get(f"vfrac{i+1}", 1.0/num_materials_in_form),
-                        "name": form_data.get(f"name{i+1}", ""),
-                        "rho0": get_numeric_form_value(form_data, f"rho0_{i+1}", 1.0, float),
-                        "C0": get_numeric_form_value(form_data, f"C0_{i+1}", 1.5, float),
-                        "S": get_numeric_form_value(form_data, f"S_{i+1}", 1.5, float),
-                        "material_type": form_data.get(f"material_type_{i+1}", "premade"),
-                        "selected": form_data.get(f"material{i+1}_select", ""),
-                    }
-                ),
-                style="background: #f8f9fa; border-radius: 8px; box-shadow: 0 1px 4px #0001; padding: 1.2em 1em; margin-bottom: 1.2em;"
-            )
-            for i in range(num_materials_in_form)
-        ]
+            material_form_sections = [
+                Div(
+                    _create_material_form_section(
+                        i + 1,
+                        material_options,
+                        {
+                            "vfrac": form_data.get(f"vfrac{i+1}", 1.0/num_materials_in_form),
+                            "name": form_data.get(f"name{i+1}", ""),
+                            "rho0": get_numeric_form_value(form_data, f"rho0_{i+1}", 1.0, float),
+                            "C0": get_numeric_form_value(form_data, f"C0_{i+1}", 1.5, float),
+                            "S": get_numeric_form_value(form_data, f"S_{i+1}", 1.5, float),
+                            "material_type": form_data.get(f"material_type_{i+1}", "premade"),
+                            "selected": form_data.get(f"material{i+1}_select", ""),
+                        }
+                    ),
+                    style="background: #f8f9fa; border-radius: 8px; box-shadow: 0 1px 4px #0001; padding: 1.2em 1em; margin-bottom: 1.2em;"
+                )
+                for i in range(num_materials_in_form)
+            ]
         
-        calculation_form = Div(
-            H2("Calculation Parameters", style=heading_style),
-            Form(
-                Div(*material_form_sections, id=material_inputs_container_id), Hr(),
-                Group(Label("Mixture Name (Optional)", for_="mixture_name"), Input(id="mixture_name", name="mixture_name", placeholder="e.g., MySlurryMix", type="text", value=mixture_name, style="width: 60%; min-width: 180px;")),
-                Group(Label("Minimum Up for EOS fit (km/s)", for_="upmin_fit"), Input(id="upmin_fit", name="upmin_fit", type="number", value=upmin_fit, step="any", style="width: 8em;")),
-                Group(Label("Maximum Up for EOS fit (km/s)", for_="upmax_fit"), Input(id="upmax_fit", name="upmax_fit", type="number", value=upmax_fit, step="any", style="width: 8em;")),
-                Group(Label("Number of points for Up array (EOS fit)", for_="num_points_fit"), Input(id="num_points_fit", name="num_points_fit", type="number", value=num_points_fit, step="1", min="20", style="width: 8em;")),
-                Button("Calculate Mixture", type="submit", cls="contrast", style="margin-top: 1em; width: 100%; font-size: 1.1em;"),
-                Button("Plot", id="plot-btn", type="submit", name="plot", hx_post="/plot", hx_target="#plot-container", hx_swap="innerHTML", hx_include="closest form", hx_trigger="click", cls="secondary", style="margin-top:1em; width:100%; font-size:1.1em;"),
-                method="post", hx_post="/calculate", hx_target="#main-form-content", hx_swap="outerHTML",
-                style="margin-bottom: 1.5em;"
-            ), id=None, style=section_style
-        )
+            calculation_form = Div(
+                H2("Calculation Parameters", style=heading_style),
+                Form(
+                    Div(*material_form_sections, id=material_inputs_container_id), Hr(),
+                    Group(Label("Mixture Name (Optional)", for_="mixture_name"), Input(id="mixture_name", name="mixture_name", placeholder="e.g., MySlurryMix", type="text", value=mixture_name, style="width: 60%; min-width: 180px;")),
+                    Group(Label("Minimum Up for EOS fit (km/s)", for_="upmin_fit"), Input(id="upmin_fit", name="upmin_fit", type="number", value=upmin_fit, step="any", style="width: 8em;")),
+                    Group(Label("Maximum Up for EOS fit (km/s)", for_="upmax_fit"), Input(id="upmax_fit", name="upmax_fit", type="number", value=upmax_fit, step="any", style="width: 8em;")),
+                    Group(Label("Number of points for Up array (EOS fit)", for_="num_points_fit"), Input(id="num_points_fit", name="num_points_fit", type="number", value=num_points_fit, step="1", min="20", style="width: 8em;")),
+                    Button("Calculate Mixture", type="submit", cls="contrast", style="margin-top: 1em; width: 100%; font-size: 1.1em;"),
+                    Button("Plot", id="plot-btn", type="submit", name="plot", hx_post="/plot", hx_target="#plot-container", hx_swap="innerHTML", hx_include="closest form", hx_trigger="click", cls="secondary", style="margin-top:1em; width:100%; font-size:1.1em;"),
+                    method="post", hx_post="/calculate", hx_target="#main-form-content", hx_swap="outerHTML",
+                    style="margin-bottom: 1.5em;"
+                ), id=None, style=section_style
+            )
         
+            calculation_form = NotStr(to_xml(calculation_form))
+
         # Return both the form and the plot in the same parent Div
         return Div(
             calculation_form,
             Div(
-                plot_html,
+                NotStr(plot_html),
                 id="plot-container",
                 style="margin-top: 2em;"
             ),
@@ -877,10 +1144,12 @@ async def post_calculate(request: Request):
         
     except ValueError as ve: 
         logger.error(f"Calculation error: {ve}")
+        mark_outcome("validation_error")
         return rebuild_form_with_error(form_data, f"Calculation Error: {ve}")
     except Exception as e:
         logger.error(f"Unexpected error in post_calculate: {e}")
         logger.error(traceback.format_exc())
+        mark_outcome("exception")
         return rebuild_form_with_error(form_data, f"An unexpected error occurred: {e}")
 
 @rt("/plot")
@@ -888,9 +1157,11 @@ async def post_plot(request: Request):
     form_data: FormData = await request.form()
     try:
         # Use the refactored function to process material data
-        material_data_list, original_material_configs_for_plot, error_msg = process_material_form_data(form_data)
+        with stage("parse"):
+            material_data_list, original_material_configs_for_plot, error_msg = process_material_form_data(form_data)
         
         if error_msg:
+            mark_outcome("validation_error")
             return P(f"Error: {error_msg}", style="color:red;")
 
         # Validate calculation parameters
@@ -900,35 +1171,75 @@ async def post_plot(request: Request):
         num_points_fit = get_numeric_form_value(form_data, "num_points_fit", 100, int)
 
         if upmin_fit >= upmax_fit: 
+            mark_outcome("validation_error")
             return P("Error: Up_min for fit must be less than Up_max for fit.", style="color:red;")
         if num_points_fit < 20: 
+            mark_outcome("validation_error")
             return P("Error: Number of points for Up array (fit) must be at least 20.", style="color:red;")
 
-        up_ref_array = np.linspace(upmin_fit, upmax_fit, num_points_fit)
-
-        # Perform calculation and return plot
-        mixed_eos_result = generate_mixed_hugoniot_many(
-            name=mixture_name, 
-            material_data_list=material_data_list, 
-            Up_ref=up_ref_array
-        )
-        plot_html = plot_mixture_many(
-            original_material_configs=original_material_configs_for_plot, 
-            mixed_eos=mixed_eos_result, 
-            up_min=upmin_fit, 
-            up_max=upmax_fit, 
-            num_points=200
+        # Perform calculation (or reuse the one from /calculate) and return plot
+        _, plot_html = await compute_mixture_and_plot(
+            mixture_name, material_data_list, original_material_configs_for_plot,
+            upmin_fit, upmax_fit, num_points_fit
         )
-        return plot_html
+        return NotStr(plot_html)
         
     except ValueError as ve: 
         logger.error(f"Calculation error in plot route: {ve}")
+        mark_outcome("validation_error")
         return P(f"Calculation Error: {ve}", style="color:red;")
     except Exception as e:
         logger.error(f"Unexpected error in plot route: {e}")
         logger.error(traceback.format_exc())
+        mark_outcome("exception")
         return P(f"Unexpected Error: {e}", style="color:red;")
 
+@rt("/export", methods=["post"])
+async def post_export(request: Request):
+    """
+    Stream the tabulated Hugoniot (up, Us, P, V, E) of the mixture described by the calculation form.
+    Extra fields: export_format ("csv" or "ndjson"), export_points, and optionally export_upmin/export_upmax
+    (default to the fit range). Rows are generated and sent in chunks, so large tables never sit in memory.
+    """
+    form_data: FormData = await request.form()
+    with stage("parse"):
+        material_data_list, original_material_configs_for_plot, error_msg = process_material_form_data(form_data)
+    if error_msg:
+        return PlainTextResponse(error_msg, status_code=400)
+
+    mixture_name = str(form_data.get("mixture_name", "MyMixture"))
+    upmin_fit = get_numeric_form_value(form_data, "upmin_fit", 0.0, float)
+    upmax_fit = get_numeric_form_value(form_data, "upmax_fit", 6.0, float)
+    num_points_fit = get_numeric_form_value(form_data, "num_points_fit", 100, int)
+    export_format = str(form_data.get("export_format", "csv"))
+    export_points = get_numeric_form_value(form_data, "export_points", 10_000, int)
+    export_upmin = get_numeric_form_value(form_data, "export_upmin", upmin_fit, float)
+    export_upmax = get_numeric_form_value(form_data, "export_upmax", upmax_fit, float)
+
+    if upmin_fit >= upmax_fit or export_upmin >= export_upmax:
+        return PlainTextResponse("Up_min must be less than Up_max.", status_code=400)
+    if num_points_fit < 20:
+        return PlainTextResponse("Number of points for Up array (fit) must be at least 20.", status_code=400)
+    if export_format not in EXPORT_FORMATS:
+        return PlainTextResponse(f"export_format must be one of: {', '.join(EXPORT_FORMATS)}.", status_code=400)
+    if not 2 <= export_points <= EXPORT_MAX_POINTS:
+        return PlainTextResponse(f"export_points must be between 2 and {EXPORT_MAX_POINTS}.", status_code=400)
+
+    try:
+        mixed_eos_result = await fit_mixture(
+            mixture_name, material_data_list, original_material_configs_for_plot, upmin_fit, upmax_fit, num_points_fit
+        )
+    except ValueError as ve:
+        logger.error(f"Export error: {ve}")
+        mark_outcome("validation_error")
+        return PlainTextResponse(f"Calculation Error: {ve}", status_code=400)
+    filename = "".join(c if c.isalnum() or c in "-_" else "_" for c in mixture_name) or "mixture"
+    return StreamingResponse(
+        iter_hugoniot_export(mixed_eos_result, export_format, export_upmin, export_upmax, export_points),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}_hugoniot.{export_format}"'},
+    )
+
 @rt("/get_material")
 def get_material_details(request: Request): # Kept descriptive name
     name_to_fetch = None
@@ -941,7 +1252,7 @@ def get_material_details(request: Request): # Kept descriptive name
     if not name_to_fetch:
         return P("Please select a material from a dropdown.", style="color:orange;")
     try:
-        material = materials[name_to_fetch]
+        material = material_catalog.get(name_to_fetch)
         return Div(
             Table(
                 Tr(Th("Name"), Td(material.name)),
@@ -956,8 +1267,196 @@ def get_material_details(request: Request): # Kept descriptive name
     except NotFoundError:
         return P(f"Material '{name_to_fetch}' not found.", style="color:red;")
 
+IMPEDANCE_MAX_ROWS = 5000
+
+def _impedance_results(flyer_names: list, target_names: list, v_min: float, v_max: float, v_steps: int):
+    """Results table of every selected flyer on every selected target over the velocity range."""
+    if not flyer_names or not target_names:
+        return P("Select at least one flyer and one target.", style="color:orange;")
+    if not (0 <= v_min <= v_max) or v_steps < 1:
+        return P("Velocities must satisfy 0 <= min <= max, with at least one step.", style="color:red;")
+    if len(flyer_names) * len(target_names) * v_steps > IMPEDANCE_MAX_ROWS:
+        return P(f"Too many combinations; at most {IMPEDANCE_MAX_ROWS} rows are listed.", style="color:red;")
+    try:
+        flyers = [material_catalog.get(n) for n in flyer_names]
+        targets = [material_catalog.get(n) for n in target_names]
+    except NotFoundError as e:
+        return P(f"Material '{e}' not found.", style="color:red;")
+
+    velocities = np.linspace(v_min, v_max, v_steps)
+    # One vectorized solve over flyer x target x velocity
+    match = impedance_match(flyers, targets, velocities)
+    rows = [
+        Tr(Td(flyer.name), Td(target.name), Td(f"{v:.3f}"), Td(f"{match.up[i, j, k]:.4f}"),
+           Td(f"{match.P[i, j, k]:.3f}"), Td(f"{match.target.Us[i, j, k]:.4f}"),
+           Td(f"{match.target.rho[i, j, k] / target.rho0:.4f}"))
+        for i, flyer in enumerate(flyers)
+        for j, target in enumerate(targets)
+        for k, v in enumerate(velocities)
+    ]
+    return Table(
+        Tr(Th("Flyer"), Th("Target"), Th("Velocity (km/s)"), Th("Up (km/s)"), Th("P (GPa)"),
+           Th("Target Us (km/s)"), Th("Target rho/rho0")),
+        *rows,
+    )
+
+@rt("/impedance", methods=["get"])
+def get_impedance(request: Request):
+    """Impedance-match page: interface pressure and particle velocity for flyer/target pairs from the catalog."""
+    params = request.query_params
+    flyer_names, target_names = params.getlist("flyer"), params.getlist("target")
+    v_min = get_numeric_form_value(params, "v_min", 1.0, float)
+    v_max = get_numeric_form_value(params, "v_max", 5.0, float)
+    v_steps = get_numeric_form_value(params, "v_steps", 5, int)
+    results = _impedance_results(flyer_names, target_names, v_min, v_max, v_steps) if flyer_names or target_names else ""
+    if request.headers.get("HX-Request"):
+        return results
+
+    names = material_catalog.names()
+    form = Form(
+        Grid(
+            Group(Label("Flyers", for_="flyer"),
+                  Select(*[Option(n, value=n, selected=n in flyer_names) for n in names], id="flyer", name="flyer", multiple=True, size="8")),
+            Group(Label("Targets", for_="target"),
+                  Select(*[Option(n, value=n, selected=n in target_names) for n in names], id="target", name="target", multiple=True, size="8")),
+        ),
+        Grid(
+            Group(Label("Minimum velocity (km/s)", for_="v_min"), Input(id="v_min", name="v_min", type="number", value=v_min, step="any", min="0")),
+            Group(Label("Maximum velocity (km/s)", for_="v_max"), Input(id="v_max", name="v_max", type="number", value=v_max, step="any", min="0")),
+            Group(Label("Velocity steps", for_="v_steps"), Input(id="v_steps", name="v_steps", type="number", value=v_steps, step="1", min="1")),
+        ),
+        Button("Match", type="submit", cls="contrast", style="margin-top: 1em; width: 100%;"),
+        method="get", action="/impedance", hx_get="/impedance", hx_target="#impedance-results", hx_swap="innerHTML",
+    )
+    return Titled("Impedance Match",
+        Div(
+            A("Return to Mixer", href="/", cls="secondary"),
+            P("Flyer plates at the given velocities impacting targets at rest. Select several materials to compare them."),
+            form,
+            Div(results, id="impedance-results", style="margin-top: 2em;"),
+            style=container_style,
+        )
+    )
+
+@rt(PLOTLY_BUNDLE_URL, methods=["get"])
+def get_plotly_bundle(request: Request):
+    """
+    plotly.js served from the installed plotly package; the URL is versioned, so browsers can cache it forever.
+    Clients that accept gzip or br get the precompressed bundle.
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding")) if COMPRESSION_ENABLED else None
+    headers = {"Cache-Control": LONG_CACHE_CONTROL, "ETag": plotly_bundle_etag(encoding), "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(plotly_bundle(), media_type="application/javascript", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(plotly_bundle_encoded(encoding, STATIC_CACHE_DIR), media_type="application/javascript",
+                    headers=headers)
+
+@rt("/status")
+def get_status(request: Request):
+    """Operational snapshot: compute pool load and queue depth, cache and lookup table counters, catalog size."""
+    return JSONResponse(dict(
+        compute_pool=compute_pool.stats(),
+        result_cache=result_cache.stats(),
+        lookup_tables=lookup_tables.stats(),
+        disk_cache=disk_cache.stats(),
+        coalescing=inflight.stats(),
+        materials=len(material_catalog),
+    ))
+
+def _cache_stats() -> dict:
+    return dict(result=result_cache.stats(), disk=disk_cache.stats(), lookup_tables=lookup_tables.stats())
+
+def _hit_ratio(stats: dict) -> float:
+    lookups = stats["hits"] + stats["misses"]
+    return stats["hits"] / lookups if lookups else 0.0
+
+metrics_registry.callback("material_catalog_size", "Materials in the catalog.", lambda: len(material_catalog))
+metrics_registry.callback("compute_pool_running", "Jobs running in the compute pool.",
+                          lambda: compute_pool.stats()["running"])
+metrics_registry.callback("compute_pool_queue_depth", "Jobs waiting for a compute pool slot.",
+                          lambda: compute_pool.stats()["queue_depth"])
+metrics_registry.callback("compute_pool_jobs_total", "Compute pool jobs finished, by result.",
+                          lambda: {(result,): compute_pool.stats()[result] for result in ("completed", "failed")},
+                          ("result",), type="counter")
+metrics_registry.callback("cache_hits_total", "Cache hits.",
+                          lambda: {(name,): stats["hits"] for name, stats in _cache_stats().items()},
+                          ("cache",), type="counter")
+metrics_registry.callback("cache_misses_total", "Cache misses.",
+                          lambda: {(name,): stats["misses"] for name, stats in _cache_stats().items()},
+                          ("cache",), type="counter")
+metrics_registry.callback("cache_hit_ratio", "Hits over lookups since startup.",
+                          lambda: {(name,): _hit_ratio(stats) for name, stats in _cache_stats().items()}, ("cache",))
+metrics_registry.callback("requests_coalesced_total", "Requests that waited on an identical in-flight computation.",
+                          lambda: inflight.stats()["coalesced"], type="counter")
+
+@rt("/metrics", methods=["get"])
+def get_metrics(request: Request):
+    """Prometheus text exposition of the metrics registry."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _catalog_eos(name: str) -> HugoniotEOS:
+    try:
+        material = material_catalog.get(name)
+    except NotFoundError:
+        raise KeyError(name) from None
+    return HugoniotEOS(name=material.name, rho0=material.rho0, C0=material.C0, S=material.S)
+
+async def post_mixtures_batch(request: Request):
+    """
+    Fit many mixtures in one request. The body is a JSON array of mixture specs (see batch_api.parse_mixture_spec);
+    the response has one entry per spec, in order, holding either the fitted rho0/C0/S and mass fractions or an error.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "Request body must be valid JSON"}, status_code=400)
+    try:
+        # Catalog names are resolved here, so only plain EOS parameters are sent to the pool
+        specs, errors = parse_batch_request(body, _catalog_eos)
+    except SpecError as e:
+        return JSONResponse({"error": str(e)}, status_code=413 if isinstance(e, RequestTooLarge) else 400)
+    results = await compute_pool.run(evaluate_mixture_specs, specs)
+    return JSONResponse({"results": merge_results(results, errors)})
+
+async def post_design(request: Request):
+    """
+    Inverse design: volume fractions of the given components whose mixture best matches a target rho0/C0/S and/or
+    impedance matches a window (see batch_api.parse_design_request). The search stops within time_budget_ms.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "Request body must be valid JSON"}, status_code=400)
+    try:
+        kwargs = parse_design_request(body, _catalog_eos)
+    except SpecError as e:
+        return JSONResponse({"error": str(e)}, status_code=413 if isinstance(e, RequestTooLarge) else 400)
+    try:
+        result = await compute_pool.run(design_mixture, **kwargs)
+    except ValueError as e:
+        mark_outcome("validation_error")
+        return JSONResponse({"error": str(e)}, status_code=422)
+    return JSONResponse(dict(
+        components=[eos.name for eos in kwargs["materials"]],
+        vfracs=result.vfracs.tolist(),
+        mfracs=list(result.mixture.mfracs),
+        rho0=result.mixture.rho0,
+        C0=result.mixture.C0,
+        S=result.mixture.S,
+        residual=result.residual,
+        evaluations=result.evaluations,
+        elapsed_ms=result.elapsed * 1000,
+    ))
+
+# Registered as plain Starlette routes: FastHTML's handler wrapper parses JSON bodies as objects and rejects top-level arrays
+app.add_route(Route("/api/mixtures:batch", post_mixtures_batch, methods=["POST"]))
+app.add_route(Route("/api/design", post_design, methods=["POST"]))
+
 # Admin route to add materials - placeholder for now
-@rt("/admin/add_material")
+@rt("/admin/add_material", methods=["get"])
 def get_admin_add_material(request: Request): # Kept descriptive name
     # Check if user is admin if implementing roles, for now just auth
     return Titled("Add Material - Admin",
@@ -973,7 +1472,7 @@ def get_admin_add_material(request: Request): # Kept descriptive name
         )
     )
 
-@rt("/admin/add_material")
+@rt("/admin/add_material", methods=["post"])
 async def post_admin_add_material(request: Request): # Kept descriptive name
     
     form_data = await request.form()
@@ -997,7 +1496,8 @@ async def post_admin_add_material(request: Request): # Kept descriptive name
         return Titled("Error Adding Material", P("Density and C0 must be positive values."))
     
     try:
-        materials.insert(dict(name=name, rho0=rho0, C0=C0, S=S))
+        material_catalog.insert(dict(name=name, rho0=rho0, C0=C0, S=S))
+        await schedule_lookup_table_build()
         return RedirectResponse("/", status_code=303) # Redirect to main page
     except Exception as e:
         return Titled("Error Adding Material", P(f"Could not add material: {e}"))
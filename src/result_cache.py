@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from components import HugoniotEOS
+
+
+def mixture_cache_key(material_configs: List[Tuple[HugoniotEOS, float]], mixture_name: str,
+                      up_min: float, up_max: float, num_points: int) -> str:
+    """
+    Canonical hash of a parsed mixture request.
+    Materials are identified by their parameters as well as their name, so editing a custom material
+    changes the key. Floats are serialized with repr precision so only identical inputs collide.
+    """
+    payload = {
+        "materials": [[eos.name, float(eos.rho0), float(eos.C0), float(eos.S), float(vfrac)]
+                      for eos, vfrac in material_configs],
+        "name": mixture_name,
+        "up_min": float(up_min),
+        "up_max": float(up_max),
+        "num_points": int(num_points),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by number of entries and total size in bytes, with a time-to-live per entry.
+    Sizes are supplied by the caller when storing a value, since only the caller knows what dominates it.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024, ttl: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, value = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: int):
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(entries=len(self._entries), bytes=self._bytes, hits=self.hits,
+                        misses=self.misses, evictions=self.evictions)
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async computations with the same key: the first caller starts the computation and
+    later callers with that key await the same task instead of starting their own. The task is shielded, so a
+    caller that disconnects does not cancel it for the others. Keys are forgotten once the task finishes, so
+    results are not retained here (that is the ResultCache's job).
+    """
+
+    def __init__(self):
+        self.started = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here so a failure nobody awaited anymore is not logged as unhandled
+
+    def stats(self) -> dict:
+        return dict(in_flight=len(self._inflight), started=self.started, coalesced=self.coalesced)
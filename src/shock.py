@@ -0,0 +1,217 @@
+"""Vectorized Rankine-Hugoniot shock states for linear Us-up Hugoniots."""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from components import HugoniotEOS, up_from_pressure
+
+# Anything with rho0/C0/S attributes works: a HugoniotEOS, MixedHugoniotEOS or MixtureBatchResult
+Materials = Union[HugoniotEOS, Sequence[HugoniotEOS]]
+
+
+@dataclass
+class ShockState:
+    """
+    Jump-condition state behind a shock. All arrays have the same shape.
+    Units: up, Us in km/s; P in GPa; V in cm^3/g; rho in g/cm^3; E (E - E0, from P0 = 0) in kJ/g.
+    """
+    up: np.ndarray
+    Us: np.ndarray
+    P: np.ndarray
+    V: np.ndarray
+    rho: np.ndarray
+    E: np.ndarray
+
+
+def material_arrays(materials: Materials) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    rho0, C0 and S of one or many materials as float arrays.
+    :param materials: an object with rho0/C0/S (scalars or arrays, e.g. MixtureBatchResult) or a sequence of HugoniotEOS
+    :returns: (rho0, C0, S), 0-d for a single material and shape (n_materials,) for a sequence
+    """
+    if hasattr(materials, "rho0"):
+        return (np.asarray(materials.rho0, dtype=float), np.asarray(materials.C0, dtype=float),
+                np.asarray(materials.S, dtype=float))
+    materials = list(materials)
+    return (np.array([m.rho0 for m in materials], dtype=float), np.array([m.C0 for m in materials], dtype=float),
+            np.array([m.S for m in materials], dtype=float))
+
+
+def shock_state(materials: Materials, *, P: Optional[npt.ArrayLike] = None, up: Optional[npt.ArrayLike] = None,
+                Us: Optional[npt.ArrayLike] = None, compression: Optional[npt.ArrayLike] = None,
+                outer: bool = True) -> ShockState:
+    """
+    Solves the jump conditions for one or many materials given exactly one of P, up, Us or compression (rho/rho0).
+    :param materials: see material_arrays
+    :param outer: if True, material parameters get trailing axes so the result has shape
+                  materials_shape + input_shape (every material at every input). If False, parameters and input
+                  are broadcast against each other directly, e.g. to pair material i with input i.
+    :returns: ShockState. States that do not exist (Us below C0 with S > 0, compression beyond the 1 + 1/(S-1)
+              limit, negative P) are NaN.
+    :raises ValueError: if not exactly one of P, up, Us, compression is given
+    """
+    given = {k: v for k, v in dict(P=P, up=up, Us=Us, compression=compression).items() if v is not None}
+    if len(given) != 1:
+        raise ValueError("Give exactly one of P, up, Us or compression")
+    (kind, value), = given.items()
+    x = np.asarray(value, dtype=float)
+
+    rho0, C0, S = material_arrays(materials)
+    if outer and x.ndim:
+        extra = (1,) * x.ndim
+        rho0, C0, S = rho0.reshape(rho0.shape + extra), C0.reshape(C0.shape + extra), S.reshape(S.shape + extra)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "up":
+            up_arr = np.where(x >= 0, x, np.nan)
+            Us_arr = C0 + S * up_arr
+        elif kind == "P":
+            up_arr = up_from_pressure(rho0, C0, S, np.where(x >= 0, x, np.nan))
+            Us_arr = C0 + S * up_arr
+        elif kind == "Us":
+            up_arr = (x - C0) / S
+            up_arr = np.where(up_arr >= 0, up_arr, np.nan)
+            Us_arr = np.broadcast_to(x, up_arr.shape).copy()
+        else:
+            # rho/rho0 = Us/(Us - up) with Us = C0 + S up  =>  up = C0 x / (1 - S x), x = 1 - rho0/rho
+            strain = 1.0 - 1.0 / x
+            denom = 1.0 - S * strain
+            up_arr = np.where((strain >= 0) & (denom > 0), C0 * strain / denom, np.nan)
+            Us_arr = C0 + S * up_arr
+
+        if up_arr.shape != Us_arr.shape:
+            up_arr = np.broadcast_to(up_arr, Us_arr.shape).copy()
+    return _state_from_up(rho0, up_arr, Us_arr)
+
+
+def _state_from_up(rho0, up, Us) -> ShockState:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        V = (1.0 - up / Us) / rho0
+        return ShockState(up=up, Us=Us, P=rho0 * Us * up, V=V, rho=1.0 / V, E=0.5 * up * up)
+
+
+@dataclass
+class ImpedanceMatch:
+    """
+    Result of a symmetric or asymmetric plate impact. up is the interface particle velocity in the lab frame.
+    target is the shocked target state; flyer is the shocked flyer state with up measured relative to the
+    undisturbed flyer (velocity - up). Both states have the same P.
+    """
+    up: np.ndarray
+    P: np.ndarray
+    target: ShockState
+    flyer: ShockState
+
+
+def impedance_match_up(rho_f, C_f, S_f, rho_t, C_t, S_t, velocity):
+    """
+    Interface particle velocity for a flyer at velocity hitting a target at rest, from
+    rho_t (C_t + S_t u) u = rho_f (C_f + S_f (v - u)) (v - u), i.e. a u^2 + b u + c = 0 with
+    a = rho_t S_t - rho_f S_f, b = rho_t C_t + rho_f C_f + 2 rho_f S_f v, c = -rho_f v (C_f + S_f v).
+    The physical root (0 <= u <= v) is taken as -2c / (b + sqrt(b^2 - 4ac)), which is exact for a = 0
+    (e.g. symmetric impact) and does not cancel when a is small. All arguments broadcast.
+    """
+    a = rho_t * S_t - rho_f * S_f
+    b = rho_t * C_t + rho_f * C_f + 2.0 * rho_f * S_f * velocity
+    c = -rho_f * velocity * (C_f + S_f * velocity)
+    return -2.0 * c / (b + np.sqrt(b * b - 4.0 * a * c))
+
+
+def impedance_match(flyer: Materials, target: Materials, velocity: npt.ArrayLike, outer: bool = True) -> ImpedanceMatch:
+    """
+    Impedance match of flyer plates on targets at rest, for many flyers, targets and impact velocities at once.
+    :param flyer: flyer material(s), see material_arrays
+    :param target: target material(s), see material_arrays
+    :param velocity: flyer velocity (km/s), any shape
+    :param outer: if True the result has shape flyer_shape + target_shape + velocity_shape (every flyer on every
+                  target at every velocity, e.g. catalog x catalog x velocity grid). If False, the three are
+                  broadcast against each other directly.
+    """
+    v = np.asarray(velocity, dtype=float)
+    rho_f, C_f, S_f = material_arrays(flyer)
+    rho_t, C_t, S_t = material_arrays(target)
+    if outer:
+        target_extra = (1,) * v.ndim
+        flyer_extra = (1,) * (rho_t.ndim + v.ndim)
+        rho_f, C_f, S_f = (x.reshape(x.shape + flyer_extra) for x in (rho_f, C_f, S_f))
+        rho_t, C_t, S_t = (x.reshape(x.shape + target_extra) for x in (rho_t, C_t, S_t))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = impedance_match_up(rho_f, C_f, S_f, rho_t, C_t, S_t, v)
+        u = np.where(v >= 0, u, np.nan)
+        # Broadcast everything to the full result shape once
+        u, rho_f, C_f, S_f, rho_t, C_t, S_t, v = np.broadcast_arrays(u, rho_f, C_f, S_f, rho_t, C_t, S_t, v)
+        u = u.copy()
+        target_state = _state_from_up(rho_t, u, C_t + S_t * u)
+        u_flyer = v - u
+        flyer_state = _state_from_up(rho_f, u_flyer, C_f + S_f * u_flyer)
+    return ImpedanceMatch(up=u, P=target_state.P, target=target_state, flyer=flyer_state)
+
+
+@dataclass
+class StackSolution:
+    """Shock states in each layer of a target stack, in stack order. Every state has the same shape."""
+    layers: List[ShockState]
+
+    @property
+    def up(self) -> np.ndarray:
+        """Particle velocity with the layer index as the first axis."""
+        return np.stack([state.up for state in self.layers])
+
+    @property
+    def P(self) -> np.ndarray:
+        """Pressure with the layer index as the first axis."""
+        return np.stack([state.P for state in self.layers])
+
+
+def solve_stack(layers: Sequence[Materials], *, velocity: Optional[npt.ArrayLike] = None, flyer: Optional[Materials] = None,
+                up: Optional[npt.ArrayLike] = None, P: Optional[npt.ArrayLike] = None) -> StackSolution:
+    """
+    Shock transmitted through an ordered stack of layers (e.g. driver / sample / window).
+    Each interface is impedance matched with the reflected-Hugoniot approximation: the release (or reshock) path
+    of the layer behind the interface is its Hugoniot mirrored about its particle velocity u_k, so the next layer's
+    state is an impedance match with layer k as a "flyer" at 2 u_k. The states returned are the first shock in
+    each layer; later reverberations are not followed.
+    :param layers: layer materials in stack order. A layer may hold many candidates (a sequence of EOS or a
+                   MixtureBatchResult); candidate axes of all layers (and the flyer) are broadcast together.
+    :param velocity: with flyer, the impact velocity (km/s)
+    :param flyer: flyer material hitting the first layer
+    :param up: alternatively, the particle velocity of the shock in the first layer
+    :param P: alternatively, the pressure of the shock in the first layer
+    :returns: StackSolution whose states have shape candidate_shape + drive_shape
+    :raises ValueError: if the stack is empty or the drive is not exactly one of flyer+velocity, up or P
+    """
+    if not layers:
+        raise ValueError("The stack needs at least one layer")
+    drives = [d for d in (velocity, up, P) if d is not None]
+    if len(drives) != 1 or (flyer is None) != (velocity is None):
+        raise ValueError("Drive the stack with exactly one of flyer and velocity, up, or P")
+    drive = np.asarray(drives[0], dtype=float)
+
+    params = [material_arrays(layer) for layer in layers]
+    flyer_params = material_arrays(flyer) if flyer is not None else None
+    shapes = [p[0].shape for p in params] + ([flyer_params[0].shape] if flyer_params else [])
+    candidate_shape = np.broadcast_shapes(*shapes)
+    extra = (1,) * drive.ndim
+
+    def expand(values):
+        return tuple(np.broadcast_to(x, candidate_shape).reshape(candidate_shape + extra) for x in values)
+
+    params = [expand(p) for p in params]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho0, C0, S = params[0]
+        if flyer_params is not None:
+            u = impedance_match_up(*expand(flyer_params), rho0, C0, S, np.where(drive >= 0, drive, np.nan))
+        elif up is not None:
+            u = np.where(drive >= 0, drive, np.nan)
+        else:
+            u = up_from_pressure(rho0, C0, S, np.where(drive >= 0, drive, np.nan))
+        u = np.broadcast_to(u, np.broadcast_shapes(rho0.shape, np.shape(u))).copy()
+
+        states = [_state_from_up(rho0, u, C0 + S * u)]
+        for (rho_k, C_k, S_k), (rho_n, C_n, S_n) in zip(params, params[1:]):
+            u = impedance_match_up(rho_k, C_k, S_k, rho_n, C_n, S_n, 2.0 * u)
+            states.append(_state_from_up(rho_n, u, C_n + S_n * u))
+    return StackSolution(layers=states)
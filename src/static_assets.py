@@ -0,0 +1,81 @@
+"""Locally served static assets, so pages work without a CDN (e.g. on air-gapped lab machines)."""
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from importlib.metadata import version
+from typing import Optional
+
+from compression import compress
+
+# plotly.py ships one plotly.js build per release, so the package version pins the bundle and makes the URL cacheable forever
+PLOTLY_VERSION = version("plotly")
+PLOTLY_BUNDLE_URL = f"/static/plotly-{PLOTLY_VERSION}.min.js"
+LONG_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Static assets are compressed once at the highest level; Brotli at quality 11 takes seconds for plotly.js
+PRECOMPRESSION_LEVELS = {"gzip": 9, "br": 11}
+ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+# Draws figures embedded as <script type="application/json" data-plotly-figure="target-id"> (plot_mode="json").
+# Runs on page load and after every HTMX swap; each target is drawn once.
+PLOTLY_JSON_RENDERER = r"""
+function renderPlotlyJsonFigures() {
+    if (typeof Plotly === 'undefined') return;
+    document.querySelectorAll('script[type="application/json"][data-plotly-figure]').forEach(function(el) {
+        const target = document.getElementById(el.dataset.plotlyFigure);
+        if (!target || target.dataset.rendered) return;
+        const fig = JSON.parse(el.textContent);
+        Plotly.newPlot(target, fig.data, fig.layout, fig.config || {responsive: true});
+        target.dataset.rendered = '1';
+    });
+}
+document.addEventListener('DOMContentLoaded', renderPlotlyJsonFigures);
+document.addEventListener('htmx:afterSettle', renderPlotlyJsonFigures);
+"""
+
+
+@lru_cache(maxsize=1)
+def plotly_bundle() -> bytes:
+    """The minified plotly.js bundled with the installed plotly package."""
+    from plotly.offline import get_plotlyjs
+    return get_plotlyjs().encode("utf-8")
+
+
+@lru_cache(maxsize=1)
+def _plotly_bundle_hash() -> str:
+    return hashlib.sha256(plotly_bundle()).hexdigest()[:32]
+
+
+def plotly_bundle_etag(encoding: Optional[str] = None) -> str:
+    """Strong ETag of the bundle; each content coding is a separate representation with its own tag."""
+    return f'"{_plotly_bundle_hash()}-{encoding}"' if encoding else f'"{_plotly_bundle_hash()}"'
+
+
+_encoded_bundles = {}
+_encoded_bundles_lock = threading.Lock()
+
+
+def plotly_bundle_encoded(encoding: str, cache_dir: Optional[str] = None) -> bytes:
+    """
+    The bundle compressed with `encoding` ("gzip" or "br") at the highest level, computed once per process.
+    With cache_dir the compressed file is kept on disk too, so restarts do not compress it again.
+    """
+    with _encoded_bundles_lock:
+        if encoding in _encoded_bundles:
+            return _encoded_bundles[encoding]
+        path = None
+        if cache_dir:
+            path = os.path.join(cache_dir, os.path.basename(PLOTLY_BUNDLE_URL) + f".{_plotly_bundle_hash()}"
+                                + ENCODING_SUFFIXES[encoding])
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                body = f.read()
+        else:
+            body = compress(plotly_bundle(), encoding, level=PRECOMPRESSION_LEVELS[encoding])
+            if path:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(path + ".tmp", "wb") as f:
+                    f.write(body)
+                os.replace(path + ".tmp", path)
+        _encoded_bundles[encoding] = body
+        return body
@@ -0,0 +1,40 @@
+"""Compute and render jobs that run in the compute pool. Everything here must stay picklable for process pools."""
+from typing import Optional
+
+import numpy as np
+from fasthtml.common import to_xml
+
+from components import (
+    MixedHugoniotEOS, build_mixture_figures, generate_mixed_hugoniot_many, plot_mixture_many, plot_up_range,
+)
+from timing import stage
+
+
+def render_mixture(mixture_name: str, material_data_list: list, original_material_configs_for_plot: list,
+                   upmin_fit: float, upmax_fit: float, num_points_fit: int,
+                   plot_mode: str = "html", array_encoding: str = "b64",
+                   mixed_eos_result: Optional[MixedHugoniotEOS] = None) -> tuple[MixedHugoniotEOS, str]:
+    """Fit the mixture (unless a precomputed mixed_eos_result is given) and render its plot fragment to HTML."""
+    if mixed_eos_result is None:
+        up_ref_array = np.linspace(upmin_fit, upmax_fit, num_points_fit)
+        with stage("fit"):
+            mixed_eos_result = generate_mixed_hugoniot_many(
+                name=mixture_name,
+                material_data_list=material_data_list,
+                Up_ref=up_ref_array
+            )
+    with stage("figure"):
+        figures = build_mixture_figures(original_material_configs_for_plot, mixed_eos_result,
+                                        plot_up_range(upmin_fit, upmax_fit, 200))
+    with stage("serialize"):
+        plot = plot_mixture_many(
+            original_material_configs=original_material_configs_for_plot,
+            mixed_eos=mixed_eos_result,
+            up_min=upmin_fit,
+            up_max=upmax_fit,
+            plot_mode=plot_mode,
+            array_encoding=array_encoding,
+            figures=figures
+        )
+        plot_html = to_xml(plot)
+    return mixed_eos_result, plot_html
@@ -0,0 +1,100 @@
+"""
+Per-request stage timers, reported as a Server-Timing header and a structured log line.
+Timers only run inside a request handled by ServerTimingMiddleware; elsewhere stage() is a no-op, so code can be
+instrumented unconditionally and costs a context variable lookup when timing is disabled.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger("timing")
+
+# Stage name -> accumulated seconds for the current request, or None when timing is off
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("stages", default=None)
+
+
+def active() -> bool:
+    return _stages.get() is not None
+
+
+@contextmanager
+def stage(name: str):
+    """Time the block and add it to the current request's stage `name` (repeated stages accumulate)."""
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def record(stages: Dict[str, float]):
+    """Add stage timings measured elsewhere (e.g. returned by collect from a pool worker) to the current request."""
+    current = _stages.get()
+    if current is None:
+        return
+    for name, seconds in stages.items():
+        current[name] = current.get(name, 0.0) + seconds
+
+
+def collect(fn: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, float]]:
+    """
+    Call fn with fresh stage timers and return (result, stages).
+    Pool workers do not see the request's context, so jobs are wrapped in this and the caller records the stages.
+    """
+    token = _stages.set({})
+    try:
+        result = fn(*args, **kwargs)
+        return result, _stages.get()
+    finally:
+        _stages.reset(token)
+
+
+def server_timing_header(stages: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages.items())
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that times every HTTP request: stages recorded while handling it, plus "total" up to the
+    response headers, are sent as a Server-Timing header and logged as one JSON line per request.
+    Stages that finish after the headers are sent (e.g. a streamed body) only appear in the log line.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stages: Dict[str, float] = {}
+        status = None
+        token = _stages.set(stages)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                stages["total"] = time.perf_counter() - start
+                MutableHeaders(scope=message).append("Server-Timing", server_timing_header(stages))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _stages.reset(token)
+            elapsed = time.perf_counter() - start
+            logger.info(json.dumps(dict(
+                method=scope["method"], path=scope["path"], status=status, duration_ms=round(elapsed * 1000, 3),
+                stages={name: round(seconds * 1000, 3) for name, seconds in stages.items() if name != "total"},
+            )))
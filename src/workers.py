@@ -0,0 +1,80 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+
+class ComputePool:
+    """
+    Runs blocking NumPy/SciPy/Plotly work off the asyncio event loop.
+    Work goes to a thread or process pool (created on first use). At most `max_concurrency` jobs are handed to the
+    pool at once; the rest wait on a semaphore, and the number waiting is reported as the queue depth.
+    With kind="process", the function and its arguments must be picklable (module-level functions, dataclasses).
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: Optional[int] = None, max_concurrency: Optional[int] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Pool kind must be 'thread' or 'process', got {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ComputePool":
+        workers = os.environ.get("COMPUTE_POOL_WORKERS")
+        concurrency = os.environ.get("COMPUTE_POOL_MAX_CONCURRENCY")
+        return cls(
+            kind=os.environ.get("COMPUTE_POOL_KIND", "thread"),
+            max_workers=int(workers) if workers else None,
+            max_concurrency=int(concurrency) if concurrency else None,
+        )
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="compute")
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the pool and return its result without blocking the event loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            result = await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+            self.completed += 1
+            return result
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return dict(kind=self.kind, max_workers=self.max_workers, max_concurrency=self.max_concurrency,
+                    running=self.running, queue_depth=self.waiting, completed=self.completed, failed=self.failed)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -8,6 +8,45 @@ import numpy as np
 # Add src directory to path so we can import modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+
+class FakeClock:
+    """Clock for cache tests: set now by hand, or give a tick to advance it on every call."""
+
+    def __init__(self, now=0.0, tick=0.0):
+        self.now = now
+        self.tick = tick
+
+    def __call__(self):
+        self.now += self.tick
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    """A FakeClock at 0 that only moves when the test sets now."""
+    return FakeClock()
+
+
+@pytest.fixture
+def ticking_clock():
+    """A FakeClock that advances by 1 on every call, so each access gets a distinct time."""
+    return FakeClock(tick=1.0)
+
+
+@pytest.fixture
+def isolated_disk_cache(tmp_path, monkeypatch):
+    """
+    Point main.disk_cache at an empty cache under tmp_path, so tests never read or clear data/result_cache.db.
+    Route tests request it with @pytest.mark.usefixtures("isolated_disk_cache").
+    """
+    import main
+    from disk_cache import DiskCache
+
+    cache = DiskCache(str(tmp_path / "result_cache.db"))
+    monkeypatch.setattr(main, "disk_cache", cache)
+    yield cache
+    cache.close()
+
 @pytest.fixture
 def temp_db():
     """Create a temporary database for testing."""
@@ -0,0 +1,127 @@
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from components import HugoniotEOS, generate_mixed_hugoniot_many
+import batch_api
+from batch_api import SpecError, RequestTooLarge, parse_mixture_spec, parse_batch_request, evaluate_mixture_specs, merge_results
+
+
+@pytest.fixture
+def lookup(test_hugoniot_eos):
+    by_name = {eos.name: eos for eos in test_hugoniot_eos}
+    return lambda name: by_name[name]
+
+
+def spec(cu, al, **kwargs):
+    return dict(name="CuAl", components=[{"material": "Copper", "vfrac": cu}, {"material": "Aluminum", "vfrac": al}], **kwargs)
+
+
+class TestParseMixtureSpec:
+    """Test suite for mixture spec validation."""
+
+    def test_catalog_and_inline_components(self, lookup):
+        parsed = parse_mixture_spec(dict(components=[
+            {"material": "Copper", "vfrac": 0.5},
+            {"name": "Foam", "rho0": 0.3, "C0": 1.0, "S": 1.2, "vfrac": 0.5},
+        ]), lookup)
+        assert [m.name for m in parsed.materials] == ["Copper", "Foam"]
+        assert (parsed.up_min, parsed.up_max, parsed.num_points) == (0.0, 6.0, 100)
+        assert parsed.name == "Mixture1"
+
+    def test_zero_fraction_components_dropped(self, lookup):
+        parsed = parse_mixture_spec(spec(1.0, 0.0), lookup)
+        assert [m.name for m in parsed.materials] == ["Copper"]
+
+    @pytest.mark.parametrize("bad, message", [
+        (spec(0.5, 0.4), "sum to 1.0"),
+        (spec(0.5, 0.5, up_min=5, up_max=1), "up_min"),
+        (spec(0.5, 0.5, num_points=5), "num_points"),
+        (dict(components=[{"material": "Unobtainium", "vfrac": 1.0}]), "not found"),
+        (dict(components=[{"rho0": -1, "C0": 1, "S": 1, "vfrac": 1.0}]), "positive"),
+        (dict(components=[{"material": "Copper", "vfrac": "1"}]), "must be a number"),
+        (dict(components=[]), "non-empty"),
+        ("Copper", "JSON object"),
+    ])
+    def test_invalid_specs(self, lookup, bad, message):
+        with pytest.raises(SpecError, match=message):
+            parse_mixture_spec(bad, lookup)
+
+    def test_batch_body_must_be_array(self, lookup):
+        with pytest.raises(SpecError):
+            parse_batch_request({"components": []}, lookup)
+
+    def test_total_points_limited(self, lookup, monkeypatch):
+        monkeypatch.setattr(batch_api, "MAX_POINTS_PER_REQUEST", 1000)
+        parse_batch_request([spec(0.5, 0.5, num_points=500)] * 2, lookup)
+        with pytest.raises(RequestTooLarge, match="1500 fit points"):
+            parse_batch_request([spec(0.5, 0.5, num_points=500)] * 3, lookup)
+
+
+class TestEvaluateMixtureSpecs:
+    """Batch results match the single-mixture path."""
+
+    def test_matches_generate_mixed_hugoniot_many(self, lookup, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        body = [spec(0.3, 0.7), spec(0.6, 0.4, up_max=4.0), "bad", spec(0.9, 0.1)]
+        specs, errors = parse_batch_request(body, lookup)
+        results = merge_results(evaluate_mixture_specs(specs), errors)
+
+        assert results[2] == {"error": "Mixture spec must be a JSON object"}
+        for result, (cu, up_max) in zip([results[0], results[1], results[3]], [(0.3, 6.0), (0.6, 4.0), (0.9, 6.0)]):
+            expected = generate_mixed_hugoniot_many("CuAl", [(copper, cu), (aluminum, 1 - cu)], np.linspace(0, up_max, 100))
+            assert result["rho0"] == pytest.approx(expected.rho0)
+            assert result["C0"] == pytest.approx(expected.C0, rel=1e-9)
+            assert result["S"] == pytest.approx(expected.S, rel=1e-9)
+            assert result["mfracs"] == pytest.approx(list(expected.mfracs))
+            assert result["components"] == ["Copper", "Aluminum"]
+
+    def test_chunked_evaluation_matches(self, lookup, monkeypatch):
+        specs, _ = parse_batch_request([spec(cu, 1 - cu) for cu in np.linspace(0.05, 0.95, 7)], lookup)
+        whole = evaluate_mixture_specs(specs)
+        monkeypatch.setattr(batch_api, "EVALUATION_CHUNK_POINTS", 250)  # two compositions of 100 points per call
+        for chunked, expected in zip(evaluate_mixture_specs(specs), whole):
+            assert chunked["S"] == pytest.approx(expected["S"], rel=1e-12)
+            assert chunked["C0"] == pytest.approx(expected["C0"], rel=1e-12)
+            assert chunked["mfracs"] == pytest.approx(expected["mfracs"])
+
+
+class TestBatchRoute:
+    """Test suite for POST /api/mixtures:batch."""
+
+    def test_batch_route(self):
+        from starlette.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        name = main.material_catalog.names()[0]
+        response = client.post('/api/mixtures:batch', json=[
+            {"components": [{"material": name, "vfrac": 0.5}, {"rho0": 1.0, "C0": 1.5, "S": 1.3, "vfrac": 0.5}]},
+            {"components": [{"material": name, "vfrac": 0.2}]},
+        ])
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert set(results[0]) >= {"rho0", "C0", "S", "mfracs"}
+        assert "sum to 1.0" in results[1]["error"]
+
+    def test_batch_route_rejects_non_array(self):
+        from starlette.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        assert client.post('/api/mixtures:batch', json={"components": []}).status_code == 400
+        assert client.post('/api/mixtures:batch', content=b"not json").status_code == 400
+
+    def test_batch_route_rejects_too_many_points(self):
+        from starlette.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        name = main.material_catalog.names()[0]
+        body = [{"components": [{"material": name, "vfrac": 1.0}], "num_points": batch_api.MAX_FIT_POINTS}] * 21
+        assert client.post('/api/mixtures:batch', json=body).status_code == 413
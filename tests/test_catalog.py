@@ -0,0 +1,89 @@
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from fastlite import NotFoundError
+from catalog import MaterialCatalog
+
+
+def make_row(name, rho0=1.0, C0=2.0, S=1.5):
+    row = Mock()
+    row.name, row.rho0, row.C0, row.S = name, rho0, C0, S
+    return row
+
+
+@pytest.fixture
+def mock_table():
+    table = Mock(return_value=[make_row("A"), make_row("B")])
+    table.insert = Mock(side_effect=lambda d: make_row(**d))
+    return table
+
+
+class TestMaterialCatalog:
+    """Test suite for the in-memory material catalog."""
+
+    def test_scans_table_once(self, mock_table):
+        catalog = MaterialCatalog(mock_table)
+        assert mock_table.call_count == 0  # Lazy until first use
+
+        assert catalog.names() == ["A", "B"]
+        assert catalog.get("B").name == "B"
+        assert "A" in catalog
+        assert len(catalog) == 2
+        assert mock_table.call_count == 1
+
+    def test_missing_name_raises_not_found(self, mock_table):
+        catalog = MaterialCatalog(mock_table)
+        with pytest.raises(NotFoundError):
+            catalog.get("Missing")
+
+    def test_insert_writes_through(self, mock_table):
+        catalog = MaterialCatalog(mock_table)
+        catalog.load()
+        version = catalog.version
+        listing_before = catalog.all()
+
+        catalog.insert(dict(name="C", rho0=3.0, C0=4.0, S=1.2))
+
+        mock_table.insert.assert_called_once()
+        assert catalog.names() == ["A", "B", "C"]
+        assert catalog.get("C").rho0 == 3.0
+        assert catalog.version > version
+        assert mock_table.call_count == 1  # No rescan needed
+        assert [row.name for row in listing_before] == ["A", "B"]
+
+    def test_invalidate_rescans(self, mock_table):
+        catalog = MaterialCatalog(mock_table)
+        catalog.load()
+        mock_table.return_value = [make_row("Z")]
+
+        catalog.invalidate()
+
+        assert catalog.names() == ["Z"]
+        assert mock_table.call_count == 2
+
+
+class TestCatalogInApp:
+    """The app serves materials from the catalog."""
+
+    def test_admin_add_material_updates_dropdowns(self, mock_table):
+        from starlette.testclient import TestClient
+        import main
+
+        with patch('main.material_catalog', MaterialCatalog(mock_table)):
+            client = TestClient(main.app)
+            before = client.get('/')
+            response = client.post('/admin/add_material', data=dict(name="New Mat", rho0="2.0", C0="3.0", S="1.4"),
+                                   follow_redirects=False)
+            after = client.get('/')
+            details = client.get('/get_material', params={'material1_select': 'New Mat'})
+
+        assert 'New Mat' not in before.text
+        assert response.status_code == 303
+        assert '<option value="New Mat">New Mat</option>' in after.text
+        assert '2.0000' in details.text
+        assert mock_table.call_count == 1
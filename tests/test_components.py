@@ -2,11 +2,16 @@ import pytest
 import numpy as np
 import sys
 import os
+import dataclasses
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from components import HugoniotEOS, MixedHugoniotEOS, convert_volfrac_to_massfrac, generate_mixed_hugoniot
+from components import (
+    HugoniotEOS, MixedHugoniotEOS, convert_volfrac_to_massfrac, generate_mixed_hugoniot,
+    generate_mixed_hugoniot_many, generate_mixed_hugoniot_batch, ComponentUpCache, component_up_cache,
+    linear_fit, generate_mixed_hugoniot_uncertainty, mixture_jacobian,
+)
 
 
 class TestHugoniotEOS:
@@ -227,6 +232,7 @@ class TestGenerateMixedHugoniot:
         assert len(result.vfracs) == 2
         assert abs(result.vfracs[0] - Vx_copper) < 1e-10
         assert abs(result.vfracs[1] - (1 - Vx_copper)) < 1e-10
+        assert type(result.C0) is float and type(result.S) is float
     
     def test_extreme_volume_fractions(self, test_hugoniot_eos):
         """Test with extreme volume fractions."""
@@ -271,3 +277,344 @@ class TestGenerateMixedHugoniot:
         assert isinstance(result, MixedHugoniotEOS)
         assert result.name == "Default_Up"
         assert len(result.vfracs) == 2
+
+
+class TestGenerateMixedHugoniotBatch:
+    """Test suite for the vectorized composition-sweep engine."""
+
+    def test_matches_single_composition(self, test_hugoniot_eos):
+        """Each row of the batch should match generate_mixed_hugoniot_many."""
+        copper, aluminum = test_hugoniot_eos
+        kapton = HugoniotEOS(name="Kapton", rho0=1.37, C0=2.327, S=1.55)
+        materials = [copper, aluminum, kapton]
+        vfracs = np.array([[0.2, 0.3, 0.5], [0.6, 0.1, 0.3], [1.0, 0.0, 0.0]])
+        Up = np.linspace(0, 6, 100)
+
+        batch = generate_mixed_hugoniot_batch(materials, vfracs, Up)
+
+        assert len(batch) == 3
+        assert batch.components == ["Copper", "Aluminum", "Kapton"]
+        for i, row in enumerate(vfracs):
+            single = generate_mixed_hugoniot_many("mix", list(zip(materials, row)), Up)
+            assert batch.rho0[i] == pytest.approx(single.rho0, rel=1e-12)
+            assert batch.C0[i] == pytest.approx(single.C0, rel=1e-9)
+            assert batch.S[i] == pytest.approx(single.S, rel=1e-9)
+            np.testing.assert_allclose(batch.mfracs[i], single.mfracs, rtol=1e-12)
+
+    def test_binary_sweep(self, test_hugoniot_eos):
+        """A fine binary sweep should come back as arrays of the right shape."""
+        copper, aluminum = test_hugoniot_eos
+        x = np.linspace(0, 1, 1001)
+        vfracs = np.column_stack([x, 1 - x])
+
+        batch = generate_mixed_hugoniot_batch([copper, aluminum], vfracs, np.linspace(0, 6, 100))
+
+        assert batch.rho0.shape == (1001,)
+        assert batch.C0.shape == (1001,)
+        assert batch.mfracs.shape == (1001, 2)
+        np.testing.assert_allclose(batch.mfracs.sum(axis=1), 1.0)
+        # Pure end members recover the component fits
+        assert batch.C0[-1] == pytest.approx(copper.C0, rel=1e-9)
+        assert batch.S[-1] == pytest.approx(copper.S, rel=1e-9)
+        assert batch.C0[0] == pytest.approx(aluminum.C0, rel=1e-9)
+        assert batch.S[0] == pytest.approx(aluminum.S, rel=1e-9)
+
+    def test_to_eos(self, test_hugoniot_eos):
+        """A batch row converts to a MixedHugoniotEOS."""
+        copper, aluminum = test_hugoniot_eos
+        batch = generate_mixed_hugoniot_batch([copper, aluminum], [[0.4, 0.6]], np.linspace(0, 6, 50))
+
+        mixed = batch.to_eos(0, "row0")
+
+        assert isinstance(mixed, MixedHugoniotEOS)
+        assert mixed.name == "row0"
+        assert mixed.vfracs == [0.4, 0.6]
+        assert mixed.C0 == batch.C0[0]
+        assert mixed.fit.n == 49
+        assert mixed.fit.intercept_stderr == batch.C0_stderr[0]
+
+    def test_too_few_fit_points_logs_warning(self, test_hugoniot_eos, caplog):
+        """Compositions without enough points for the fit fall back to C0 of the first component and S=0."""
+        copper, aluminum = test_hugoniot_eos
+        with caplog.at_level("WARNING", logger="components"):
+            batch = generate_mixed_hugoniot_batch([copper, aluminum], [[0.5, 0.5]], np.zeros(20))
+
+        assert batch.C0[0] == copper.C0 and batch.S[0] == 0.0
+        assert "1 compositions" in caplog.text
+
+    def test_many_too_few_fit_points_logs_warning(self, test_hugoniot_eos, caplog):
+        copper, aluminum = test_hugoniot_eos
+        with caplog.at_level("WARNING", logger="components"):
+            mixed = generate_mixed_hugoniot_many("mix", [(copper, 0.5), (aluminum, 0.5)], np.zeros(20))
+
+        assert mixed.C0 == copper.C0 and mixed.S == 0.0
+        assert "Not enough valid data points" in caplog.text
+
+    def test_invalid_inputs(self, test_hugoniot_eos):
+        """Bad shapes, negative fractions and bad sums raise ValueError."""
+        copper, aluminum = test_hugoniot_eos
+        Up = np.linspace(0, 6, 50)
+
+        with pytest.raises(ValueError):
+            generate_mixed_hugoniot_batch([], [[1.0]], Up)
+        with pytest.raises(ValueError):
+            generate_mixed_hugoniot_batch([copper, aluminum], [[0.2, 0.3, 0.5]], Up)
+        with pytest.raises(ValueError):
+            generate_mixed_hugoniot_batch([copper, aluminum], [[1.2, -0.2]], Up)
+        with pytest.raises(ValueError, match="composition 1"):
+            generate_mixed_hugoniot_batch([copper, aluminum], [[0.5, 0.5], [0.5, 0.4]], Up)
+
+
+class TestComponentUpCache:
+    """Test suite for reuse of per-component up arrays between mixture calculations."""
+
+    def test_matches_direct_solve(self, test_hugoniot_eos):
+        """Cached arrays equal a direct solve_up at the reference pressures."""
+        copper, aluminum = test_hugoniot_eos
+        cache = ComponentUpCache()
+        Up = np.linspace(0, 6, 100)
+
+        P_common, component_up = cache.component_up(copper, [copper, aluminum], Up)
+
+        np.testing.assert_array_equal(P_common, copper.hugoniot_P(Up))
+        np.testing.assert_array_equal(component_up[1], aluminum.solve_up(copper.hugoniot_P(Up)))
+        assert component_up.shape == (2, 100)
+
+    def test_hits_on_repeat_and_misses_on_new_grid(self, test_hugoniot_eos):
+        """Only a new Up grid or new EOS parameters cause a recompute."""
+        copper, aluminum = test_hugoniot_eos
+        cache = ComponentUpCache()
+        Up = np.linspace(0, 6, 100)
+
+        cache.component_up(copper, [copper, aluminum], Up)
+        assert cache.info()["misses"] == 3
+        cache.component_up(copper, [copper, aluminum], Up.copy())
+        assert cache.info()["hits"] == 3
+
+        cache.component_up(copper, [copper, aluminum], np.linspace(0, 5, 100))
+        assert cache.info()["misses"] == 6
+
+        # Same name, different parameters must not reuse the old arrays
+        altered = HugoniotEOS(name=aluminum.name, rho0=aluminum.rho0, C0=aluminum.C0, S=1.5)
+        _, component_up = cache.component_up(copper, [copper, altered], Up)
+        np.testing.assert_array_equal(component_up[1], altered.solve_up(copper.hugoniot_P(Up)))
+
+    def test_bounded_and_read_only(self, test_hugoniot_eos):
+        """The cache evicts old entries and hands out read-only arrays."""
+        copper, aluminum = test_hugoniot_eos
+        cache = ComponentUpCache(maxsize=2)
+
+        P_common, _ = cache.component_up(copper, [aluminum], np.linspace(0, 6, 20))
+        cache.component_up(copper, [aluminum], np.linspace(0, 5, 20))
+
+        assert cache.info()["size"] == 2
+        with pytest.raises(ValueError):
+            P_common[0] = 1.0
+
+    def test_changing_only_vfracs_reuses_arrays(self, test_hugoniot_eos):
+        """Repeated mixture calculations with new fractions only hit the cache."""
+        copper, aluminum = test_hugoniot_eos
+        component_up_cache.clear()
+        Up = np.linspace(0, 6, 100)
+
+        generate_mixed_hugoniot_many("a", [(copper, 0.3), (aluminum, 0.7)], Up)
+        misses = component_up_cache.info()["misses"]
+        result = generate_mixed_hugoniot_many("b", [(copper, 0.6), (aluminum, 0.4)], Up)
+
+        assert component_up_cache.info()["misses"] == misses
+        expected_rho = copper.rho0 * 0.6 + aluminum.rho0 * 0.4
+        assert result.rho0 == pytest.approx(expected_rho)
+
+
+class TestLinearFit:
+    """Test suite for the closed-form least-squares kernel."""
+
+    def test_matches_scipy_linregress(self):
+        from scipy.stats import linregress
+        rng = np.random.default_rng(1)
+        x = np.linspace(0.1, 6, 200)
+        y = 4.3 + 1.4 * x + rng.normal(0, 0.05, x.size)
+
+        fit = linear_fit(x, y, return_stats=True)
+        reference = linregress(x, y)
+
+        assert fit.slope == pytest.approx(reference.slope, rel=1e-10)
+        assert fit.intercept == pytest.approx(reference.intercept, rel=1e-10)
+        assert fit.slope_stderr == pytest.approx(reference.stderr, rel=1e-8)
+        assert fit.intercept_stderr == pytest.approx(reference.intercept_stderr, rel=1e-8)
+        residuals = y - (fit.intercept + fit.slope * x)
+        assert fit.rms == pytest.approx(np.sqrt(np.mean(residuals**2)), rel=1e-8)
+
+    def test_exact_line_has_zero_residual(self):
+        x = np.linspace(0, 8, 1000)
+        fit = linear_fit(x, 5.328 + 1.338 * x, return_stats=True)
+        assert fit.slope == pytest.approx(1.338, rel=1e-12)
+        assert fit.intercept == pytest.approx(5.328, rel=1e-12)
+        assert fit.rms < 1e-6
+
+    def test_batched_with_mask(self):
+        x = np.tile(np.linspace(0, 5, 50), (3, 1))
+        y = np.array([[1.0], [2.0], [3.0]]) + np.array([[0.5], [1.0], [1.5]]) * x
+        mask = np.ones_like(x, dtype=bool)
+        mask[1, :10] = False
+        y[1, :10] = np.inf  # Masked values are ignored even if not finite
+        mask[2, 2:] = False
+
+        fit = linear_fit(x, y, mask=mask)
+
+        np.testing.assert_allclose(fit.slope, [0.5, 1.0, 1.5], rtol=1e-12)
+        np.testing.assert_allclose(fit.intercept, [1.0, 2.0, 3.0], rtol=1e-12)
+        np.testing.assert_array_equal(fit.n, [50, 40, 2])
+
+    def test_too_few_points(self):
+        x = np.array([[1.0, 2.0, 3.0]])
+        fit = linear_fit(x, x, mask=np.array([[True, False, False]]))
+        assert np.isnan(fit.slope[0])
+
+    def test_mixture_fit_reports_quality(self, test_hugoniot_eos):
+        """generate_mixed_hugoniot_many attaches the fit statistics."""
+        copper, aluminum = test_hugoniot_eos
+        mixed = generate_mixed_hugoniot_many("mix", [(copper, 0.5), (aluminum, 0.5)], np.linspace(0, 6, 100))
+
+        assert mixed.fit.rms >= 0
+        assert mixed.fit.intercept_stderr > 0
+        assert float(mixed.fit.intercept) == mixed.C0
+
+    def test_legacy_matches_polyfit(self, test_hugoniot_eos):
+        """generate_mixed_hugoniot gives the same fit as the np.polyfit it replaced."""
+        copper, aluminum = test_hugoniot_eos
+        Up = np.linspace(0, 6, 100)
+        result = generate_mixed_hugoniot("mix", copper, aluminum, 0.3, Up)
+
+        P = copper.hugoniot_P(Up)
+        x1 = convert_volfrac_to_massfrac(copper.rho0, aluminum.rho0, 0.3)
+        mixed_Up = np.sqrt(Up**2 * x1 + aluminum.solve_up(P)**2 * (1 - x1))
+        slope, intercept = np.polyfit(mixed_Up[1:], P[1:] / (result.rho0 * mixed_Up[1:]), 1)
+        assert result.S == pytest.approx(slope, rel=1e-10)
+        assert result.C0 == pytest.approx(intercept, rel=1e-10)
+
+
+class TestMixtureUncertainty:
+    """Test suite for Monte Carlo uncertainty propagation."""
+
+    def test_zero_sigma_reproduces_deterministic_fit(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        configs = [(copper, 0.4), (aluminum, 0.6)]
+        Up = np.linspace(0, 6, 100)
+        mixed = generate_mixed_hugoniot_many("mix", configs, Up)
+
+        result = generate_mixed_hugoniot_uncertainty(configs, Up, np.zeros((2, 3)), n_samples=50, seed=0)
+
+        np.testing.assert_allclose(result.mean, [mixed.rho0, mixed.C0, mixed.S], rtol=1e-12)
+        np.testing.assert_allclose(result.cov, 0, atol=1e-20)
+        assert result.n_valid == 50
+
+    def test_matches_per_sample_fits(self, test_hugoniot_eos):
+        """Each batched sample equals generate_mixed_hugoniot_many run on the sampled parameters."""
+        copper, aluminum = test_hugoniot_eos
+        configs = [(copper, 0.4), (aluminum, 0.6)]
+        Up = np.linspace(0, 6, 100)
+        sigmas = [[0.05, 0.1, 0.05], [0.02, 0.1, 0.05]]
+        result = generate_mixed_hugoniot_uncertainty(configs, Up, sigmas, n_samples=5, seed=3, keep_samples=True)
+
+        means = [[eos.rho0, eos.C0, eos.S] for eos, _ in configs]
+        draws = np.random.default_rng(3).normal(means, sigmas, size=(5, 2, 3))
+        for sample, params in zip(result.samples, draws):
+            components = [(HugoniotEOS(eos.name, *p), vfrac) for (eos, vfrac), p in zip(configs, params)]
+            expected = generate_mixed_hugoniot_many("mix", components, Up)
+            np.testing.assert_allclose(sample, [expected.rho0, expected.C0, expected.S], rtol=1e-9)
+
+    def test_density_uncertainty_is_linear(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        result = generate_mixed_hugoniot_uncertainty(
+            [(copper, 0.4), (aluminum, 0.6)], np.linspace(0, 6, 50), [[0.1, 0, 0], [0.05, 0, 0]], n_samples=20_000, seed=1
+        )
+        # rho_mix = sum(vfrac_i rho_i), so its std is sqrt(sum((vfrac_i sigma_i)^2))
+        assert result.std[0] == pytest.approx(np.hypot(0.4 * 0.1, 0.6 * 0.05), rel=0.03)
+        assert result.percentiles[16.0][0] < result.mean[0] < result.percentiles[84.0][0]
+
+    def test_vfrac_sigmas_and_reproducibility(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        args = ([(copper, 0.4), (aluminum, 0.6)], np.linspace(0, 6, 50), np.zeros((2, 3)))
+        a = generate_mixed_hugoniot_uncertainty(*args, vfrac_sigmas=[0.02, 0.02], n_samples=2000, seed=7)
+        b = generate_mixed_hugoniot_uncertainty(*args, vfrac_sigmas=[0.02, 0.02], n_samples=2000, seed=7, chunk_size=300)
+        np.testing.assert_allclose(a.mean, b.mean, rtol=1e-12)
+        assert a.std[0] > 0
+
+    def test_many_attaches_uncertainty(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        mixed = generate_mixed_hugoniot_many("mix", [(copper, 0.5), (aluminum, 0.5)], np.linspace(0, 6, 100),
+                                             sigmas=[[0.01, 0.05, 0.02]] * 2, n_samples=1000, seed=0)
+        assert mixed.uncertainty.cov.shape == (3, 3)
+        assert mixed.uncertainty.mean[1] == pytest.approx(mixed.C0, rel=0.01)
+        assert not hasattr(generate_mixed_hugoniot_many("mix", [(copper, 1.0)], np.linspace(0, 6, 100)), "uncertainty")
+
+    def test_all_samples_invalid(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        # Every sampled density of copper is negative, so no sample can be fitted
+        configs = [(HugoniotEOS("Void", -8.93, 4.27, 1.413), 0.5), (aluminum, 0.5)]
+        with pytest.raises(ValueError, match="valid fit"):
+            generate_mixed_hugoniot_uncertainty(configs, np.linspace(0, 6, 50), np.zeros((2, 3)), n_samples=10)
+
+    def test_zero_volume_fraction_samples(self, test_hugoniot_eos):
+        """Samples where a component's fraction is clipped to zero match the fit without that component."""
+        copper, aluminum = test_hugoniot_eos
+        Up = np.linspace(0, 6, 100)
+        result = generate_mixed_hugoniot_uncertainty([(copper, 1.0), (aluminum, 0.0)], Up, np.zeros((2, 3)), n_samples=4)
+        mixed = generate_mixed_hugoniot_many("mix", [(copper, 1.0)], Up)
+        np.testing.assert_allclose(result.mean, [mixed.rho0, mixed.C0, mixed.S], rtol=1e-12)
+
+    def test_invalid_sigmas(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        with pytest.raises(ValueError):
+            generate_mixed_hugoniot_uncertainty([(copper, 0.5), (aluminum, 0.5)], np.linspace(0, 6, 50), [[0.1, 0.1, 0.1]])
+        with pytest.raises(ValueError):
+            generate_mixed_hugoniot_uncertainty([(copper, 1.0)], np.linspace(0, 6, 50), [[-0.1, 0, 0]])
+
+
+class TestMixtureJacobian:
+    """Forward-mode sensitivities agree with finite differences of generate_mixed_hugoniot_many."""
+
+    @pytest.fixture
+    def configs(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        return [(copper, 0.3), (aluminum, 0.3), (HugoniotEOS("LiF", 2.64, 5.15, 1.35), 0.4)]
+
+    @staticmethod
+    def mixture_params(configs, Up):
+        mixed = generate_mixed_hugoniot_many("mix", configs, Up)
+        return np.array([mixed.rho0, mixed.C0, mixed.S])
+
+    def test_value_matches_fit(self, configs):
+        Up = np.linspace(0, 6, 100)
+        np.testing.assert_allclose(mixture_jacobian(configs, Up).value, self.mixture_params(configs, Up), rtol=1e-12)
+
+    @pytest.mark.parametrize("param", ["rho0", "C0", "S"])
+    def test_eos_parameter_derivatives(self, configs, param):
+        Up = np.linspace(0, 6, 100)
+        jac = mixture_jacobian(configs, Up)
+        h = 1e-6
+        for j in range(len(configs)):
+            shifted = [[(dataclasses.replace(eos, **{param: getattr(eos, param) + (sign * h if k == j else 0)}), vfrac)
+                        for k, (eos, vfrac) in enumerate(configs)] for sign in (1, -1)]
+            fd = (self.mixture_params(shifted[0], Up) - self.mixture_params(shifted[1], Up)) / (2 * h)
+            np.testing.assert_allclose(getattr(jac, param)[:, j], fd, rtol=1e-5, atol=1e-8)
+
+    def test_vfrac_derivatives_on_the_simplex(self, configs):
+        Up = np.linspace(0, 6, 100)
+        jac = mixture_jacobian(configs, Up)
+        h = 1e-6
+        # Move volume from component 2 to component i, keeping the sum at 1
+        for i in range(2):
+            shifted = [[(eos, vfrac + sign * h * ((k == i) - (k == 2))) for k, (eos, vfrac) in enumerate(configs)]
+                       for sign in (1, -1)]
+            fd = (self.mixture_params(shifted[0], Up) - self.mixture_params(shifted[1], Up)) / (2 * h)
+            np.testing.assert_allclose(jac.vfrac[:, i] - jac.vfrac[:, 2], fd, rtol=1e-5, atol=1e-8)
+
+    def test_single_component_is_identity(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        jac = mixture_jacobian([(copper, 1.0)], np.linspace(0, 6, 100))
+        np.testing.assert_allclose(jac.value, [copper.rho0, copper.C0, copper.S], rtol=1e-12)
+        np.testing.assert_allclose(jac.rho0[:, 0], [1.0, 0.0, 0.0], atol=1e-10)
+        np.testing.assert_allclose(jac.C0[:, 0], [0.0, 1.0, 0.0], atol=1e-10)
+        np.testing.assert_allclose(jac.S[:, 0], [0.0, 0.0, 1.0], atol=1e-10)
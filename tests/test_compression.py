@@ -0,0 +1,144 @@
+import pytest
+import sys
+import os
+import gzip
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from compression import CompressionMetrics, CompressionMiddleware, choose_encoding, compress
+from metrics import Registry
+
+BODY = ("<td style='padding: 1em'>1.234567</td>" * 2000).encode()
+
+
+def _app(**kwargs):
+    async def large(request):
+        return Response(BODY, media_type="text/html", headers={"ETag": '"abc"'})
+
+    async def small(request):
+        return PlainTextResponse("tiny")
+
+    async def binary(request):
+        return Response(BODY, media_type="image/png")
+
+    async def encoded(request):
+        return Response(gzip.compress(BODY), media_type="text/html", headers={"Content-Encoding": "gzip"})
+
+    async def stream(request):
+        return StreamingResponse((BODY[i:i + 5000] for i in range(0, len(BODY), 5000)), media_type="text/csv")
+
+    app = Starlette(routes=[Route(f"/{fn.__name__}", fn) for fn in (large, small, binary, encoded, stream)])
+    return CompressionMiddleware(app, **kwargs)
+
+
+class TestChooseEncoding:
+    """Test suite for Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize("header, available, expected", [
+        ("gzip, deflate", ("gzip",), "gzip"),
+        ("gzip, deflate, br", ("br", "gzip"), "br"),
+        ("gzip;q=1.0, br;q=0.5", ("br", "gzip"), "gzip"),
+        ("br", ("gzip",), None),
+        ("*", ("br", "gzip"), "br"),
+        ("gzip;q=0", ("gzip",), None),
+        ("identity", ("gzip",), None),
+        (None, ("gzip",), None),
+    ])
+    def test_negotiation(self, header, available, expected):
+        assert choose_encoding(header, available) == expected
+
+    def test_brotli_round_trip(self):
+        brotli = pytest.importorskip("brotli")
+        assert brotli.decompress(compress(BODY, "br")) == BODY
+
+
+class TestCompressionMiddleware:
+    """Test suite for the compression middleware."""
+
+    def test_compresses_large_allowed_bodies(self):
+        registry = Registry()
+        metrics = CompressionMetrics(registry)
+        client = TestClient(_app(metrics=metrics))
+
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert int(response.headers["content-length"]) < len(BODY) / 10
+        assert response.content == BODY
+        assert metrics.ratio.count(encoding="gzip") == 1
+        assert metrics.bytes_in.value(encoding="gzip") == len(BODY)
+
+    def test_skips_small_disallowed_and_encoded_bodies(self):
+        client = TestClient(_app())
+        headers = {"Accept-Encoding": "gzip"}
+
+        assert "content-encoding" not in client.get("/small", headers=headers).headers
+        assert "content-encoding" not in client.get("/binary", headers=headers).headers
+        encoded = client.get("/encoded", headers=headers)
+        assert encoded.content == BODY  # compressed once, not twice
+        assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+    def test_streamed_body(self):
+        response = TestClient(_app()).get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.content == BODY
+
+    def test_large_bodies_are_offloaded(self):
+        calls = []
+
+        async def run(fn, *args):
+            calls.append(len(args[0]))
+            return fn(*args)
+
+        client = TestClient(_app(run=run, offload_size=len(BODY)))
+        client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert calls == [len(BODY)]
+
+        small_offload = TestClient(_app(run=run, offload_size=len(BODY) + 1))
+        small_offload.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert calls == [len(BODY)]
+
+
+@pytest.mark.usefixtures("isolated_disk_cache")
+class TestAppCompression:
+    """The app compresses plot fragments and serves plotly.js precompressed."""
+
+    def test_calculate_is_compressed_and_ratio_reported(self, sample_form_data):
+        import main
+
+        form = dict(sample_form_data, material_type_1='custom', name1='Cu', rho0_1='8.93', C0_1='4.27', S_1='1.413')
+        client = TestClient(main.app)
+        response = client.post('/calculate', data=form,
+                               headers={'HX-Request': 'true', 'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Mixture Parameters" in response.text
+        assert 'compression_ratio_count{encoding="gzip"}' in client.get('/metrics').text
+
+    def test_bundle_is_precompressed(self, tmp_path):
+        import main
+        import static_assets
+
+        client = TestClient(main.app)
+        with patch.object(main, 'STATIC_CACHE_DIR', str(tmp_path)), patch.dict(static_assets._encoded_bundles, clear=True):
+            compressed = client.get(main.PLOTLY_BUNDLE_URL, headers={'Accept-Encoding': 'gzip'})
+        plain = client.get(main.PLOTLY_BUNDLE_URL, headers={'Accept-Encoding': 'identity'})
+
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.content == plain.content == static_assets.plotly_bundle()
+        assert compressed.headers["etag"] != plain.headers["etag"]
+        assert len(os.listdir(tmp_path)) == 1
+        revalidated = client.get(main.PLOTLY_BUNDLE_URL,
+                                 headers={'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers["etag"]})
+        assert revalidated.status_code == 304
@@ -0,0 +1,140 @@
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from components import HugoniotEOS, generate_mixed_hugoniot_many, generate_mixed_hugoniot_batch
+from design import design_mixture, design_objective
+from batch_api import SpecError, RequestTooLarge, MAX_POINTS_PER_REQUEST, DESIGN_POPULATION, parse_design_request
+
+KAPTON = HugoniotEOS("Kapton", 1.37, 2.327, 1.55)
+LIF = HugoniotEOS("LiF", 2.635, 5.144, 1.355)
+
+
+class TestDesignMixture:
+    """Test suite for the simplex search."""
+
+    def test_recovers_known_composition(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        Up = np.linspace(0, 6, 100)
+        truth = generate_mixed_hugoniot_many("truth", [(copper, 0.25), (aluminum, 0.35), (KAPTON, 0.4)], Up)
+
+        result = design_mixture([copper, aluminum, KAPTON], Up, target=dict(rho0=truth.rho0, C0=truth.C0, S=truth.S),
+                                time_budget=5.0)
+
+        np.testing.assert_allclose(result.vfracs, [0.25, 0.35, 0.4], atol=1e-4)
+        assert result.residual < 1e-6
+        assert result.mixture.rho0 == pytest.approx(truth.rho0, rel=1e-6)
+
+    def test_window_match_beats_every_pure_component(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        Up = np.linspace(0, 6, 100)
+        pressures = np.linspace(5, 50, 10)
+
+        result = design_mixture([copper, KAPTON], Up, window=LIF, pressures=pressures)
+
+        pure = generate_mixed_hugoniot_batch([copper, KAPTON], np.eye(2), Up)
+        assert result.residual < design_objective(pure, window=LIF, pressures=pressures).min()
+        assert 0 < result.vfracs[0] < 1
+
+    def test_time_budget_and_seed(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        Up = np.linspace(0, 6, 100)
+        kwargs = dict(target=dict(rho0=5.0, C0=4.8), max_iterations=1000, tolerance=0.0)
+
+        quick = design_mixture([copper, aluminum, KAPTON], Up, time_budget=0.02, **kwargs)
+        assert quick.elapsed < 0.5
+        assert quick.iterations < 1000
+
+        a = design_mixture([copper, aluminum, KAPTON], Up, time_budget=10.0, **dict(kwargs, max_iterations=5))
+        b = design_mixture([copper, aluminum, KAPTON], Up, time_budget=10.0, **dict(kwargs, max_iterations=5))
+        np.testing.assert_array_equal(a.vfracs, b.vfracs)
+
+    def test_deadline_checked_between_chunks(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        Up = np.linspace(0, 6, 100)
+        kwargs = dict(target=dict(rho0=5.0, C0=4.8), population=64, max_iterations=1, tolerance=0.0)
+
+        whole = design_mixture([copper, aluminum, KAPTON], Up, time_budget=10.0, **kwargs)
+        chunked = design_mixture([copper, aluminum, KAPTON], Up, time_budget=10.0, chunk_points=1000, **kwargs)
+        np.testing.assert_allclose(chunked.vfracs, whole.vfracs)
+        assert chunked.evaluations == whole.evaluations == 64
+
+        expired = design_mixture([copper, aluminum, KAPTON], Up, time_budget=1e-9, chunk_points=1000, **kwargs)
+        assert expired.evaluations == 10  # only the first chunk of 10 compositions
+        assert expired.iterations == 1
+
+    def test_invalid_arguments(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        Up = np.linspace(0, 6, 100)
+        with pytest.raises(ValueError):
+            design_mixture([copper, aluminum], Up)
+        with pytest.raises(ValueError):
+            design_mixture([copper, aluminum], Up, target=dict(Us=5.0))
+        with pytest.raises(ValueError):
+            design_mixture([copper, aluminum], Up, window=LIF)
+
+    def test_unreachable_target(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        # The relative error against a subnormal target overflows, so no residual is finite
+        with pytest.raises(ValueError, match="finite residual"):
+            design_mixture([copper, aluminum], np.linspace(0, 6, 100), target=dict(S=1e-320))
+
+
+class TestDesignRequest:
+    """Test suite for /api/design request parsing and the route."""
+
+    def test_parse(self, test_hugoniot_eos):
+        by_name = {eos.name: eos for eos in test_hugoniot_eos}
+        kwargs = parse_design_request(dict(
+            components=[{"material": "Copper"}, {"name": "Foam", "rho0": 0.3, "C0": 1.0, "S": 1.2}],
+            target={"rho0": 2.0}, window={"material": "Aluminum"}, pressures=[10, 20], time_budget_ms=100,
+        ), by_name.__getitem__)
+
+        assert [m.name for m in kwargs["materials"]] == ["Copper", "Foam"]
+        assert kwargs["window"].name == "Aluminum"
+        assert kwargs["time_budget"] == pytest.approx(0.1)
+
+    @pytest.mark.parametrize("body", [
+        [],
+        dict(components=[{"material": "Copper"}]),
+        dict(components=[{"material": "Copper"}], target={"Us": 1.0}),
+        dict(components=[{"material": "Copper"}], window={"material": "Aluminum"}),
+        dict(components=[{"material": "Copper"}], target={"rho0": 5.0}, time_budget_ms=60_000),
+    ])
+    def test_invalid_requests(self, test_hugoniot_eos, body):
+        by_name = {eos.name: eos for eos in test_hugoniot_eos}
+        with pytest.raises(SpecError):
+            parse_design_request(body, by_name.__getitem__)
+
+    def test_population_points_limited(self, test_hugoniot_eos):
+        by_name = {eos.name: eos for eos in test_hugoniot_eos}
+        body = dict(components=[{"material": "Copper"}, {"material": "Aluminum"}], target={"rho0": 5.0})
+        limit = MAX_POINTS_PER_REQUEST // DESIGN_POPULATION
+        assert parse_design_request(dict(body, num_points=limit), by_name.__getitem__)["population"] == DESIGN_POPULATION
+        with pytest.raises(RequestTooLarge):
+            parse_design_request(dict(body, num_points=limit + 1), by_name.__getitem__)
+
+    def test_design_route(self):
+        from starlette.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        names = main.material_catalog.names()[:2]
+        response = client.post('/api/design', json=dict(
+            components=[{"material": n} for n in names], target={"rho0": 0.5 * sum(main.material_catalog.get(n).rho0 for n in names)},
+        ))
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["vfracs"] == pytest.approx([0.5, 0.5], abs=1e-3)
+        assert body["elapsed_ms"] < 2000
+        assert client.post('/api/design', json=dict(components=[])).status_code == 400
+        too_large = dict(components=[{"material": n} for n in names], target={"rho0": 5.0}, num_points=100_000)
+        assert client.post('/api/design', json=too_large).status_code == 413
+        unreachable = client.post('/api/design', json=dict(components=[{"material": n} for n in names], target={"S": 1e-320}))
+        assert unreachable.status_code == 422
+        assert "finite residual" in unreachable.json()["error"]
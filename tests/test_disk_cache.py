@@ -0,0 +1,115 @@
+import pytest
+import sys
+import os
+import numpy as np
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from components import generate_mixed_hugoniot_many
+from disk_cache import DiskCache, physics_version
+
+
+@pytest.fixture
+def cache(tmp_path, ticking_clock):
+    return DiskCache(str(tmp_path / "cache.db"), clock=ticking_clock)
+
+
+class TestDiskCache:
+    """Test suite for the persistent result cache."""
+
+    def test_round_trip_and_counters(self, cache, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        mixed = generate_mixed_hugoniot_many("mix", [(copper, 0.5), (aluminum, 0.5)], np.linspace(0, 6, 100))
+
+        assert cache.get("k") is None
+        cache.set("k", mixed)
+        restored = cache.get("k")
+
+        assert (restored.rho0, restored.C0, restored.S) == (mixed.rho0, mixed.C0, mixed.S)
+        assert restored.mfracs == mixed.mfracs
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    def test_survives_reopen(self, cache):
+        cache.set("k", {"value": 1})
+        cache.close()
+        assert DiskCache(cache.path).get("k") == {"value": 1}
+
+    def test_lru_eviction_by_entries(self, tmp_path, ticking_clock):
+        cache = DiskCache(str(tmp_path / "cache.db"), max_entries=2, clock=ticking_clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_lru_eviction_by_bytes(self, tmp_path, ticking_clock):
+        cache = DiskCache(str(tmp_path / "cache.db"), max_bytes=2500, clock=ticking_clock)
+        for key in "abc":
+            cache.set(key, b"x" * 1000)
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] <= 2500
+        # Values larger than the whole cache are not stored
+        cache.set("huge", b"x" * 5000)
+        assert cache.get("huge") is None
+
+    def test_running_totals(self, tmp_path, ticking_clock):
+        path = str(tmp_path / "cache.db")
+        cache = DiskCache(path, max_entries=3, clock=ticking_clock, resync_interval=2)
+        cache.set("a", b"x" * 100)
+        cache.set("a", b"x" * 200)  # Replacing an entry does not count it twice
+        assert cache.stats()["entries"] == 1
+
+        # Rows written by another process are picked up at the next resync and count towards the bounds
+        other = DiskCache(path, clock=ticking_clock)
+        for key in "bcd":
+            other.set(key, 1)
+        cache.set("e", 2)
+        cache.set("f", 3)
+        assert cache.stats()["entries"] == 3
+        assert cache.get("a") is None and cache.get("f") == 3
+
+    def test_version_change_invalidates(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        old = DiskCache(path, version="old")
+        old.set("k", 1)
+        old.close()
+
+        assert DiskCache(path, version="old").get("k") == 1
+        new = DiskCache(path, version="new")
+        assert new.get("k") is None
+        assert new.stats()["entries"] == 0
+
+    def test_default_version_is_physics_hash(self, cache):
+        assert cache.version == physics_version()
+        assert len(physics_version()) == 32
+
+
+class TestAppIntegration:
+    """Fits are stored on disk and reused by a fresh process."""
+
+    def test_calculate_reuses_disk_entry(self, isolated_disk_cache, sample_form_data):
+        from starlette.testclient import TestClient
+        import main
+        import tasks
+
+        form = dict(sample_form_data, material_type_1='custom', name1='Cu', rho0_1='8.93', C0_1='4.27', S_1='1.413')
+        client = TestClient(main.app)
+
+        with patch('tasks.generate_mixed_hugoniot_many', wraps=tasks.generate_mixed_hugoniot_many) as mock_fit:
+            main.result_cache.clear()
+            first = client.post('/calculate', data=form, headers={'HX-Request': 'true'})
+            # Simulate a restart: the in-memory cache is gone, the disk cache is not
+            main.result_cache.clear()
+            isolated_disk_cache.close()
+            second = client.post('/calculate', data=form, headers={'HX-Request': 'true'})
+
+        assert first.status_code == 200 and second.status_code == 200
+        assert "Mixture Parameters" in second.text
+        assert mock_fit.call_count == 1
+        assert isolated_disk_cache.stats()["hits"] == 1
@@ -0,0 +1,105 @@
+import pytest
+import sys
+import os
+import io
+import json
+import numpy as np
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from export import TABLE_COLUMNS, iter_hugoniot_table, iter_hugoniot_csv, iter_hugoniot_ndjson, iter_hugoniot_export
+
+
+class TestIterHugoniotTable:
+    """Test suite for chunked Hugoniot tabulation."""
+
+    def test_chunks_match_full_table(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        chunks = list(iter_hugoniot_table(copper, 0.0, 5.0, 1001, chunk_size=300))
+
+        assert [len(c) for c in chunks] == [300, 300, 300, 101]
+        table = np.vstack(chunks)
+        up = np.linspace(0.0, 5.0, 1001)
+        np.testing.assert_allclose(table[:, 0], up, rtol=0, atol=1e-12)
+        assert table[-1, 0] == 5.0
+        np.testing.assert_allclose(table[:, 1], copper.hugoniot_eos(up))
+        np.testing.assert_allclose(table[:, 2], copper.hugoniot_P(up))
+
+    def test_jump_conditions(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        up, Us, P, V, E = next(iter_hugoniot_table(copper, 0.5, 3.0, 50)).T
+        V0 = 1 / copper.rho0
+        # Momentum: P = (V0 - V) Us^2 / V0^2; energy: E - E0 = P (V0 - V) / 2
+        np.testing.assert_allclose(P, (V0 - V) * Us**2 / V0**2)
+        np.testing.assert_allclose(E, 0.5 * P * (V0 - V))
+
+    def test_invalid_arguments(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        with pytest.raises(ValueError):
+            next(iter_hugoniot_table(copper, 0, 1, 1))
+        with pytest.raises(ValueError):
+            iter_hugoniot_export(copper, "xlsx", 0, 1, 10)
+
+
+class TestTextFormats:
+    """Test suite for the CSV and NDJSON writers."""
+
+    def test_csv_round_trip(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        text = "".join(iter_hugoniot_csv(copper, 0.0, 4.0, 123, chunk_size=50))
+        lines = text.splitlines()
+
+        assert lines[0] == ",".join(TABLE_COLUMNS)
+        assert len(lines) == 124
+        expected = np.vstack(list(iter_hugoniot_table(copper, 0.0, 4.0, 123)))
+        np.testing.assert_allclose(np.loadtxt(io.StringIO(text), delimiter=",", skiprows=1), expected, rtol=1e-9)
+
+    def test_ndjson_rows(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        rows = [json.loads(line) for line in "".join(iter_hugoniot_ndjson(copper, 0.0, 4.0, 30, chunk_size=7)).splitlines()]
+
+        assert len(rows) == 30
+        assert list(rows[0]) == list(TABLE_COLUMNS)
+        assert rows[-1]["up"] == 4.0
+        assert rows[-1]["P"] == pytest.approx(float(copper.hugoniot_P(4.0)))
+
+
+@pytest.mark.usefixtures("isolated_disk_cache")
+class TestExportRoute:
+    """Test suite for POST /export."""
+
+    def test_streams_csv_attachment(self, sample_form_data):
+        from starlette.testclient import TestClient
+        import main
+
+        form = dict(sample_form_data, export_format="csv", export_points="5000")
+        form.update({'material_type_1': 'custom', 'name1': 'Cu', 'rho0_1': '8.93', 'C0_1': '4.27', 'S_1': '1.413'})
+        response = TestClient(main.app).post('/export', data=form)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        assert len(response.text.splitlines()) == 5001
+
+    def test_rejects_bad_format(self, sample_form_data):
+        from starlette.testclient import TestClient
+        import main
+
+        form = dict(sample_form_data, export_format="xlsx")
+        form.update({'material_type_1': 'custom', 'name1': 'Cu', 'rho0_1': '8.93', 'C0_1': '4.27', 'S_1': '1.413'})
+        assert TestClient(main.app).post('/export', data=form).status_code == 400
+
+    def test_fit_error_is_a_client_error(self, sample_form_data):
+        from unittest.mock import patch
+        from starlette.testclient import TestClient
+        import main
+
+        form = dict(sample_form_data)
+        form.update({'material_type_1': 'custom', 'name1': 'Cu', 'rho0_1': '8.93', 'C0_1': '4.27', 'S_1': '1.413'})
+        main.result_cache.clear()
+        with patch('main.generate_mixed_hugoniot_many', side_effect=ValueError("Material list cannot be empty.")):
+            response = TestClient(main.app).post('/export', data=form)
+
+        assert response.status_code == 400
+        assert "Material list cannot be empty" in response.text
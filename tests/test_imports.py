@@ -0,0 +1,34 @@
+import pytest
+import sys
+import os
+import subprocess
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def run_import(code, cwd):
+    """Run code in a fresh interpreter with src on the path and return the modules it loaded."""
+    probe = f"import sys; sys.path.insert(0, {SRC_DIR!r}); {code}; print(' '.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=cwd, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+class TestLazyImports:
+    """Importing the physics core and the app stays cheap."""
+
+    def test_physics_core_imports_without_plotting_stack(self, tmp_path):
+        loaded = run_import("import components", tmp_path)
+
+        assert "components" in loaded
+        assert not any(name.split(".")[0] in {"plotly", "scipy", "fasthtml"} for name in loaded)
+
+    def test_app_import_defers_database_and_plotly(self, tmp_path):
+        loaded = run_import("import main", tmp_path)
+
+        assert not any(name.split(".")[0] in {"plotly", "scipy"} for name in loaded)
+        assert not (tmp_path / "data" / "calcapp.db").exists()
+
+    def test_database_opened_and_seeded_on_first_use(self, tmp_path):
+        run_import("import main; assert len(main.material_catalog) > 0", tmp_path)
+
+        assert (tmp_path / "data" / "calcapp.db").exists()
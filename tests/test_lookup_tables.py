@@ -0,0 +1,134 @@
+import pytest
+import sys
+import os
+import numpy as np
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from components import HugoniotEOS, generate_mixed_hugoniot_many
+from lookup_tables import BinaryMixtureTables, build_pair_table, DEFAULT_UP_GRID
+
+KAPTON = HugoniotEOS("Kapton", 1.37, 2.327, 1.55)
+
+
+@pytest.fixture
+def tables(tmp_path):
+    return BinaryMixtureTables(str(tmp_path / "tables.db"))
+
+
+class TestBinaryMixtureTables:
+    """Test suite for the precomputed two-component tables."""
+
+    def test_interpolation_within_error_bound(self, tables, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        tables.build([copper, aluminum, KAPTON])
+
+        for ref, other in [(copper, aluminum), (aluminum, KAPTON), (KAPTON, copper)]:
+            for vfrac in np.linspace(0.013, 0.987, 25):
+                mixed = tables.lookup("mix", [(ref, vfrac), (other, 1 - vfrac)], DEFAULT_UP_GRID)
+                exact = generate_mixed_hugoniot_many("mix", [(ref, vfrac), (other, 1 - vfrac)], DEFAULT_UP_GRID)
+                if mixed is None:
+                    continue
+                assert mixed.C0 == pytest.approx(exact.C0, abs=tables.tolerance)
+                assert mixed.S == pytest.approx(exact.S, abs=tables.tolerance)
+                assert mixed.rho0 == pytest.approx(exact.rho0, rel=1e-12)
+                assert mixed.mfracs == pytest.approx(exact.mfracs, rel=1e-12)
+                assert float(mixed.fit.intercept) == mixed.C0 and float(mixed.fit.slope) == mixed.S
+                assert mixed.fit.n == exact.fit.n
+                assert mixed.fit.rms == pytest.approx(exact.fit.rms, rel=1e-2, abs=1e-6)
+                assert mixed.fit.intercept_stderr == pytest.approx(exact.fit.intercept_stderr, rel=1e-2, abs=1e-6)
+        assert tables.stats()["hits"] > 50
+
+    def test_error_bound_covers_interpolation_error(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        coarse = build_pair_table(copper, KAPTON, DEFAULT_UP_GRID, n_vfrac=101)
+        fine = build_pair_table(copper, KAPTON, DEFAULT_UP_GRID, n_vfrac=1001)
+        # Midpoints of the coarse intervals are exact points of the fine table
+        midpoint_error = np.abs(fine[0, 5::10][:100] - 0.5 * (coarse[0, :-1] + coarse[0, 1:]))
+        assert np.all(midpoint_error <= coarse[2, :-1])
+
+    def test_falls_back_when_bound_exceeds_tolerance(self, tmp_path, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        strict = BinaryMixtureTables(str(tmp_path / "strict.db"), n_vfrac=11, tolerance=1e-12)
+        strict.build([copper, aluminum])
+        assert strict.lookup("mix", [(copper, 0.45), (aluminum, 0.55)], DEFAULT_UP_GRID) is None
+        assert strict.stats()["fallbacks"] == 1
+
+    def test_only_tabulated_requests_are_answered(self, tables, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        tables.build([copper, aluminum])
+        assert tables.lookup("mix", [(copper, 0.5), (aluminum, 0.5)], np.linspace(0, 5, 100)) is None
+        assert tables.lookup("mix", [(copper, 0.5), (KAPTON, 0.5)], DEFAULT_UP_GRID) is None
+        assert tables.lookup("mix", [(copper, 0.4), (aluminum, 0.3), (KAPTON, 0.3)], DEFAULT_UP_GRID) is None
+        # Names do not matter, only parameters
+        renamed = HugoniotEOS("Cu", copper.rho0, copper.C0, copper.S)
+        assert tables.lookup("mix", [(renamed, 0.5), (aluminum, 0.5)], DEFAULT_UP_GRID).components == ["Cu", "Aluminum"]
+
+    def test_incremental_and_persistent(self, tables, tmp_path, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        assert tables.build([copper, aluminum]) == 1
+        assert tables.build([copper, aluminum]) == 0
+        # A new material adds one row per pair it is part of
+        assert tables.build([copper, aluminum, KAPTON]) == 2
+
+        reopened = BinaryMixtureTables(tables.path)
+        # Lookups never read the file; tables are only served once loaded
+        assert reopened.lookup("mix", [(KAPTON, 0.3), (aluminum, 0.7)], DEFAULT_UP_GRID) is None
+        reopened.load()
+        assert reopened.missing_pairs([copper, aluminum, KAPTON]) == []
+        assert reopened.lookup("mix", [(KAPTON, 0.3), (aluminum, 0.7)], DEFAULT_UP_GRID) is not None
+
+        # Tables for another vfrac grid are stored separately
+        assert BinaryMixtureTables(tables.path, n_vfrac=501).build([copper, aluminum]) == 1
+
+    def test_either_order_uses_its_own_reference(self, tables, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        tables.build([copper, aluminum])
+        for configs in ([(copper, 0.3), (aluminum, 0.7)], [(aluminum, 0.7), (copper, 0.3)]):
+            mixed = tables.lookup("mix", configs, DEFAULT_UP_GRID)
+            exact = generate_mixed_hugoniot_many("mix", configs, DEFAULT_UP_GRID)
+            assert mixed.C0 == pytest.approx(exact.C0, abs=tables.tolerance)
+            assert mixed.S == pytest.approx(exact.S, abs=tables.tolerance)
+            assert mixed.components == [eos.name for eos, _ in configs]
+
+    def test_memory_bounded_by_max_pairs(self, tmp_path, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        path = str(tmp_path / "tables.db")
+        BinaryMixtureTables(path).build([copper, aluminum, KAPTON])
+
+        bounded = BinaryMixtureTables(path, max_pairs=1)
+        bounded.load()
+        assert bounded.stats()["resident"] == 1
+        # Pairs that are not resident are read back from disk, evicting the least recently used
+        for ref, other in [(copper, aluminum), (aluminum, KAPTON), (KAPTON, copper)]:
+            assert bounded.lookup("mix", [(ref, 0.5), (other, 0.5)], DEFAULT_UP_GRID) is not None
+        assert bounded.stats()["resident"] == 1
+        assert bounded.stats()["pairs"] == 3
+
+
+@pytest.mark.usefixtures("isolated_disk_cache")
+class TestAppIntegration:
+    """The app answers tabulated requests from the tables."""
+
+    def test_calculate_uses_tables(self, tmp_path, sample_form_data):
+        from starlette.testclient import TestClient
+        import main
+        import tasks
+
+        store = BinaryMixtureTables(str(tmp_path / "tables.db"))
+        names = main.material_catalog.names()[:2]
+        store.build(main.material_catalog.all())
+        form = dict(sample_form_data, material1_select=names[0], material_type_2='premade', material2_select=names[1],
+                    vfrac1='0.37', vfrac2='0.63')
+        main.result_cache.clear()
+
+        with patch.object(main, 'lookup_tables', store), \
+             patch('tasks.generate_mixed_hugoniot_many', wraps=tasks.generate_mixed_hugoniot_many) as mock_fit:
+            response = TestClient(main.app).post('/calculate', data=form, headers={'HX-Request': 'true'})
+
+        assert response.status_code == 200
+        assert "Mixture Parameters" in response.text
+        assert mock_fit.call_count == 0
+        assert store.stats()["hits"] == 1
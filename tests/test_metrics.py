@@ -0,0 +1,107 @@
+import pytest
+import sys
+import os
+import re
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from metrics import Registry
+
+
+def _sample(text, name, **labels):
+    """Value of the sample with exactly these labels (in any order) in Prometheus text output, or None."""
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = re.fullmatch(r'([a-zA-Z_:][\w:]*)(?:\{(.*)\})? (\S+)', line)
+        assert match, f"malformed sample line: {line!r}"
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+        if match.group(1) == name and found == {k: str(v) for k, v in labels.items()}:
+            return float(match.group(3))
+    return None
+
+
+class TestRegistry:
+    """Test suite for the Prometheus text exposition."""
+
+    def test_counter_and_escaping(self):
+        registry = Registry()
+        counter = registry.counter("things_total", "Things.", ("kind",))
+        counter.inc(kind='a "quoted"\nvalue')
+        counter.inc(2, kind="plain")
+
+        text = registry.render()
+        assert "# TYPE things_total counter" in text
+        assert 'things_total{kind="a \\"quoted\\"\\nvalue"} 1' in text
+        assert _sample(text, "things_total", kind="plain") == 2
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, route="/x")
+
+        text = registry.render()
+        assert _sample(text, "latency_seconds_bucket", route="/x", le="0.1") == 2
+        assert _sample(text, "latency_seconds_bucket", route="/x", le="1") == 3
+        assert _sample(text, "latency_seconds_bucket", route="/x", le="+Inf") == 4
+        assert _sample(text, "latency_seconds_sum", route="/x") == pytest.approx(3.65)
+        assert _sample(text, "latency_seconds_count", route="/x") == 4
+
+    def test_callback(self):
+        registry = Registry()
+        registry.callback("size", "Size.", lambda: 7)
+        registry.callback("hits_total", "Hits.", lambda: {("a",): 1, ("b",): 2}, ("cache",), type="counter")
+
+        text = registry.render()
+        assert _sample(text, "size") == 7
+        assert _sample(text, "hits_total", cache="b") == 2
+        assert "# TYPE hits_total counter" in text
+
+
+@pytest.mark.usefixtures("isolated_disk_cache")
+class TestMetricsEndpoint:
+    """The app records requests and serves them at /metrics."""
+
+    def test_routes_outcomes_and_compute(self, sample_form_data):
+        from starlette.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        text = client.get('/metrics').text
+        before_ok = _sample(text, "http_requests_total", route="/calculate", method="POST", outcome="success") or 0
+        before_bad = _sample(text, "http_requests_total", route="/calculate", method="POST",
+                             outcome="validation_error") or 0
+
+        form = dict(sample_form_data, material_type_1='custom', name1='Scraped', rho0_1='6.6', C0_1='4.0', S_1='1.3')
+        main.result_cache.clear()
+        assert client.post('/calculate', data=form, headers={'HX-Request': 'true'}).status_code == 200
+        bad = client.post('/calculate', data=dict(form, upmin_fit='9'), headers={'HX-Request': 'true'})
+        assert bad.status_code == 200
+
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert _sample(text, "http_requests_total", route="/calculate", method="POST", outcome="success") == before_ok + 1
+        assert _sample(text, "http_requests_total", route="/calculate", method="POST",
+                       outcome="validation_error") == before_bad + 1
+        assert _sample(text, "http_request_duration_seconds_count", route="/calculate", method="POST") >= 2
+        assert _sample(text, "http_response_size_bytes_count", route="/calculate") >= 2
+        assert _sample(text, "mixture_compute_seconds_count", job="fit_and_plot", components=2, fit_points_le=100) >= 1
+        assert _sample(text, "material_catalog_size") == len(main.material_catalog)
+        assert _sample(text, "cache_hits_total", cache="result") is not None
+        assert _sample(text, "compute_pool_queue_depth") == 0
+
+    def test_unmatched_and_client_errors(self):
+        from starlette.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        client.get('/no/such/page')
+        client.post('/api/design', content=b'not json')
+
+        text = client.get('/metrics').text
+        assert _sample(text, "http_requests_total", route="unmatched", method="GET", outcome="validation_error") >= 1
+        assert _sample(text, "http_requests_total", route="/api/design", method="POST", outcome="validation_error") >= 1
@@ -0,0 +1,154 @@
+import pytest
+import sys
+import os
+import json
+import re
+import base64
+import numpy as np
+
+# Add src and benchmarks directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from fasthtml.common import to_xml
+from components import (
+    generate_mixed_hugoniot_many, plot_mixture, plot_mixture_many, figure_to_json, figure_fragment,
+    build_mixture_figures, plot_up_range,
+)
+from reference_figures import graph_objs_figures
+
+
+@pytest.fixture
+def mixture(test_hugoniot_eos):
+    copper, aluminum = test_hugoniot_eos
+    configs = [(copper, 0.4), (aluminum, 0.6)]
+    mixed = generate_mixed_hugoniot_many("CuAl", configs, np.linspace(0, 6, 100))
+    return configs, mixed
+
+
+class TestFigureToJson:
+    """Test suite for compact figure serialization."""
+
+    def test_b64_typed_arrays(self):
+        fig = {"data": [{"type": "scatter", "x": np.array([0.0, 1.0, 2.0]), "y": np.array([1.0, 2.0, 3.0])}],
+               "layout": {"title": {"text": "t"}}}
+        parsed = json.loads(figure_to_json(fig, "b64"))
+        x = parsed["data"][0]["x"]
+        assert x["dtype"] == "f8"
+        np.testing.assert_array_equal(np.frombuffer(base64.b64decode(x["bdata"]), dtype="f8"), [0.0, 1.0, 2.0])
+
+    def test_list_encoding_nulls_non_finite(self):
+        fig = {"data": [{"type": "scatter", "x": np.array([0.0, np.nan, 2.0])}], "layout": {}}
+        parsed = json.loads(figure_to_json(fig, "list"))
+        assert parsed["data"][0]["x"] == [0.0, None, 2.0]
+
+    def test_list_encoding_decodes_plotly_typed_arrays(self):
+        import plotly.graph_objs as go
+        fig = go.Figure(go.Scatter(x=np.array([0.5, 1.5]), y=np.array([2.0, 3.0])))
+        parsed = json.loads(figure_to_json(fig, "list"))
+        assert parsed["data"][0]["x"] == [0.5, 1.5]
+
+    def test_safe_inside_script(self):
+        fig = {"data": [{"type": "scatter", "name": "</script><b>"}], "layout": {}}
+        text = figure_to_json(fig)
+        assert "</" not in text
+        assert json.loads(text)["data"][0]["name"] == "</script><b>"
+
+    def test_invalid_options(self):
+        with pytest.raises(ValueError):
+            figure_to_json({"data": [], "layout": {}}, "msgpack")
+        with pytest.raises(ValueError):
+            figure_fragment({"data": [], "layout": {}}, plot_mode="png")
+
+
+class TestPlotModes:
+    """Test suite for html and json plot modes."""
+
+    def test_json_mode_embeds_figure_json(self, mixture):
+        configs, mixed = mixture
+        html = to_xml(plot_mixture_many(configs, mixed, 0, 6, plot_mode="json"))
+
+        assert html.count('data-plotly-figure=') == 2
+        assert "cdn.plot.ly" not in html
+        assert "Plotly.newPlot" not in html
+        assert "Mixture Parameters" in html
+
+    def test_html_mode_uses_local_bundle(self, mixture, test_hugoniot_eos):
+        configs, mixed = mixture
+        copper, aluminum = test_hugoniot_eos
+        for html in (to_xml(plot_mixture_many(configs, mixed, 0, 6, plot_mode="html")),
+                     to_xml(plot_mixture(copper, aluminum, 0.5, plot_mode="html"))):
+            assert "Plotly.newPlot" in html
+            assert "cdn.plot.ly" not in html
+
+    def test_json_mode_is_smaller_than_html_mode(self, mixture):
+        configs, mixed = mixture
+        html_mode = to_xml(plot_mixture_many(configs, mixed, 0, 6, plot_mode="html"))
+        json_mode = to_xml(plot_mixture_many(configs, mixed, 0, 6, plot_mode="json", array_encoding="b64"))
+        assert len(json_mode) < len(html_mode)
+
+    def test_legacy_plot_does_not_inline_plotly(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        html = to_xml(plot_mixture(copper, aluminum, 0.5))
+        assert len(html) < 500_000
+
+        json_html = to_xml(plot_mixture(copper, aluminum, 0.5, plot_mode="json"))
+        assert json_html.count('data-plotly-figure=') == 2
+
+
+class TestPlotlyBundleRoute:
+    """The app serves plotly.js itself with long-lived caching."""
+
+    def test_bundle_served_and_cacheable(self):
+        from starlette.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        response = client.get(main.PLOTLY_BUNDLE_URL)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/javascript")
+        assert "immutable" in response.headers["cache-control"]
+        assert client.get(main.PLOTLY_BUNDLE_URL, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    def test_page_loads_local_bundle(self):
+        from starlette.testclient import TestClient
+        import main
+
+        page = TestClient(main.app).get('/')
+
+        assert f'src="{main.PLOTLY_BUNDLE_URL}"' in page.text
+        assert "renderPlotlyJsonFigures" in page.text
+
+
+class TestDictFigureBuilder:
+    """The dict figure builder produces the same figures as graph_objs."""
+
+    def test_matches_graph_objs(self, mixture):
+        configs, mixed = mixture
+        up = np.linspace(0, 6, 200)
+
+        dict_figs = build_mixture_figures(configs, mixed, up)
+        go_figs = graph_objs_figures(configs, mixed, up)
+
+        for dict_fig, go_fig in zip(dict_figs, go_figs):
+            assert json.loads(figure_to_json(dict_fig, "list")) == json.loads(figure_to_json(go_fig, "list"))
+
+    def test_passes_graph_objs_validation_unchanged(self, mixture):
+        import plotly.graph_objs as go
+        configs, mixed = mixture
+
+        for fig in build_mixture_figures(configs, mixed, np.linspace(0, 6, 50)):
+            assert json.loads(figure_to_json(go.Figure(fig), "list")) == json.loads(figure_to_json(fig, "list"))
+
+    def test_html_mode_renders_dict_figures(self, mixture):
+        configs, mixed = mixture
+        html = to_xml(plot_mixture_many(configs, mixed, 0, 6, plot_mode="html"))
+        assert html.count("Plotly.newPlot") == 2
+
+    def test_prebuilt_figures_render_the_same(self, mixture):
+        configs, mixed = mixture
+        figures = build_mixture_figures(configs, mixed, plot_up_range(0, 6, 200))
+        strip_ids = lambda html: re.sub(r"plot-[0-9a-f]{32}", "plot-id", html)
+        assert (strip_ids(to_xml(plot_mixture_many(configs, mixed, 0, 6, plot_mode="json", figures=figures)))
+                == strip_ids(to_xml(plot_mixture_many(configs, mixed, 0, 6, plot_mode="json"))))
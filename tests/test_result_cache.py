@@ -0,0 +1,186 @@
+import pytest
+import asyncio
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from components import HugoniotEOS
+from result_cache import ResultCache, SingleFlight, mixture_cache_key
+
+
+class TestMixtureCacheKey:
+    """Test suite for canonical request hashing."""
+
+    def test_identical_inputs_share_key(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        key1 = mixture_cache_key([(copper, 0.5), (aluminum, 0.5)], "Mix", 0.0, 6.0, 100)
+        key2 = mixture_cache_key([(HugoniotEOS("Copper", 8.93, 4.27, 1.413), 0.5), (aluminum, 0.5)], "Mix", 0, 6, 100)
+        assert key1 == key2
+
+    def test_any_change_changes_key(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        base = mixture_cache_key([(copper, 0.5), (aluminum, 0.5)], "Mix", 0.0, 6.0, 100)
+        assert base != mixture_cache_key([(copper, 0.4), (aluminum, 0.6)], "Mix", 0.0, 6.0, 100)
+        assert base != mixture_cache_key([(aluminum, 0.5), (copper, 0.5)], "Mix", 0.0, 6.0, 100)
+        assert base != mixture_cache_key([(copper, 0.5), (aluminum, 0.5)], "Other", 0.0, 6.0, 100)
+        assert base != mixture_cache_key([(copper, 0.5), (aluminum, 0.5)], "Mix", 0.0, 5.0, 100)
+        assert base != mixture_cache_key([(copper, 0.5), (aluminum, 0.5)], "Mix", 0.0, 6.0, 101)
+        edited = HugoniotEOS("Copper", 8.93, 4.27, 1.5)
+        assert base != mixture_cache_key([(edited, 0.5), (aluminum, 0.5)], "Mix", 0.0, 6.0, 100)
+
+
+class TestResultCache:
+    """Test suite for the bounded LRU result cache."""
+
+    def test_get_and_set(self):
+        cache = ResultCache()
+        assert cache.get("a") is None
+        cache.set("a", "value", size=5)
+        assert cache.get("a") == "value"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entry_bound_evicts_least_recently_used(self):
+        cache = ResultCache(max_entries=2)
+        cache.set("a", 1, size=1)
+        cache.set("b", 2, size=1)
+        cache.get("a")
+        cache.set("c", 3, size=1)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_bound(self):
+        cache = ResultCache(max_bytes=100)
+        cache.set("a", 1, size=60)
+        cache.set("b", 2, size=60)
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 60
+        # Values larger than the whole budget are not stored
+        cache.set("huge", 3, size=1000)
+        assert cache.get("huge") is None
+        assert cache.get("b") == 2
+
+    def test_ttl(self, fake_clock):
+        clock = fake_clock
+        cache = ResultCache(ttl=10.0, clock=clock)
+        cache.set("a", 1, size=1)
+        clock.now = 9.0
+        assert cache.get("a") == 1
+        clock.now = 10.5
+        assert cache.get("a") is None
+        assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.usefixtures("isolated_disk_cache")
+class TestRouteResultSharing:
+    """The /calculate and /plot routes share computed results."""
+
+    def test_plot_after_calculate_reuses_result(self, sample_form_data):
+        from starlette.testclient import TestClient
+        import main
+        import tasks
+
+        form = dict(sample_form_data)
+        form.update({'material_type_1': 'custom', 'name1': 'Cu', 'rho0_1': '8.93', 'C0_1': '4.27', 'S_1': '1.413'})
+        main.result_cache.clear()
+        client = TestClient(main.app)
+
+        with patch('tasks.generate_mixed_hugoniot_many', wraps=tasks.generate_mixed_hugoniot_many) as mock_fit:
+            calc = client.post('/calculate', data=form, headers={'HX-Request': 'true'})
+            plot = client.post('/plot', data=form, headers={'HX-Request': 'true'})
+            client.post('/calculate', data=form, headers={'HX-Request': 'true'})
+
+        assert calc.status_code == 200
+        assert plot.status_code == 200
+        assert "Mixture Parameters" in plot.text
+        assert mock_fit.call_count == 1
+
+
+class TestSingleFlight:
+    """Test suite for coalescing of concurrent identical computations."""
+
+    def test_concurrent_calls_share_one_computation(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def compute(value):
+            calls.append(value)
+            await asyncio.sleep(0.02)
+            return value * 2
+
+        async def scenario():
+            same = await asyncio.gather(*[flight.run("a", compute, 21) for _ in range(5)])
+            other = await flight.run("b", compute, 1)
+            again = await flight.run("a", compute, 4)
+            return same, other, again
+
+        same, other, again = asyncio.run(scenario())
+        assert same == [42] * 5
+        assert (other, again) == (2, 8)
+        assert calls == [21, 1, 4]
+        assert flight.stats() == dict(in_flight=0, started=3, coalesced=4)
+
+    def test_failure_reaches_every_waiter(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("bad input")
+
+        async def scenario():
+            return await asyncio.gather(*[flight.run("a", fail) for _ in range(3)], return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.stats()["in_flight"] == 0
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def scenario():
+            first = asyncio.create_task(flight.run("a", compute))
+            second = asyncio.create_task(flight.run("a", compute))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == "done"
+
+    @pytest.mark.usefixtures("isolated_disk_cache")
+    def test_identical_concurrent_calculations_are_coalesced(self, sample_form_data):
+        import httpx
+        import main
+        import tasks
+
+        form = dict(sample_form_data, material_type_1='custom', name1='Coalesce', rho0_1='8.1', C0_1='4.1', S_1='1.4')
+        main.result_cache.clear()
+        fit = tasks.generate_mixed_hugoniot_many
+
+        def slow_fit(*args, **kwargs):
+            time.sleep(0.1)
+            return fit(*args, **kwargs)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*[
+                    client.post('/calculate', data=form, headers={'HX-Request': 'true'}) for _ in range(4)
+                ])
+
+        before = main.inflight.stats()["coalesced"]
+        with patch('tasks.generate_mixed_hugoniot_many', side_effect=slow_fit) as mock_fit:
+            responses = asyncio.run(scenario())
+
+        assert all(r.status_code == 200 and "Mixture Parameters" in r.text for r in responses)
+        assert mock_fit.call_count == 1
+        assert main.inflight.stats()["coalesced"] - before == 3
@@ -0,0 +1,187 @@
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from components import HugoniotEOS, generate_mixed_hugoniot_batch
+from shock import shock_state, material_arrays, up_from_pressure, impedance_match, impedance_match_up, solve_stack
+
+
+class TestShockState:
+    """Test suite for the vectorized jump-condition solver."""
+
+    def test_round_trip_between_inputs(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        from_up = shock_state(copper, up=np.linspace(0.0, 4.0, 41))
+
+        for kind, value in [("P", from_up.P), ("Us", from_up.Us), ("compression", from_up.rho / copper.rho0)]:
+            state = shock_state(copper, **{kind: value})
+            np.testing.assert_allclose(state.up, from_up.up, atol=1e-12)
+            np.testing.assert_allclose(state.P, from_up.P, atol=1e-9)
+            np.testing.assert_allclose(state.V, from_up.V, rtol=1e-12)
+
+    def test_matches_hugoniot_eos_methods(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        P = np.array([1.0, 10.0, 100.0])
+        state = shock_state(copper, P=P)
+        np.testing.assert_allclose(state.up, copper.solve_up(P))
+        np.testing.assert_allclose(state.Us, copper.hugoniot_eos(state.up))
+        np.testing.assert_allclose(state.E, 0.5 * state.P * (1 / copper.rho0 - state.V))
+
+    def test_outer_and_paired_broadcasting(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        P = np.linspace(1.0, 50.0, 7)
+
+        outer = shock_state([copper, aluminum], P=P)
+        assert outer.up.shape == (2, 7)
+        np.testing.assert_allclose(outer.up[1], aluminum.solve_up(P))
+
+        paired = shock_state([copper, aluminum], P=np.array([10.0, 20.0]), outer=False)
+        assert paired.up.shape == (2,)
+        np.testing.assert_allclose(paired.up, [copper.solve_up(10.0), aluminum.solve_up(20.0)])
+
+        assert shock_state(copper, up=1.0).P.shape == ()
+
+    def test_accepts_mixture_batches(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        batch = generate_mixed_hugoniot_batch([copper, aluminum], [[0.2, 0.8], [0.7, 0.3]], np.linspace(0, 6, 100))
+        state = shock_state(batch, up=np.array([1.0, 2.0, 3.0]))
+        assert state.P.shape == (2, 3)
+        np.testing.assert_allclose(state.P[1], batch.to_eos(1, "m").hugoniot_P(np.array([1.0, 2.0, 3.0])))
+
+    def test_unphysical_states_are_nan(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        assert np.isnan(shock_state(copper, Us=copper.C0 - 1.0).up)
+        assert np.isnan(shock_state(copper, P=-1.0).up)
+        # Limiting compression of a linear Hugoniot is S / (S - 1)
+        limit = copper.S / (copper.S - 1)
+        assert np.isnan(shock_state(copper, compression=limit * 1.01).up)
+        assert np.isfinite(shock_state(copper, compression=limit * 0.99).up)
+
+    def test_requires_exactly_one_input(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        with pytest.raises(ValueError):
+            shock_state(copper)
+        with pytest.raises(ValueError):
+            shock_state(copper, P=1.0, up=1.0)
+
+
+class TestUpFromPressure:
+    """The stable root agrees with the textbook quadratic formula and handles S = 0."""
+
+    def test_stable_root(self):
+        eos = HugoniotEOS("Test", 2.0, 5.0, 1.5)
+        P = np.logspace(-12, 3, 50)
+        up = up_from_pressure(eos.rho0, eos.C0, eos.S, P)
+        np.testing.assert_allclose(eos.rho0 * (eos.C0 + eos.S * up) * up, P, rtol=1e-12)
+        np.testing.assert_allclose(up_from_pressure(2.0, 5.0, 0.0, 10.0), 1.0)
+
+    def test_material_arrays(self, test_hugoniot_eos):
+        rho0, C0, S = material_arrays(test_hugoniot_eos)
+        np.testing.assert_allclose(rho0, [m.rho0 for m in test_hugoniot_eos])
+        assert material_arrays(test_hugoniot_eos[0])[0].shape == ()
+
+
+class TestImpedanceMatch:
+    """Test suite for the flyer/target impedance match."""
+
+    def test_symmetric_impact_is_half_velocity(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        match = impedance_match(copper, copper, np.array([0.5, 1.0, 3.0]))
+        np.testing.assert_allclose(match.up, [0.25, 0.5, 1.5])
+        np.testing.assert_allclose(match.flyer.up, match.target.up)
+
+    def test_pressure_balance(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        v = np.linspace(0.1, 8.0, 30)
+        for flyer, target in [(copper, aluminum), (aluminum, copper)]:
+            match = impedance_match(flyer, target, v)
+            np.testing.assert_allclose(target.hugoniot_P(match.up), flyer.hugoniot_P(v - match.up), rtol=1e-12)
+            np.testing.assert_allclose(match.flyer.P, match.target.P, rtol=1e-12)
+            assert np.all((match.up > 0) & (match.up < v))
+        # A denser flyer drives more than half its velocity into a lighter target
+        assert np.all(impedance_match(copper, aluminum, v).up > v / 2)
+
+    def test_catalog_grid_shape(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        match = impedance_match([copper, aluminum], [copper, aluminum, copper], np.linspace(1, 5, 4))
+        assert match.up.shape == match.P.shape == match.target.Us.shape == (2, 3, 4)
+        np.testing.assert_allclose(match.up[1, 0], impedance_match(aluminum, copper, np.linspace(1, 5, 4)).up)
+
+    def test_kernel_against_quadratic_formula(self):
+        rng = np.random.default_rng(0)
+        rho_f, rho_t = rng.uniform(1, 20, (2, 100))
+        C_f, C_t = rng.uniform(1, 8, (2, 100))
+        S_f, S_t = rng.uniform(0.8, 2, (2, 100))
+        v = rng.uniform(0.1, 10, 100)
+        u = impedance_match_up(rho_f, C_f, S_f, rho_t, C_t, S_t, v)
+        residual = rho_t * (C_t + S_t * u) * u - rho_f * (C_f + S_f * (v - u)) * (v - u)
+        np.testing.assert_allclose(residual, 0, atol=1e-9)
+
+
+class TestSolveStack:
+    """Test suite for the multi-layer transmission solver."""
+
+    def test_single_layer_is_impedance_match(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        v = np.linspace(0.5, 5.0, 10)
+        stack = solve_stack([aluminum], flyer=copper, velocity=v)
+        np.testing.assert_allclose(stack.layers[0].up, impedance_match(copper, aluminum, v).up)
+
+    def test_identical_layers_transmit_unchanged(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        stack = solve_stack([copper, copper, copper], P=np.array([5.0, 50.0]))
+        np.testing.assert_allclose(stack.P, np.full((3, 2), [5.0, 50.0]))
+
+    def test_reflected_hugoniot_balance(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        window = HugoniotEOS("LiF", 2.64, 5.15, 1.35)
+        stack = solve_stack([aluminum, copper, window], up=np.linspace(0.5, 3.0, 6))
+        for (prev, layer), (s_prev, s_next) in zip([(aluminum, copper), (copper, window)], zip(stack.layers, stack.layers[1:])):
+            # Next layer's Hugoniot meets the previous layer's Hugoniot mirrored about its particle velocity
+            np.testing.assert_allclose(layer.hugoniot_P(s_next.up), prev.hugoniot_P(2 * s_prev.up - s_next.up), rtol=1e-12)
+        # Higher impedance reshocks (P up); lower impedance releases (P down)
+        assert np.all(stack.P[1] > stack.P[0])
+        assert np.all(stack.P[2] < stack.P[1])
+
+    def test_vectorized_over_compositions_and_velocities(self, test_hugoniot_eos):
+        copper, aluminum = test_hugoniot_eos
+        window = HugoniotEOS("LiF", 2.64, 5.15, 1.35)
+        batch = generate_mixed_hugoniot_batch([copper, aluminum], [[0.1, 0.9], [0.5, 0.5], [0.9, 0.1]], np.linspace(0, 6, 100))
+        v = np.linspace(1.0, 6.0, 5)
+
+        stack = solve_stack([aluminum, batch, window], flyer=aluminum, velocity=v)
+        assert stack.up.shape == (3, 3, 5)
+        single = solve_stack([aluminum, batch.to_eos(2, "m"), window], flyer=aluminum, velocity=v)
+        np.testing.assert_allclose(stack.P[:, 2, :], single.P, rtol=1e-12)
+
+    def test_drive_validation(self, test_hugoniot_eos):
+        copper, _ = test_hugoniot_eos
+        with pytest.raises(ValueError):
+            solve_stack([copper], velocity=1.0)
+        with pytest.raises(ValueError):
+            solve_stack([copper], up=1.0, P=1.0)
+        with pytest.raises(ValueError):
+            solve_stack([], up=1.0)
+
+
+class TestImpedanceRoute:
+    """Test suite for the /impedance web view."""
+
+    def test_page_and_results(self):
+        from starlette.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        names = main.material_catalog.names()[:2]
+        page = client.get('/impedance')
+        assert page.status_code == 200
+        assert 'name="flyer"' in page.text
+
+        results = client.get('/impedance', params={"flyer": names, "target": names[0], "v_min": 1, "v_max": 2, "v_steps": 3},
+                             headers={'HX-Request': 'true'})
+        assert results.status_code == 200
+        assert results.text.count("<tr>") == 1 + 2 * 3
@@ -0,0 +1,84 @@
+import pytest
+import sys
+import os
+import json
+import logging
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import timing
+from timing import ServerTimingMiddleware, collect, record, server_timing_header, stage
+
+
+def _parse_server_timing(header):
+    return {entry.split(";dur=")[0]: float(entry.split(";dur=")[1]) for entry in header.split(", ")}
+
+
+class TestStageTimers:
+    """Test suite for the stage timers."""
+
+    def test_inactive_outside_requests(self):
+        assert not timing.active()
+        with stage("anything"):
+            pass
+        record({"fit": 1.0})
+        assert not timing.active()
+
+    def test_collect_accumulates_repeated_stages(self):
+        def work():
+            for _ in range(3):
+                with stage("fit"):
+                    pass
+            with stage("serialize"):
+                pass
+            return "result"
+
+        result, stages = collect(work)
+        assert result == "result"
+        assert list(stages) == ["fit", "serialize"]
+        assert all(seconds >= 0 for seconds in stages.values())
+        assert not timing.active()
+
+    def test_header_format(self):
+        assert server_timing_header({"parse": 0.0012, "fit": 0.25}) == "parse;dur=1.20, fit;dur=250.00"
+
+
+@pytest.mark.usefixtures("isolated_disk_cache")
+class TestServerTimingMiddleware:
+    """The middleware reports stages as a header and a log line."""
+
+    def test_calculate_reports_every_stage(self, sample_form_data, caplog):
+        from starlette.testclient import TestClient
+        import main
+
+        form = dict(sample_form_data, material_type_1='custom', name1='Timed', rho0_1='7.7', C0_1='4.4', S_1='1.5')
+        main.result_cache.clear()
+        client = TestClient(ServerTimingMiddleware(main.app))
+
+        with caplog.at_level(logging.INFO, logger="timing"):
+            response = client.post('/calculate', data=form, headers={'HX-Request': 'true'})
+
+        assert response.status_code == 200
+        assert "Mixture Parameters" in response.text
+        stages = _parse_server_timing(response.headers["server-timing"])
+        assert {"parse", "lookup", "fit", "figure", "serialize", "render", "total"} <= set(stages)
+        assert stages["total"] >= stages["fit"]
+
+        logged = json.loads(caplog.records[-1].getMessage())
+        assert (logged["method"], logged["path"], logged["status"]) == ("POST", "/calculate", 200)
+        assert "fit" in logged["stages"]
+
+    def test_every_route_gets_total(self):
+        from starlette.testclient import TestClient
+        import main
+
+        response = TestClient(ServerTimingMiddleware(main.app)).get('/status')
+        assert response.status_code == 200
+        assert "total" in _parse_server_timing(response.headers["server-timing"])
+
+    def test_disabled_by_default(self):
+        from starlette.testclient import TestClient
+        import main
+
+        assert "server-timing" not in TestClient(main.app).get('/status').headers
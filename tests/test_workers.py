@@ -0,0 +1,103 @@
+import pytest
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from workers import ComputePool
+
+
+def blocking_work(seconds):
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+class TestComputePool:
+    """Test suite for offloading blocking work from the event loop."""
+
+    def test_runs_off_the_event_loop(self):
+        pool = ComputePool(max_workers=2)
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            task = asyncio.create_task(ticker())
+            thread_name = await pool.run(blocking_work, 0.1)
+            task.cancel()
+            return thread_name, ticks
+
+        thread_name, ticks = asyncio.run(scenario())
+        pool.shutdown()
+
+        assert thread_name.startswith("compute")
+        assert ticks > 5  # The loop kept running while the work blocked
+
+    def test_concurrency_limit_and_queue_depth(self):
+        pool = ComputePool(max_workers=4, max_concurrency=1)
+
+        async def scenario():
+            jobs = [asyncio.create_task(pool.run(blocking_work, 0.05)) for _ in range(3)]
+            await asyncio.sleep(0.02)
+            snapshot = pool.stats()
+            await asyncio.gather(*jobs)
+            return snapshot
+
+        snapshot = asyncio.run(scenario())
+        pool.shutdown()
+
+        assert snapshot["running"] == 1
+        assert snapshot["queue_depth"] == 2
+        assert pool.stats()["completed"] == 3
+        assert pool.stats()["queue_depth"] == 0
+
+    def test_errors_propagate(self):
+        pool = ComputePool()
+
+        async def scenario():
+            await pool.run(int, "not a number")
+
+        with pytest.raises(ValueError):
+            asyncio.run(scenario())
+        pool.shutdown()
+        assert pool.stats()["failed"] == 1
+        assert pool.stats()["running"] == 0
+
+    def test_process_pool(self):
+        pool = ComputePool(kind="process", max_workers=1)
+
+        async def scenario():
+            return await pool.run(sum, [1, 2, 3])
+
+        assert asyncio.run(scenario()) == 6
+        pool.shutdown()
+
+    def test_invalid_kind(self):
+        with pytest.raises(ValueError):
+            ComputePool(kind="fibers")
+
+
+@pytest.mark.usefixtures("isolated_disk_cache")
+class TestStatusRoute:
+    """The status route reports pool and cache state."""
+
+    def test_status(self):
+        from starlette.testclient import TestClient
+        import main
+
+        response = TestClient(main.app).get('/status')
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["compute_pool"]["queue_depth"] == 0
+        assert "hits" in body["result_cache"]
+        assert body["materials"] > 0